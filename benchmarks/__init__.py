@@ -0,0 +1 @@
+"""Benchmarks for the git-browser parser and API on synthetic repositories."""
@@ -0,0 +1,52 @@
+"""Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare baseline.json results.json [--threshold 1.10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+def _index(path: str) -> Dict[Tuple[str, str], float]:
+    report = json.loads(Path(path).read_text())
+    return {(r["repo"], r["case"]): r["median_s"] for r in report["results"]}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compare git-browser benchmark results")
+    arg_parser.add_argument("baseline", help="Baseline results JSON")
+    arg_parser.add_argument("candidate", help="Candidate results JSON")
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.10,
+        help="Slowdown ratio reported as a regression (default: 1.10)",
+    )
+    args = arg_parser.parse_args(argv)
+
+    baseline = _index(args.baseline)
+    candidate = _index(args.candidate)
+
+    regressions = 0
+    print(f"{'repo':<32} {'case':<45} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for key in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[key], candidate[key]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:<32} {key[1]:<45} {old * 1000:10.2f} {new * 1000:10.2f} {ratio:7.2f}{flag}")
+
+    for key in sorted(set(candidate) - set(baseline)):
+        print(f"{key[0]:<32} {key[1]:<45} {'-':>10} {candidate[key] * 1000:10.2f}      new")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Time GitParser entry points and API routes on synthetic repositories.
+
+Usage:
+    python -m benchmarks.run --scales small,medium --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .synthetic import RepoShape, generate_repo
+
+# Commit counts and file counts per scale
+SCALES = {
+    "small": (200, 200),
+    "medium": (2000, 2000),
+    "large": (10000, 10000),
+}
+
+
+def shapes_for_scale(scale: str) -> List[RepoShape]:
+    """Repository shapes benchmarked at a scale."""
+    commits, files = SCALES[scale]
+    return [
+        RepoShape(name=f"{scale}-linear-wide-packed", commits=commits, files=files),
+        RepoShape(
+            name=f"{scale}-linear-wide-loose", commits=commits, files=files, packed=False
+        ),
+        RepoShape(
+            name=f"{scale}-merges-deep-packed",
+            commits=commits,
+            files=files,
+            history="merges",
+            tree="deep",
+        ),
+        RepoShape(
+            name=f"{scale}-many-tags",
+            commits=commits,
+            files=files // 4,
+            tags=max(commits // 2, 10),
+        ),
+        RepoShape(
+            name=f"{scale}-large-binaries",
+            commits=max(commits // 10, 10),
+            files=files // 4,
+            binary_files=4,
+            binary_size=4 * 1024 * 1024,
+        ),
+    ]
+
+
+def _time(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "first_s": timings[0],
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.mean(timings),
+        "runs": repeat,
+    }
+
+
+def _git_output(repo: Path, *args: str) -> str:
+    return subprocess.check_output(["git", "-C", str(repo), *args], text=True).strip()
+
+
+def _pick_targets(repo: Path) -> Dict[str, str]:
+    """Choose commits and paths that every case can use."""
+    head = _git_output(repo, "rev-parse", "HEAD")
+    root = _git_output(repo, "rev-list", "--max-parents=0", "HEAD").splitlines()[0]
+    modified = _git_output(repo, "diff-tree", "-r", "--no-commit-id", "--name-only", "HEAD")
+    path = modified.splitlines()[0] if modified else ""
+    directory = path.rsplit("/", 1)[0] if "/" in path else ""
+    return {"head": head, "root": root, "path": path, "dir": directory}
+
+
+def parser_cases(parser, targets: Dict[str, str]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Benchmark cases for GitParser entry points."""
+    head = targets["head"]
+    root = targets["root"]
+
+    def compare_root_to_head():
+        old = parser.get_commit(root)
+        new = parser.get_commit(head)
+        return parser.compare_trees(old.tree, new.tree)
+
+    def diff_head_file():
+        commit = parser.get_commit(head)
+        parent = parser.get_commit(commit.parents[0])
+        old_files = parser.object_parser.get_tree_contents(parent.tree)
+        new_files = parser.object_parser.get_tree_contents(commit.tree)
+        path = targets["path"]
+        return parser.generate_diff(old_files.get(path), new_files.get(path), path)
+
+    def filter_by_author():
+        commits = parser.get_all_commits(parser.get_branches(), max_commits=1000)
+        return parser.filter_commits(commits, author="alice")
+
+    return [
+        ("parser.get_branches", parser.get_branches),
+        ("parser.get_tags", parser.get_tags),
+        ("parser.get_all_commits", lambda: parser.get_all_commits(parser.get_branches())),
+        ("parser.get_commit_graph", lambda: parser.get_commit_graph(max_commits=500)),
+        ("parser.parse_repository", parser.parse_repository),
+        ("parser.get_commit_details", lambda: parser.get_commit_details(head)),
+        ("parser.compare_trees", compare_root_to_head),
+        ("parser.generate_diff", diff_head_file),
+        ("parser.filter_commits", filter_by_author),
+        ("parser.list_directory", lambda: parser.list_directory(head, targets["dir"])),
+    ]
+
+
+def route_cases(client, targets: Dict[str, str]) -> List[Tuple[str, Callable[[], Any]]]:
+    """Benchmark cases for API routes."""
+    head = targets["head"]
+    root = targets["root"]
+    path = targets["path"]
+
+    def get(url: str) -> Callable[[], Any]:
+        def call():
+            response = client.get(url)
+            response.raise_for_status()
+            return response
+
+        return call
+
+    return [
+        ("GET /api/info", get("/api/info")),
+        ("GET /api/branches", get("/api/branches")),
+        ("GET /api/tags", get("/api/tags")),
+        ("GET /api/commits", get("/api/commits?limit=100")),
+        ("GET /api/graph", get("/api/graph?limit=500")),
+        ("GET /api/repository", get("/api/repository")),
+        ("GET /api/commits/{sha}", get(f"/api/commits/{head}")),
+        ("GET /api/commits/{sha}/details", get(f"/api/commits/{head}/details")),
+        ("GET /api/commits/{sha}/files/{path}", get(f"/api/commits/{head}/files/{path}")),
+        ("GET /api/commits/{sha1}/compare/{sha2}", get(f"/api/commits/{root}/compare/{head}")),
+        ("GET /api/tree/{sha}/{path}", get(f"/api/tree/{head}/{targets['dir']}")),
+        ("GET /api/blob/{sha}/{path}", get(f"/api/blob/{head}/{path}")),
+    ]
+
+
+def _make_client(repo: Path):
+    """Create a test client for the API, or None if httpx is unavailable."""
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        return None
+    from git_browser.api.server import create_app
+
+    return TestClient(create_app(str(repo)))
+
+
+def run(
+    scales: List[str],
+    work_dir: Path,
+    repeat: int,
+    only: Optional[str] = None,
+    include_routes: bool = True,
+) -> Dict[str, Any]:
+    """Run the suite and return machine-readable results."""
+    from git_browser.git_parser.parser import GitParser
+
+    results = []
+    for scale in scales:
+        for shape in shapes_for_scale(scale):
+            print(f"== {shape.name}", file=sys.stderr)
+            start = time.perf_counter()
+            repo = generate_repo(shape, work_dir)
+            print(f"   repository ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+            targets = _pick_targets(repo)
+            cases = parser_cases(GitParser(str(repo)), targets)
+            if include_routes:
+                client = _make_client(repo)
+                if client is None:
+                    print("   httpx not installed, skipping API routes", file=sys.stderr)
+                else:
+                    cases += route_cases(client, targets)
+
+            for name, func in cases:
+                if only and only not in name:
+                    continue
+                timing = _time(func, repeat)
+                print(f"   {name:<45} {timing['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+                results.append({"case": name, "scale": scale, "repo": shape.name, **timing})
+
+    return {"meta": _metadata(repeat), "results": results}
+
+
+def _metadata(repeat: int) -> Dict[str, Any]:
+    source_dir = Path(__file__).resolve().parent.parent
+    try:
+        revision = _git_output(source_dir, "rev-parse", "HEAD")
+    except (subprocess.CalledProcessError, OSError):
+        revision = None
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "repeat": repeat,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description="git-browser benchmark suite")
+    arg_parser.add_argument(
+        "--scales", default="small", help=f"Comma separated scales ({', '.join(SCALES)})"
+    )
+    arg_parser.add_argument(
+        "--work-dir",
+        default=str(Path(tempfile.gettempdir()) / "git-browser-bench"),
+        help="Where synthetic repositories are generated and cached",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Runs per case (default: 5)")
+    arg_parser.add_argument("--only", help="Only run cases whose name contains this string")
+    arg_parser.add_argument("--no-routes", action="store_true", help="Skip API route cases")
+    arg_parser.add_argument("-o", "--output", help="Write JSON results to this file")
+    args = arg_parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        arg_parser.error(f"Unknown scale(s): {', '.join(unknown)}")
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    report = run(scales, work_dir, args.repeat, args.only, not args.no_routes)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
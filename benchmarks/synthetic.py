@@ -0,0 +1,234 @@
+"""Deterministic generator for synthetic Git repositories.
+
+Repositories are written with ``git fast-import`` from a stream generated
+by a seeded RNG with fixed timestamps, so the same shape always produces
+the same object SHAs.
+"""
+
+import hashlib
+import json
+import random
+import shutil
+import subprocess
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+AUTHORS = [
+    ("Alice Example", "alice@example.com"),
+    ("Bob Example", "bob@example.com"),
+    ("Carol Example", "carol@example.com"),
+    ("Dave Example", "dave@example.com"),
+    ("Erin Example", "erin@example.com"),
+]
+
+BASE_TIMESTAMP = 1600000000
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"]
+
+
+@dataclass
+class RepoShape:
+    """Shape parameters of a synthetic repository."""
+
+    name: str
+    commits: int = 200
+    files: int = 200
+    history: str = "linear"  # "linear" or "merges"
+    tree: str = "wide"  # "wide" (few large directories) or "deep" (nested directories)
+    depth: int = 6  # Directory nesting for deep trees
+    files_per_commit: int = 3
+    lines_per_file: int = 40
+    merge_every: int = 5  # Commits per side branch for merge-heavy history
+    tags: int = 10
+    annotated_tags: bool = True
+    packed: bool = True
+    binary_files: int = 0
+    binary_size: int = 0
+    seed: int = 1
+
+    def key(self) -> str:
+        """Stable hash of the shape, used to cache generated repositories."""
+        encoded = json.dumps(asdict(self), sort_keys=True).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def _file_paths(shape: RepoShape, rng: random.Random) -> List[str]:
+    paths = []
+    for i in range(shape.files):
+        if shape.tree == "deep":
+            parts = [f"d{rng.randrange(4)}" for _ in range(1 + i % shape.depth)]
+            paths.append("/".join(parts + [f"file{i}.txt"]))
+        else:
+            paths.append(f"dir{i % 4}/file{i}.txt")
+    return paths
+
+
+def _text(rng: random.Random, lines: int) -> bytes:
+    return "".join(
+        " ".join(rng.choice(WORDS) for _ in range(6)) + "\n" for _ in range(lines)
+    ).encode("utf-8")
+
+
+def _edit(rng: random.Random, content: bytes) -> bytes:
+    lines = content.split(b"\n")
+    for _ in range(3):
+        idx = rng.randrange(len(lines))
+        lines[idx] = " ".join(rng.choice(WORDS) for _ in range(6)).encode("utf-8")
+    return b"\n".join(lines)
+
+
+def _binary(rng: random.Random, size: int) -> bytes:
+    # NUL prefix guarantees binary detection whatever the random bytes are
+    return b"\x00" + rng.getrandbits(8 * size).to_bytes(size, "little")[1:]
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(payload), payload)
+
+
+class _StreamWriter:
+    """Builds a fast-import stream."""
+
+    def __init__(self, shape: RepoShape):
+        self.shape = shape
+        self.rng = random.Random(shape.seed)
+        self.chunks: List[bytes] = []
+        self.next_mark = 1
+        self.tick = 0
+
+    def commit(self, ref: str, message: str, parents: List[int], changes: Dict[str, bytes]) -> int:
+        mark = self.next_mark
+        self.next_mark += 1
+        self.tick += 1
+        name, email = AUTHORS[self.rng.randrange(len(AUTHORS))]
+        when = BASE_TIMESTAMP + self.tick * 3600
+        ident = f"{name} <{email}> {when} +0000".encode("utf-8")
+
+        self.chunks.append(b"commit %s\nmark :%d\n" % (ref.encode("utf-8"), mark))
+        self.chunks.append(b"author " + ident + b"\ncommitter " + ident + b"\n")
+        self.chunks.append(_data(message.encode("utf-8")))
+        if parents:
+            self.chunks.append(b"from :%d\n" % parents[0])
+            for parent in parents[1:]:
+                self.chunks.append(b"merge :%d\n" % parent)
+        for path, content in sorted(changes.items()):
+            self.chunks.append(b"M 100644 inline %s\n" % path.encode("utf-8"))
+            self.chunks.append(_data(content))
+        self.chunks.append(b"\n")
+        return mark
+
+    def tag(self, name: str, mark: int, annotated: bool):
+        if annotated:
+            self.tick += 1
+            when = BASE_TIMESTAMP + self.tick * 3600
+            self.chunks.append(b"tag %s\nfrom :%d\n" % (name.encode("utf-8"), mark))
+            self.chunks.append(b"tagger Release Bot <release@example.com> %d +0000\n" % when)
+            self.chunks.append(_data(f"Release {name}".encode("utf-8")))
+        else:
+            self.chunks.append(b"reset refs/tags/%s\nfrom :%d\n\n" % (name.encode("utf-8"), mark))
+
+    def stream(self) -> bytes:
+        return b"".join(self.chunks) + b"done\n"
+
+
+def build_stream(shape: RepoShape) -> bytes:
+    """Generate the fast-import stream for a shape."""
+    writer = _StreamWriter(shape)
+    rng = writer.rng
+    paths = _file_paths(shape, rng)
+    contents: Dict[str, bytes] = {}
+
+    # Initial commit adds every file
+    for path in paths:
+        contents[path] = _text(rng, shape.lines_per_file)
+    for i in range(shape.binary_files):
+        contents[f"assets/blob{i}.bin"] = _binary(rng, shape.binary_size)
+    head = writer.commit("refs/heads/main", "Initial commit", [], dict(contents))
+    main_marks = [head]
+
+    def changes() -> Dict[str, bytes]:
+        changed = {}
+        for path in rng.sample(paths, min(shape.files_per_commit, len(paths))):
+            contents[path] = _edit(rng, contents[path])
+            changed[path] = contents[path]
+        return changed
+
+    made = 1
+    branch_no = 0
+    while made < shape.commits:
+        if shape.history == "merges" and shape.commits - made > shape.merge_every + 1:
+            # Side branch off main, merged back with a merge commit
+            branch_no += 1
+            ref = f"refs/heads/topic/{branch_no}"
+            side = head
+            for _ in range(shape.merge_every):
+                side = writer.commit(ref, f"Topic {branch_no} work", [side], changes())
+                made += 1
+            head = writer.commit("refs/heads/main", f"Main work {made}", [head], changes())
+            head = writer.commit(
+                "refs/heads/main", f"Merge topic/{branch_no}", [head, side], {}
+            )
+            made += 2
+        else:
+            head = writer.commit("refs/heads/main", f"Change {made}", [head], changes())
+            made += 1
+        main_marks.append(head)
+
+    if shape.binary_files:
+        binaries = {
+            f"assets/blob{i}.bin": _binary(rng, shape.binary_size)
+            for i in range(shape.binary_files)
+        }
+        head = writer.commit("refs/heads/main", "Update binaries", [head], binaries)
+        main_marks.append(head)
+
+    for i in range(shape.tags):
+        target = main_marks[(i * len(main_marks)) // max(shape.tags, 1)]
+        writer.tag(f"v{i}.0", target, annotated=shape.annotated_tags and i % 2 == 0)
+
+    return writer.stream()
+
+
+def _git(repo: Path, *args: str, input: bytes = None):
+    subprocess.run(
+        ["git", "-C", str(repo), *args],
+        input=input,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def generate_repo(shape: RepoShape, root: Path) -> Path:
+    """Create (or reuse) the repository for a shape under root.
+
+    Returns:
+        Path of the repository working directory
+    """
+    repo = root / f"{shape.name}-{shape.key()}"
+    marker = repo / ".git" / "synthetic-shape.json"
+    if marker.exists():
+        return repo
+    if repo.exists():
+        shutil.rmtree(repo)
+
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "fast-import", "--quiet", input=build_stream(shape))
+
+    pack_dir = repo / ".git" / "objects" / "pack"
+    if shape.packed:
+        _git(repo, "repack", "-a", "-d", "-q")
+    else:
+        for pack in list(pack_dir.glob("*.pack")):
+            moved = repo / pack.name
+            idx = pack.with_suffix(".idx")
+            pack.rename(moved)
+            idx.unlink()
+            with open(moved, "rb") as f:
+                _git(repo, "unpack-objects", "-q", input=f.read())
+            moved.unlink()
+
+    _git(repo, "symbolic-ref", "HEAD", "refs/heads/main")
+    marker.write_text(json.dumps(asdict(shape), indent=2))
+    return repo
@@ -33,6 +33,15 @@ const DiffViewer = ({ diffData, viewMode }) => {
     );
   }
 
+  // Handle files over the server's diff limits
+  if (diffData.too_large) {
+    return (
+      <div className="bg-gray-200 dark:bg-gray-700 rounded p-4 text-center text-gray-700 dark:text-gray-300 text-sm">
+        File too large to display diff ({diffData.old_size} → {diffData.new_size} bytes)
+      </div>
+    );
+  }
+
   // Handle empty diff
   if (!diffData.diff || diffData.diff.trim() === '') {
     return (
@@ -148,6 +148,20 @@ const GitGraph = ({ graphData, onNodeClick }) => {
               currentBranch.commit(commitOptions);
             }
 
+            // Remote-tracking branch positions
+            if (node.remotes && node.remotes.length > 0) {
+              currentBranch.tag({
+                name: node.remotes.join(', '),
+                style: {
+                  bgColor: "#38bdf8",
+                  color: "black",
+                  strokeColor: "#0284c7",
+                  borderRadius: 4,
+                  pointerWidth: 6
+                }
+              });
+            }
+
             // Tagging
             if (node.tags && node.tags.length > 0) {
               currentBranch.tag({
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { gitApi } from '../services/api';
 import DiffViewer from '../components/DiffViewer';
 import { VscAdd, VscDiscard, VscCheck, VscRefresh, VscCloudUpload, VscCloudDownload, VscSync, VscSourceControl } from 'react-icons/vsc';
@@ -83,6 +83,8 @@ const StatusPage = () => {
   const [diffLoading, setDiffLoading] = useState(false);
   const [error, setError] = useState(null);
   const [success, setSuccess] = useState(null);
+  const [progress, setProgress] = useState(null);
+  const stopWatchingJob = useRef(null);
 
   const fetchStatus = async () => {
     try {
@@ -108,7 +110,41 @@ const StatusPage = () => {
     }
   };
 
-  useEffect(() => { fetchStatus(); }, []);
+  useEffect(() => {
+    fetchStatus();
+    return () => stopWatchingJob.current && stopWatchingJob.current();
+  }, []);
+
+  // Fetch, pull and push run as background jobs: report the outcome only
+  // once the job has finished, with git's own error if it failed
+  const runJob = async (start, label, doneMessage) => {
+    setLoading(true);
+    setError(null);
+    setSuccess(null);
+    try {
+      const { job } = await start();
+      stopWatchingJob.current = gitApi.watchJob(job.id, {
+        onProgress: (line) => setProgress(line),
+        onEnd: (finished) => {
+          stopWatchingJob.current = null;
+          setLoading(false);
+          setProgress(null);
+          fetchStatus();
+          if (finished.status === 'succeeded') {
+            setSuccess(doneMessage);
+            setTimeout(() => setSuccess(null), 2000);
+          } else if (finished.status === 'cancelled') {
+            setError(`${label} cancelled`);
+          } else {
+            setError(finished.error ? `${label} failed: ${finished.error}` : `${label} failed`);
+          }
+        },
+      });
+    } catch (e) {
+      setLoading(false);
+      setError(`${label} failed`);
+    }
+  };
 
   const handleStage = async (path) => {
     try { await gitApi.stageFile(path); fetchStatus(); }
@@ -151,34 +187,22 @@ const StatusPage = () => {
             />
             <ActionButton
               icon={VscSync}
-              onClick={async () => {
-                setLoading(true);
-                try { await gitApi.fetch(); fetchStatus(); setSuccess("Fetched"); }
-                catch (e) { setError("Fetch failed"); }
-                finally { setLoading(false); setTimeout(() => setSuccess(null), 2000); }
-              }}
+              onClick={() => runJob(gitApi.fetch, "Fetch", "Fetched")}
+              disabled={loading}
               title="Fetch"
               loading={loading}
             />
             <ActionButton
               icon={VscCloudDownload}
-              onClick={async () => {
-                setLoading(true);
-                try { await gitApi.pull(); fetchStatus(); setSuccess("Pulled"); }
-                catch (e) { setError("Pull failed"); }
-                finally { setLoading(false); setTimeout(() => setSuccess(null), 2000); }
-              }}
+              onClick={() => runJob(gitApi.pull, "Pull", "Pulled")}
+              disabled={loading}
               title="Pull"
               loading={loading}
             />
             <ActionButton
               icon={VscCloudUpload}
-              onClick={async () => {
-                setLoading(true);
-                try { await gitApi.push(); fetchStatus(); setSuccess("Pushed"); }
-                catch (e) { setError("Push failed"); }
-                finally { setLoading(false); setTimeout(() => setSuccess(null), 2000); }
-              }}
+              onClick={() => runJob(gitApi.push, "Push", "Pushed")}
+              disabled={loading}
               title="Push"
               loading={loading}
             />
@@ -220,6 +244,11 @@ const StatusPage = () => {
                 {error || success}
               </div>
             )}
+            {progress && !error && (
+              <div className="mt-2 text-xs p-2 rounded font-mono truncate text-gray-500 dark:text-gray-400 bg-gray-100 dark:bg-[#2a2d2e]" title={progress}>
+                {progress}
+              </div>
+            )}
           </div>
 
           <SectionHeader title="Staged Changes" count={status.staged.length} />
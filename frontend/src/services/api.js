@@ -10,6 +10,126 @@ const api = axios.create({
   },
 });
 
+// Directory of a `git-browser export` to read instead of the API (read-only)
+const STATIC_EXPORT_URL = import.meta.env.VITE_STATIC_EXPORT;
+
+const staticExport = {
+  manifest: null,
+  graph: null,
+  pages: [],
+  decorationsBySha: null,
+
+  get: async (path, responseType = 'json') => {
+    const response = await axios.get(`${STATIC_EXPORT_URL}/${path}`, { responseType });
+    return response.data;
+  },
+
+  getManifest: async () => {
+    if (!staticExport.manifest) {
+      staticExport.manifest = await staticExport.get('manifest.json');
+    }
+    return staticExport.manifest;
+  },
+
+  // Graph node lookup of branch, remote and tag names by commit SHA
+  decorations: async () => {
+    if (staticExport.decorationsBySha) return staticExport.decorationsBySha;
+    const manifest = await staticExport.getManifest();
+    const decorations = {};
+    const decorate = (sha, key, name) => {
+      decorations[sha] = decorations[sha] || { branches: [], remotes: [], tags: [] };
+      decorations[sha][key].push(name);
+    };
+    manifest.branches.forEach((b) => decorate(b.commit_sha, 'branches', b.name));
+    (manifest.remotes || []).forEach((b) => decorate(b.commit_sha, 'remotes', b.name));
+    manifest.tags.forEach((t) => decorate(t.commit_sha, 'tags', t.name));
+    staticExport.decorationsBySha = decorations;
+    return decorations;
+  },
+
+  // Decorated nodes of the i-th graph page; pages are in display order, newest first
+  getPage: async (i) => {
+    if (!staticExport.pages[i]) {
+      const manifest = await staticExport.getManifest();
+      const [text, decorations] = await Promise.all([
+        staticExport.get(manifest.graph[i], 'text'),
+        staticExport.decorations(),
+      ]);
+      staticExport.pages[i] = text
+        .split('\n')
+        .filter(Boolean)
+        .map((line) => JSON.parse(line))
+        .map((node) => ({ branches: [], remotes: [], tags: [], ...node, ...decorations[node.sha] }));
+    }
+    return staticExport.pages[i];
+  },
+
+  // The newest limit graph nodes, reading only the pages they are on
+  getNodes: async (limit) => {
+    const manifest = await staticExport.getManifest();
+    const nodes = [];
+    for (let i = 0; i < manifest.graph.length && nodes.length < limit; i += 1) {
+      nodes.push(...(await staticExport.getPage(i)));
+    }
+    return nodes.slice(0, limit);
+  },
+
+  // All graph nodes, newest first
+  getGraph: async () => {
+    if (!staticExport.graph) {
+      const manifest = await staticExport.getManifest();
+      const pages = await Promise.all(manifest.graph.map((_, i) => staticExport.getPage(i)));
+      staticExport.graph = pages.flat();
+    }
+    return staticExport.graph;
+  },
+
+  // Commits reachable from a branch (or all), newest first
+  getHistory: async (limit, branch) => {
+    if (!branch) return staticExport.getNodes(limit);
+    const graph = await staticExport.getGraph();
+    const manifest = await staticExport.getManifest();
+    const tip = manifest.branches.find((b) => b.name === branch);
+    if (!tip) return graph.slice(0, limit);
+    const bySha = new Map(graph.map((node) => [node.sha, node]));
+    const reachable = new Set();
+    const stack = [tip.commit_sha];
+    while (stack.length) {
+      const sha = stack.pop();
+      if (reachable.has(sha) || !bySha.has(sha)) continue;
+      reachable.add(sha);
+      stack.push(...bySha.get(sha).parents);
+    }
+    return graph.filter((node) => reachable.has(node.sha)).slice(0, limit);
+  },
+
+  getDetails: (sha) => staticExport.get(`commits/${sha.slice(0, 2)}/${sha}.json`),
+};
+
+const staticApi = {
+  getBranches: async () => (await staticExport.getManifest()).branches,
+  getTags: async () => (await staticExport.getManifest()).tags,
+  getRemotes: async () => (await staticExport.getManifest()).remotes || [],
+  getInfo: async () => {
+    const manifest = await staticExport.getManifest();
+    return { path: manifest.repository, current_branch: manifest.current_branch, ...manifest.info };
+  },
+  getGraph: async (limit = 500, branch = null) => staticExport.getHistory(limit, branch),
+  getCommits: async (limit = 100, branch = null) => {
+    const nodes = await staticExport.getHistory(limit, branch);
+    return Promise.all(nodes.map(async (node) => (await staticExport.getDetails(node.sha)).commit));
+  },
+  getCommit: async (sha) => (await staticExport.getDetails(sha)).commit,
+  getCommitDetails: async (sha) => {
+    const { diffs, ...details } = await staticExport.getDetails(sha);
+    return details;
+  },
+  getFileDiff: async (sha, filePath) => {
+    const { diffs } = await staticExport.getDetails(sha);
+    return staticExport.get(diffs[filePath]);
+  },
+};
+
 export const gitApi = {
   // Get repository information
   getRepository: async () => {
@@ -17,9 +137,24 @@ export const gitApi = {
     return response.data;
   },
 
-  // Get all branches
-  getBranches: async () => {
-    const response = await api.get('/api/branches');
+  // Get all branches; tracking adds ahead/behind counts against upstreams
+  getBranches: async (tracking = false) => {
+    const response = await api.get('/api/branches', { params: tracking ? { tracking } : {} });
+    return response.data;
+  },
+
+  // Get remote-tracking branches (origin/main, ...)
+  getRemotes: async () => {
+    const response = await api.get('/api/remotes');
+    return response.data;
+  },
+
+  // Get a page of a ref's reflog ('HEAD', 'main', ...), newest first;
+  // pass the returned next_cursor for older entries
+  getReflog: async (ref = 'HEAD', cursor = null, limit = 50) => {
+    const params = { limit };
+    if (cursor !== null) params.cursor = cursor;
+    const response = await api.get(`/api/reflog/${ref}`, { params });
     return response.data;
   },
 
@@ -50,8 +185,9 @@ export const gitApi = {
   },
 
   // Get commit graph
-  getGraph: async (limit = 500, branch = null) => {
-    const params = { limit };
+  // options: { fields: 'sha,parents', encoding: 'indexed', abbrev: 7 }
+  getGraph: async (limit = 500, branch = null, options = {}) => {
+    const params = { limit, ...options };
     if (branch) {
       params.branch = branch;
     }
@@ -59,6 +195,14 @@ export const gitApi = {
     return response.data;
   },
 
+  // Get the graph slice around a revision (or { timestamp }) with lane state
+  // options: { before: 50, after: 50, fields: 'sha,parents', abbrev: 7 }
+  getGraphWindow: async (anchor, options = {}) => {
+    const params = typeof anchor === 'object' ? { ...anchor, ...options } : { anchor, ...options };
+    const response = await api.get('/api/graph/window', { params });
+    return response.data;
+  },
+
   // Get repository info
   getInfo: async () => {
     const response = await api.get('/api/info');
@@ -77,9 +221,19 @@ export const gitApi = {
     return response.data;
   },
 
+  // Fetch many commits at once; detail is 'header', 'stats' or 'files'
+  getCommitsBatch: async (shas, detail = 'header') => {
+    const response = await api.post('/api/commits/batch', { shas, detail });
+    return response.data;
+  },
+
   // Get diff for specific file in commit
-  getFileDiff: async (sha, filePath) => {
-    const response = await api.get(`/api/commits/${sha}/files/${encodeURIComponent(filePath)}`);
+  // Pass hunks ("0-20") to fetch a window of a large diff, wordDiff for intra-line changes
+  getFileDiff: async (sha, filePath, { hunks, wordDiff } = {}) => {
+    const params = {};
+    if (hunks) params.hunks = hunks;
+    if (wordDiff) params.word_diff = true;
+    const response = await api.get(`/api/commits/${sha}/files/${encodeURIComponent(filePath)}`, { params });
     return response.data;
   },
 
@@ -110,6 +264,7 @@ export const gitApi = {
     return response.data;
   },
 
+  // push, pull and fetch queue a background job; follow it with watchJob
   push: async () => {
     const response = await api.post('/api/push');
     return response.data;
@@ -125,6 +280,33 @@ export const gitApi = {
     return response.data;
   },
 
+  getJobs: async () => {
+    const response = await api.get('/api/jobs');
+    return response.data;
+  },
+
+  getJob: async (id) => {
+    const response = await api.get(`/api/jobs/${id}`);
+    return response.data;
+  },
+
+  cancelJob: async (id) => {
+    const response = await api.delete(`/api/jobs/${id}`);
+    return response.data;
+  },
+
+  // Stream a job's output lines to onProgress and its final state to onEnd.
+  // Returns a function that stops listening.
+  watchJob: (id, { onProgress, onEnd } = {}) => {
+    const source = new EventSource(`${API_BASE_URL}/api/jobs/${id}/events`);
+    source.addEventListener('progress', (event) => onProgress && onProgress(JSON.parse(event.data).line));
+    source.addEventListener('end', (event) => {
+      source.close();
+      if (onEnd) onEnd(JSON.parse(event.data));
+    });
+    return () => source.close();
+  },
+
   createBranch: async (name) => {
     const response = await api.post('/api/branches', { name });
     return response.data;
@@ -156,4 +338,9 @@ export const gitApi = {
   },
 };
 
+// A static export answers the read-only calls it has data for
+if (STATIC_EXPORT_URL) {
+  Object.assign(gitApi, staticApi);
+}
+
 export default api;
@@ -0,0 +1,260 @@
+"""Background jobs for network operations (fetch, pull, push).
+
+A fetch can take minutes, so running it inside a request handler blocks
+the server and shows no progress. Jobs run in a worker thread instead,
+one at a time per repository so two pulls never overlap, and the lines
+git prints with ``--progress`` are kept on the job for clients to stream.
+Running jobs can be cancelled, which terminates the git process.
+
+When a job ends, refs have usually moved, so the finish callback brings
+the parser's ref snapshot and caches up to date before the job is
+reported as finished.
+"""
+
+import itertools
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .. import metrics
+from ..git_client import GitClient
+
+# Job kind -> git arguments
+JOB_COMMANDS = {
+    "fetch": ["fetch", "--progress"],
+    "pull": ["pull", "--progress"],
+    "push": ["push", "--progress"],
+}
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 50
+# Seconds a cancelled git process gets to exit before it is killed
+CANCEL_GRACE_SECONDS = 5.0
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+
+
+def _error_line(lines: List[str]) -> Optional[str]:
+    """The line explaining why git failed: its first "fatal:" or "error:" line, else the last."""
+    return next((line for line in lines if line.startswith(("fatal:", "error:"))), lines[-1] if lines else None)
+
+
+def _signal(process: subprocess.Popen, sig: int):
+    """Signal git and, on POSIX, the helpers in its process group.
+
+    Helpers inherit git's output pipe, so reading it would not end while
+    one of them kept running.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+
+class Job:
+    """One queued or running git command and the output it printed so far."""
+
+    def __init__(self, job_id: str, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.error: Optional[str] = None
+        self.lines: List[str] = []
+        self._process: Optional[subprocess.Popen] = None
+        self._cancel_requested = False
+        self._changed = threading.Condition()
+        # Called from the worker thread on every change, for event streams
+        self._watchers: List[Callable[[], Any]] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def _notify(self):
+        """Wake waiters; called with self._changed held."""
+        self._changed.notify_all()
+        for callback in self._watchers:
+            callback()
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self._notify()
+
+    def _add_line(self, line: str):
+        with self._changed:
+            self.lines.append(line)
+            self._notify()
+
+    def watch(self, callback: Callable[[], Any]):
+        """Call callback, from whichever thread changes the job, on every change.
+
+        The callback runs with the job locked, so it must only hand the
+        wake-up on (e.g. with loop.call_soon_threadsafe), never block.
+        """
+        with self._changed:
+            self._watchers.append(callback)
+
+    def unwatch(self, callback: Callable[[], Any]):
+        with self._changed:
+            self._watchers.remove(callback)
+
+    def output_since(self, seen: int) -> Tuple[List[str], bool]:
+        """Lines after the first seen ones, and whether the job finished."""
+        with self._changed:
+            return self.lines[seen:], self.finished
+
+    def wait(self, seen: int, timeout: float) -> Tuple[List[str], bool]:
+        """Wait until there are more than seen lines or the job finished.
+
+        Returns:
+            Tuple of (lines after the first seen ones, whether the job finished)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.lines) > seen or self.finished, timeout)
+            return self.lines[seen:], self.finished
+
+    def cancel(self) -> bool:
+        """Cancel the job. Returns False if it already finished."""
+        with self._changed:
+            if self.finished:
+                return False
+            self._cancel_requested = True
+            process = self._process
+            if self.status == "queued":
+                self.status = "cancelled"
+                self.finished_at = time.time()
+                self._notify()
+        if process is not None:
+            _signal(process, signal.SIGTERM)
+            try:
+                process.wait(CANCEL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                _signal(process, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        return True
+
+    def to_dict(self, with_output: bool = False) -> Dict[str, Any]:
+        with self._changed:
+            data = {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "returncode": self.returncode,
+                "error": self.error,
+                "progress": self.lines[-1] if self.lines else None,
+            }
+            if with_output:
+                data["output"] = list(self.lines)
+            return data
+
+
+class JobQueue:
+    """Run jobs one after another in a daemon worker thread."""
+
+    def __init__(self, client: GitClient, on_finish: Optional[Callable[[Job], Any]] = None):
+        self.client = client
+        self.on_finish = on_finish
+        # Held while a job runs; other writers to the repository can take it too
+        self.lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, kind: str) -> Job:
+        """Queue a job of a kind from JOB_COMMANDS."""
+        if kind not in JOB_COMMANDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(str(next(self._ids)), kind)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            finished = [j.id for j in self._jobs.values() if j.finished]
+            for job_id in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+                del self._jobs[job_id]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="git-browser-jobs", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self.lock:
+                self._run(job)
+
+    def _run(self, job: Job):
+        with job._changed:
+            if job._cancel_requested:
+                return
+            try:
+                job._process = self.client.start_git(JOB_COMMANDS[job.kind])
+            except OSError as e:
+                job.status, job.error, job.finished_at = "failed", str(e), time.time()
+                job._notify()
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            job._notify()
+
+        process = job._process
+        # Progress lines are redrawn in place with "\r"; keep each update
+        pending = b""
+        for chunk in iter(lambda: process.stdout.read1(4096), b""):
+            pending += chunk
+            *lines, pending = pending.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+            for line in lines:
+                if line.strip():
+                    job._add_line(line.decode("utf-8", errors="replace").rstrip())
+        if pending.strip():
+            job._add_line(pending.decode("utf-8", errors="replace").rstrip())
+        returncode = process.wait()
+
+        if job._cancel_requested:
+            status = "cancelled"
+        elif returncode == 0:
+            status = "succeeded"
+        else:
+            status = "failed"
+        if metrics.enabled:
+            metrics.SUBPROCESSES.inc(job.kind, {"succeeded": "ok", "failed": "error"}.get(status, status))
+
+        # Refs may have moved even if git failed or was cancelled midway.
+        # Refreshing before the job is marked finished means clients that
+        # reload once it ends already find warm caches.
+        if self.on_finish is not None:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                print(f"⚠ Refresh after {job.kind} job failed: {e}")
+        job._update(
+            status=status,
+            returncode=returncode,
+            finished_at=time.time(),
+            error=_error_line(job.lines) if status == "failed" else None,
+            _process=None,
+        )
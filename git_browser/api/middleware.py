@@ -0,0 +1,134 @@
+"""ASGI middleware for the Git browser API."""
+
+import time
+from typing import Sequence
+from urllib.parse import parse_qs
+
+from starlette.routing import BaseRoute, Match
+
+from .. import metrics, tracing
+
+
+class MetricsMiddleware:
+    """Record per-route latency and in-flight requests.
+
+    Only installed when metrics are enabled, so a disabled server does not
+    pay for route matching or timing.
+    """
+
+    def __init__(self, app, routes: Sequence[Sequence[BaseRoute]]):
+        self.app = app
+        # Route lists are read at request time so later registrations count
+        self.routes = routes
+
+    def _route_template(self, scope) -> str:
+        for group in self.routes:
+            for route in group:
+                path = getattr(route, "path", None)
+                if path is not None and route.matches(scope)[0] == Match.FULL:
+                    return path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_template(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        metrics.REQUESTS_IN_FLIGHT.inc(route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.REQUESTS_IN_FLIGHT.dec(route)
+            metrics.REQUEST_LATENCY.observe(
+                route, scope["method"], str(status["code"]), value=time.perf_counter() - start
+            )
+
+
+class TracingMiddleware:
+    """Trace requests and serve sampling profiles on demand.
+
+    With tracing on, every request gets a trace; requests slower than
+    slow_request_ms log their span breakdown. The "serialize" span covers
+    the time from the last traced call returning to the response headers
+    being sent, which is dominated by response validation and JSON encoding.
+
+    With profiling allowed, "?profile=1" runs the request under a sampling
+    profiler and returns the folded stacks instead of the response body.
+    """
+
+    def __init__(self, app, slow_request_ms: float, trace: bool, allow_profiling: bool):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.trace = trace
+        self.allow_profiling = allow_profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.allow_profiling and self._wants_profile(scope):
+            await self._profile(scope, receive, send)
+        elif self.trace:
+            await self._trace(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    def _wants_profile(scope) -> bool:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        return query.get("profile", ["0"])[0] in ("1", "true")
+
+    async def _trace(self, scope, receive, send):
+        trace, token = tracing.start_trace(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and trace.last_span_end is not None:
+                trace.add(("serialize",), time.perf_counter() - trace.last_span_end)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            tracing.end_trace(token)
+            total = time.perf_counter() - trace.start
+            if total * 1000 >= self.slow_request_ms:
+                tracing.logger.warning(trace.format(total))
+
+    async def _profile(self, scope, receive, send):
+        status = {"code": 500}
+
+        async def discard(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        # Sync handlers and streamed bodies run in threadpool threads
+        profiler = tracing.SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        body = profiler.folded().encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"x-profiled-status", str(status["code"]).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,26 +1,52 @@
 """FastAPI routes for Git browser API."""
 
-from fastapi import APIRouter, HTTPException, Query, Body
-from typing import List, Optional
+import asyncio
+import json
+import mimetypes
+import re
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 
-from ..git_parser.parser import GitParser
+from .. import metrics
+from ..git_parser.parser import BATCH_DETAIL_LEVELS, GRAPH_FIELDS, MAX_GRAPH_WINDOW, GitParser
+from ..git_parser.revisions import split_range
+from ..git_parser.stats import DIMENSIONS
 from ..git_client import GitClient
+from .jobs import JOB_COMMANDS, JobQueue
+from .warmup import Warmup
 from ..git_parser.models import (
     GitRepository,
     GitBranch,
     GitTag,
     GitCommit,
+    GitCommitBatchItem,
     GitCommitDetails,
+    GitFileChange,
     GitGraphNode,
+    GitReflogPage,
+    GitTreeEntry,
     RepoStatus,
 )
 
 router = APIRouter()
 
+# Largest number of commits accepted by POST /api/commits/batch
+MAX_BATCH_COMMITS = 1000
+
+# Fields that can be selected with fields= on commit listings
+COMMIT_FIELDS = tuple(GitCommit.model_fields)
+
 # Global parser and client instances
 _git_parser: Optional[GitParser] = None
 _git_client: Optional[GitClient] = None
+_warmup: Optional[Warmup] = None
+_job_queue: Optional[JobQueue] = None
+
+# Seconds between keep-alive comments on idle job event streams
+JOB_EVENTS_KEEPALIVE = 15.0
 
 
 def set_git_parser(parser: GitParser):
@@ -49,40 +75,195 @@ def get_git_client() -> GitClient:
     return _git_client
 
 
+def set_job_queue(jobs: JobQueue):
+    """Set the queue running fetch, pull and push jobs."""
+    global _job_queue
+    _job_queue = jobs
+
+
+def get_job_queue() -> JobQueue:
+    """Get the global job queue."""
+    if _job_queue is None:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    return _job_queue
+
+
+def set_warmup(warmup: Optional[Warmup]):
+    """Set the background warm-up whose progress /api/ready reports."""
+    global _warmup
+    _warmup = warmup
+
+
 @router.get("/api/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "service": "git-browser"}
 
 
-@router.get("/api/repository", response_model=GitRepository)
-async def get_repository():
-    """Get complete repository information."""
+@router.get("/api/ready")
+async def ready_check():
+    """Report background warm-up progress."""
+    if _warmup is None:
+        return {"ready": True, "progress": 1.0, "steps": []}
+    return _warmup.report()
+
+
+@router.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Expose metrics in the Prometheus text format (requires --metrics)."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    parser = get_git_parser()
+    for cache in parser.memory.report()["caches"]:
+        metrics.CACHE_BYTES.set(cache["name"], value=cache["bytes"])
+        metrics.CACHE_ENTRIES.set(cache["name"], value=cache["entries"])
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/api/memory")
+async def get_memory():
+    """Report memory used by each cache against the configured limit."""
+    return get_git_parser().memory.report()
+
+
+def _check_memory(request: Request):
+    """Refuse an expensive request with 503 while memory is under pressure.
+
+    Failing one request and letting the client retry is better than the
+    whole server being killed for running out of memory.
+    """
+    parser = get_git_parser()
+    if parser.memory.under_pressure():
+        if metrics.enabled:
+            route = request.scope.get("route")
+            metrics.LOAD_SHED.inc(getattr(route, "path", request.url.path))
+        raise HTTPException(
+            status_code=503,
+            detail="Server is low on memory, retry later",
+            headers={"Retry-After": "5"},
+        )
+
+
+# Dependencies of endpoints that can allocate a lot per request
+SHED_UNDER_PRESSURE = [Depends(_check_memory)]
+
+
+def _resolve(parser: GitParser, revision: str) -> str:
+    """Resolve a revision from the URL (abbreviated SHA, ref, main~3, ...) to a full SHA."""
+    try:
+        sha = parser.resolve_revision(revision)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not sha:
+        raise HTTPException(status_code=404, detail=f"Revision not found: {revision}")
+    return sha
+
+
+def _parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Optional[List[str]]:
+    """Split a comma separated fields= selector, rejecting unknown names."""
+    if fields is None:
+        return None
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid = [f for f in selected if f not in allowed]
+    if invalid or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma separated subset of: {', '.join(allowed)}",
+        )
+    return selected
+
+
+def _commit_rows(commits: List[GitCommit], fields: List[str]) -> List[dict]:
+    return [commit.model_dump(include=set(fields)) for commit in commits]
+
+
+@router.get("/api/repository", response_model=GitRepository, dependencies=SHED_UNDER_PRESSURE)
+async def get_repository(fields: Optional[str] = None):
+    """Get complete repository information.
+
+    Args:
+        fields: Comma separated GitCommit fields to include in each
+            embedded commit, e.g. "sha,parents,message" (default: all)
+    """
+    commit_fields = _parse_fields(fields, COMMIT_FIELDS)
     parser = get_git_parser()
     try:
         repo = parser.parse_repository()
+        if commit_fields:
+            content = repo.model_dump(exclude={"commits"})
+            content["commits"] = _commit_rows(repo.commits, commit_fields)
+            return JSONResponse(content=content)
         return repo
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing repository: {str(e)}")
 
 
 @router.get("/api/branches", response_model=List[GitBranch])
-async def get_branches():
-    """Get all branches in the repository."""
+async def get_branches(tracking: bool = False):
+    """Get all branches in the repository.
+
+    Args:
+        tracking: Fill in ahead/behind counts against each branch's
+            upstream. All branches are counted in one shared history walk.
+    """
     parser = get_git_parser()
     try:
-        branches = parser.get_branches()
+        branches = parser.get_branches(tracking=tracking)
         return branches
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting branches: {str(e)}")
 
 
+@router.get("/api/remotes", response_model=List[GitBranch])
+async def get_remote_branches():
+    """Get all remote-tracking branches (e.g. origin/main)."""
+    parser = get_git_parser()
+    try:
+        return parser.get_remote_branches()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting remote branches: {str(e)}")
+
+
+@router.get("/api/reflog/{ref:path}", response_model=GitReflogPage)
+async def get_reflog(
+    ref: str,
+    cursor: Optional[int] = Query(default=None, ge=0),
+    limit: int = Query(default=50, ge=1, le=1000),
+):
+    """Get a ref's reflog, newest entries first.
+
+    Args:
+        ref: HEAD, a branch, remote-tracking branch, tag or full ref name
+        cursor: next_cursor of the previous page, for older entries
+        limit: Maximum number of entries to return
+    """
+    parser = get_git_parser()
+    try:
+        page = parser.get_reflog(ref, cursor=cursor, limit=limit)
+        if page is None:
+            raise HTTPException(status_code=404, detail=f"No reflog for ref: {ref}")
+        return page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading reflog: {str(e)}")
+
+
 @router.get("/api/tags", response_model=List[GitTag])
-async def get_tags():
-    """Get all tags in the repository."""
+async def get_tags(messages: bool = False):
+    """Get all tags in the repository.
+
+    Args:
+        messages: Include annotated tag messages, which reads every tag
+            object; without it tags are peeled from packed-refs and cache
+    """
     parser = get_git_parser()
     try:
-        tags = parser.get_tags()
+        tags = parser.get_tags(messages=messages)
         return tags
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting tags: {str(e)}")
@@ -97,6 +278,7 @@ async def get_commits(
     since: Optional[int] = None,
     until: Optional[int] = None,
     file: Optional[str] = None,
+    fields: Optional[str] = None,
 ):
     """Get commits from the repository with optional filters.
 
@@ -108,7 +290,9 @@ async def get_commits(
         since: Only commits after this timestamp (unix timestamp)
         until: Only commits before this timestamp (unix timestamp)
         file: Only commits that modified this file path
+        fields: Comma separated GitCommit fields to return (default: all)
     """
+    commit_fields = _parse_fields(fields, COMMIT_FIELDS)
     parser = get_git_parser()
     try:
         branches = parser.get_branches()
@@ -120,29 +304,57 @@ async def get_commits(
                 raise HTTPException(status_code=404, detail=f"Branch not found: {branch}")
             branches = [branch_obj]
 
-        # Get more commits initially if filtering (since filters reduce results)
-        fetch_limit = limit * 3 if (author or search or since or until or file) else limit
-        commits = parser.get_all_commits(branches, max_commits=fetch_limit)
-
-        # Apply filters
         if author or search or since or until or file:
-            commits = parser.filter_commits(
-                commits=commits,
+            # Filters run over the commit store, covering the whole history
+            commits = parser.find_commits(
+                branches,
+                limit,
                 author=author,
                 search=search,
                 since=since,
                 until=until,
                 file_path=file,
             )
+        else:
+            commits = parser.get_all_commits(branches, max_commits=limit)
 
-        # Apply limit after filtering
-        return commits[:limit]
+        if commit_fields:
+            return JSONResponse(content=_commit_rows(commits, commit_fields))
+        return commits
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting commits: {str(e)}")
 
 
+@router.post("/api/commits/batch", response_model=List[GitCommitBatchItem], dependencies=SHED_UNDER_PRESSURE)
+async def get_commits_batch(
+    shas: List[str] = Body(..., embed=True),
+    detail: str = Body("header", embed=True),
+):
+    """Look up many commits in one request.
+
+    Args:
+        shas: Commit SHAs (at most MAX_BATCH_COMMITS); results come back in
+            the same order, with an error per commit that cannot be read
+        detail: "header" (commit only), "stats" (plus added/deleted line
+            totals) or "files" (plus every changed file with its stats)
+    """
+    if detail not in BATCH_DETAIL_LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid detail level: {detail} (expected one of {', '.join(BATCH_DETAIL_LEVELS)})",
+        )
+    if len(shas) > MAX_BATCH_COMMITS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_COMMITS} commits per batch")
+
+    parser = get_git_parser()
+    try:
+        return parser.get_commits_batch(shas, detail)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting commits: {str(e)}")
+
+
 @router.get("/api/commits/{sha}", response_model=GitCommit)
 async def get_commit(sha: str):
     """Get a specific commit by SHA.
@@ -152,7 +364,7 @@ async def get_commit(sha: str):
     """
     parser = get_git_parser()
     try:
-        commit = parser.get_commit(sha)
+        commit = parser.get_commit(_resolve(parser, sha))
         if not commit:
             raise HTTPException(status_code=404, detail=f"Commit not found: {sha}")
         return commit
@@ -162,41 +374,151 @@ async def get_commit(sha: str):
         raise HTTPException(status_code=500, detail=f"Error getting commit: {str(e)}")
 
 
-@router.get("/api/graph", response_model=List[GitGraphNode])
-async def get_commit_graph(limit: int = Query(default=500, ge=1, le=2000), branch: Optional[str] = None):
+@router.get("/api/commits/{sha}/contained-in")
+async def get_commit_contained_in(sha: str):
+    """List the branches, remote-tracking branches and tags that contain a commit.
+
+    Args:
+        sha: Commit SHA-1 hash
+    """
+    parser = get_git_parser()
+    try:
+        sha = _resolve(parser, sha)
+        if not parser.get_commit(sha):
+            raise HTTPException(status_code=404, detail=f"Commit not found: {sha}")
+        return {"sha": sha, **parser.contained_in(sha)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding refs containing commit: {str(e)}")
+
+
+@router.get("/api/graph", response_model=List[GitGraphNode], dependencies=SHED_UNDER_PRESSURE)
+async def get_commit_graph(
+    limit: int = Query(default=500, ge=1, le=2000),
+    branch: Optional[str] = None,
+    fields: Optional[str] = None,
+    encoding: str = Query(default="sha", pattern="^(sha|indexed)$"),
+    abbrev: int = Query(default=40, ge=4, le=40),
+    remotes: bool = True,
+):
     """Get commit graph for visualization.
 
     Args:
         limit: Maximum number of commits to include in graph
         branch: Optional branch name to filter commits
+        fields: Comma separated node fields to return, e.g. "sha,parents"
+            (default: all). Without "message" no commit object is read.
+        encoding: "indexed" returns parents as positions in the response
+            list (-1 when outside it) instead of SHAs
+        abbrev: Number of hex digits of returned SHAs
+        remotes: Include remote-tracking branches (decorated as "remotes").
+            With a local branch filter only its upstream is included; a
+            remote-tracking branch like "origin/main" can be the filter too.
     """
+    node_fields = _parse_fields(fields, GRAPH_FIELDS)
     parser = get_git_parser()
     try:
         branches = parser.get_branches()
+        remote_branches = parser.get_remote_branches() if remotes or branch else []
 
         if branch:
             # Filter to specific branch
             branch_obj = next((b for b in branches if b.name == branch), None)
+            remote_obj = next((b for b in remote_branches if b.name == branch), None)
             if branch_obj:
                 branches = [branch_obj]
+                remote_branches = [b for b in remote_branches if remotes and b.name == branch_obj.upstream]
+            elif remote_obj:
+                branches, remote_branches = [], [remote_obj]
+            elif not remotes:
+                remote_branches = []
             # If branch not found, gracefully show all (no error)
 
-        graph = parser.get_commit_graph(branches=branches, max_commits=limit)
+        if node_fields or encoding == "indexed" or abbrev < 40:
+            rows = parser.get_graph_rows(
+                branches,
+                limit,
+                fields=node_fields or GRAPH_FIELDS,
+                indexed=encoding == "indexed",
+                abbrev=abbrev,
+                remotes=remote_branches,
+            )
+            return JSONResponse(content=rows)
+
+        graph = parser.get_commit_graph(branches=branches, max_commits=limit, remotes=remote_branches)
         return graph
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting commit graph: {str(e)}")
 
 
-@router.get("/api/commits/{sha}/details", response_model=GitCommitDetails)
-async def get_commit_details(sha: str):
+@router.get("/api/graph/window", dependencies=SHED_UNDER_PRESSURE)
+async def get_graph_window(
+    anchor: Optional[str] = None,
+    timestamp: Optional[int] = None,
+    before: int = Query(default=50, ge=0, le=MAX_GRAPH_WINDOW),
+    after: int = Query(default=50, ge=0, le=MAX_GRAPH_WINDOW),
+    fields: Optional[str] = None,
+    abbrev: int = Query(default=40, ge=4, le=40),
+):
+    """Get the slice of the commit graph around a commit or a point in time.
+
+    Scrolling deep into history costs the same per page as the top: the
+    order of all commits is computed once per ref snapshot, and only the
+    window's commits are read. Each node carries its "lane" column, and
+    "lanes_in"/"lanes_out" give the columns entering and leaving the
+    window, so the graph can be drawn without the commits above it.
+
+    Args:
+        anchor: Revision to center on (SHA, ref, main~3, ...)
+        timestamp: Center on the newest commit at or before this unix
+            time instead; one of anchor and timestamp is required
+        before: Number of newer commits to include above the anchor
+        after: Number of older commits to include below the anchor
+        fields: Comma separated node fields to return (default: all).
+            Without "message" no commit object is read.
+        abbrev: Number of hex digits of returned SHAs
+    """
+    if (anchor is None) == (timestamp is None):
+        raise HTTPException(status_code=400, detail="Exactly one of anchor and timestamp is required")
+    node_fields = _parse_fields(fields, GRAPH_FIELDS) or GRAPH_FIELDS
+    parser = get_git_parser()
+    try:
+        sha = _resolve(parser, anchor) if anchor is not None else None
+        try:
+            window = parser.get_graph_window(
+                sha, timestamp, before=before, after=after, fields=node_fields, abbrev=abbrev
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return JSONResponse(content=window)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting graph window: {str(e)}")
+
+
+@router.get("/api/commits/{sha}/details", response_model=GitCommitDetails, dependencies=SHED_UNDER_PRESSURE)
+async def get_commit_details(
+    sha: str,
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    stats: bool = True,
+):
     """Get detailed commit information including file changes.
 
     Args:
         sha: Commit SHA-1 hash
+        offset: Index of the first changed file to return
+        limit: Maximum number of changed files to return (default: all)
+        stats: Compute additions/deletions of the returned files. With
+            stats=false only paths and change types are returned, which
+            costs no more than the tree diff; fetch stats later with
+            POST /api/commits/{sha}/files/stats
     """
     parser = get_git_parser()
     try:
-        details = parser.get_commit_details(sha)
+        details = parser.get_commit_details(_resolve(parser, sha), offset=offset, limit=limit, with_stats=stats)
         if not details:
             raise HTTPException(status_code=404, detail=f"Commit not found: {sha}")
         return details
@@ -206,39 +528,58 @@ async def get_commit_details(sha: str):
         raise HTTPException(status_code=500, detail=f"Error getting commit details: {str(e)}")
 
 
-@router.get("/api/commits/{sha}/files/{file_path:path}")
-async def get_file_diff(sha: str, file_path: str):
-    """Get diff for a specific file in a commit.
+@router.post("/api/commits/{sha}/files/stats", response_model=List[GitFileChange], dependencies=SHED_UNDER_PRESSURE)
+async def get_commit_file_stats(sha: str, paths: List[str] = Body(..., embed=True)):
+    """Compute additions/deletions of selected files changed by a commit.
 
     Args:
         sha: Commit SHA-1 hash
-        file_path: Path to the file
+        paths: File paths; unchanged paths are left out of the result
     """
     parser = get_git_parser()
     try:
-        commit = parser.get_commit(sha)
+        commit = parser.get_commit(_resolve(parser, sha))
         if not commit:
             raise HTTPException(status_code=404, detail=f"Commit not found: {sha}")
+        return parser.file_stats(parser.parent_tree(commit), commit.tree, paths)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing file stats: {str(e)}")
 
-        # Get parent tree (use first parent for merge commits)
-        parent_tree = None
-        if commit.parents:
-            parent_commit = parser.get_commit(commit.parents[0])
-            if parent_commit:
-                parent_tree = parent_commit.tree
 
-        # Get tree contents
-        old_files = parser.object_parser.get_tree_contents(parent_tree) if parent_tree else {}
-        new_files = parser.object_parser.get_tree_contents(commit.tree)
+@router.get("/api/commits/{sha}/files/{file_path:path}", dependencies=SHED_UNDER_PRESSURE)
+async def get_file_diff(
+    sha: str,
+    file_path: str,
+    hunks: Optional[str] = Query(None),
+    word_diff: bool = Query(False),
+):
+    """Get diff for a specific file in a commit.
 
-        old_sha = old_files.get(file_path)
-        new_sha = new_files.get(file_path)
+    Args:
+        sha: Commit SHA-1 hash
+        file_path: Path to the file
+        hunks: Hunk window such as "0-20" (hunks 0 to 19), "20-" or "5";
+            the whole diff is returned when omitted
+        word_diff: Add intra-line word diffs of the returned hunks
+    """
+    parser = get_git_parser()
+    try:
+        commit = parser.get_commit(_resolve(parser, sha))
+        if not commit:
+            raise HTTPException(status_code=404, detail=f"Commit not found: {sha}")
 
+        old_sha, new_sha = parser.path_blobs(parser.parent_tree(commit), commit.tree, file_path)
         if not old_sha and not new_sha:
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
-        diff_data = parser.generate_diff(old_sha, new_sha, file_path)
-        return diff_data
+        if hunks is None and not word_diff:
+            return parser.generate_diff(old_sha, new_sha, file_path)
+        try:
+            return parser.get_diff_hunks(old_sha, new_sha, file_path, hunks or "0-", word_diff)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
     except HTTPException:
         raise
@@ -246,42 +587,174 @@ async def get_file_diff(sha: str, file_path: str):
         raise HTTPException(status_code=500, detail=f"Error getting file diff: {str(e)}")
 
 
-@router.get("/api/commits/{sha1}/compare/{sha2}")
-async def compare_commits(sha1: str, sha2: str):
+@router.get("/api/tree/{sha}", response_model=List[GitTreeEntry])
+@router.get("/api/tree/{sha}/{path:path}", response_model=List[GitTreeEntry])
+async def get_tree(sha: str, path: str = ""):
+    """List a single directory level of a commit or tree.
+
+    Args:
+        sha: Commit or tree SHA-1 hash
+        path: Directory path (empty for the repository root)
+    """
+    parser = get_git_parser()
+    try:
+        entries = parser.list_directory(_resolve(parser, sha), path)
+        if entries is None:
+            raise HTTPException(status_code=404, detail=f"Directory not found: {sha}:{path}")
+        return entries
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing tree: {str(e)}")
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header into an inclusive (start, end) pair.
+
+    Returns None when the whole content should be served. Multi-range and
+    malformed headers are ignored, as RFC 9110 allows.
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+
+    first, last = match.groups()
+    if size == 0:
+        # No byte of an empty blob can be selected, not even by a suffix range
+        raise HTTPException(status_code=416, headers={"Content-Range": "bytes */0"})
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise HTTPException(
+                status_code=416, headers={"Content-Range": f"bytes */{size}"}
+            )
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _slice_chunks(chunks: Iterator[bytes], start: int, length: int) -> Iterator[bytes]:
+    """Yield length bytes starting at start from a chunk stream.
+
+    zlib streams cannot seek, so the bytes before start are inflated and
+    dropped chunk by chunk.
+    """
+    position = 0
+    remaining = length
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            piece = chunk[max(start - position, 0) :]
+            if len(piece) >= remaining:
+                yield piece[:remaining]
+                return
+            yield piece
+            remaining -= len(piece)
+        position = chunk_end
+
+
+@router.get("/api/blob/{sha}/{path:path}")
+async def get_blob(sha: str, path: str, request: Request):
+    """Stream the content of a file in a commit or tree.
+
+    Supports single byte ranges via the Range header. Content is inflated
+    in chunks, so memory per request stays constant for any file size.
+
+    Args:
+        sha: Commit or tree SHA-1 hash
+        path: File path relative to the repository root
+    """
+    parser = get_git_parser()
+    try:
+        blob = parser.open_blob(_resolve(parser, sha), path)
+        if blob is None:
+            raise HTTPException(status_code=404, detail=f"File not found: {sha}:{path}")
+
+        blob_sha, size, chunks = blob
+        headers = {"Accept-Ranges": "bytes", "ETag": f'"{blob_sha}"'}
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+        byte_range = _parse_range(request.headers.get("range"), size)
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+        start, end = byte_range
+        headers["Content-Length"] = str(end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return StreamingResponse(
+            _slice_chunks(chunks, start, end - start + 1),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading blob: {str(e)}")
+
+
+@router.get("/api/commits/{sha1}/compare/{sha2}", dependencies=SHED_UNDER_PRESSURE)
+async def compare_commits(
+    sha1: str,
+    sha2: str,
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    stats: bool = True,
+):
     """Compare two commits and return file differences.
 
     Args:
         sha1: First commit SHA (base)
         sha2: Second commit SHA (compare against)
+        offset: Index of the first changed file to return
+        limit: Maximum number of changed files to return (default: all)
+        stats: Compute additions/deletions of the returned files (see
+            POST /api/commits/{sha1}/compare/{sha2}/stats)
 
     Returns:
         Comparison data including both commits, files changed, and stats
     """
     parser = get_git_parser()
     try:
-        commit1 = parser.get_commit(sha1)
-        commit2 = parser.get_commit(sha2)
+        commit1 = parser.get_commit(_resolve(parser, sha1))
+        commit2 = parser.get_commit(_resolve(parser, sha2))
 
         if not commit1:
             raise HTTPException(status_code=404, detail=f"Commit not found: {sha1}")
         if not commit2:
             raise HTTPException(status_code=404, detail=f"Commit not found: {sha2}")
 
-        # Compare trees
-        files = parser.compare_trees(commit1.tree, commit2.tree)
+        # Compare trees; only the requested page is diffed
+        changes = parser.tree_changes(commit1.tree, commit2.tree)
+        page = changes[offset : offset + limit if limit is not None else None]
+        files = parser.describe_changes(page, with_stats=stats)
 
         # Calculate stats
-        stats = {
-            "files_changed": len(files),
-            "additions": sum(f.additions for f in files),
-            "deletions": sum(f.deletions for f in files),
-        }
+        totals = {"files_changed": len(changes)}
+        if stats and len(page) == len(changes):
+            totals["additions"] = sum(f.additions for f in files)
+            totals["deletions"] = sum(f.deletions for f in files)
 
         return {
             "commit1": commit1,
             "commit2": commit2,
             "files": files,
-            "stats": stats,
+            "stats": totals,
+            "incomplete": any(f.incomplete for f in files),
         }
     except HTTPException:
         raise
@@ -289,6 +762,182 @@ async def compare_commits(sha1: str, sha2: str):
         raise HTTPException(status_code=500, detail=f"Error comparing commits: {str(e)}")
 
 
+@router.post("/api/commits/{sha1}/compare/{sha2}/stats", response_model=List[GitFileChange], dependencies=SHED_UNDER_PRESSURE)
+async def get_compare_file_stats(sha1: str, sha2: str, paths: List[str] = Body(..., embed=True)):
+    """Compute additions/deletions of selected files between two commits.
+
+    Args:
+        sha1: First commit SHA (base)
+        sha2: Second commit SHA (compare against)
+        paths: File paths; unchanged paths are left out of the result
+    """
+    parser = get_git_parser()
+    try:
+        commit1 = parser.get_commit(_resolve(parser, sha1))
+        commit2 = parser.get_commit(_resolve(parser, sha2))
+        if not commit1:
+            raise HTTPException(status_code=404, detail=f"Commit not found: {sha1}")
+        if not commit2:
+            raise HTTPException(status_code=404, detail=f"Commit not found: {sha2}")
+        return parser.file_stats(commit1.tree, commit2.tree, paths)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing file stats: {str(e)}")
+
+
+def _stats_branches(parser: GitParser, branch: Optional[str]):
+    branches = parser.get_branches()
+    if branch:
+        branch_obj = next((b for b in branches if b.name == branch), None)
+        if not branch_obj:
+            raise HTTPException(status_code=404, detail=f"Branch not found: {branch}")
+        branches = [branch_obj]
+    return branches
+
+
+@router.get("/api/stats/activity", dependencies=SHED_UNDER_PRESSURE)
+async def get_activity_stats(
+    group_by: str = "week",
+    branch: Optional[str] = None,
+    author: Optional[str] = None,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    file: Optional[str] = None,
+):
+    """Count commits grouped by author, week, weekday and/or hour.
+
+    Args:
+        group_by: Comma separated dimensions, e.g. "author,week" or "weekday,hour"
+        branch: Optional branch name (default: all branches)
+        author: Filter by author name or email (case-insensitive substring match)
+        since: Only commits after this timestamp (unix timestamp)
+        until: Only commits before this timestamp (unix timestamp)
+        file: Only commits that modified this path
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    invalid = [d for d in dimensions if d not in DIMENSIONS]
+    if not dimensions or invalid or len(set(dimensions)) != len(dimensions):
+        raise HTTPException(
+            status_code=400,
+            detail=f"group_by must be distinct values of: {', '.join(DIMENSIONS)}",
+        )
+
+    parser = get_git_parser()
+    try:
+        branches = _stats_branches(parser, branch)
+        buckets = parser.get_activity(
+            branches, dimensions, author=author, since=since, until=until, file_path=file
+        )
+        return {
+            "group_by": dimensions,
+            "total": sum(b["commits"] for b in buckets),
+            "buckets": buckets,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing activity: {str(e)}")
+
+
+@router.get("/api/stats/authors", dependencies=SHED_UNDER_PRESSURE)
+async def get_author_stats(
+    branch: Optional[str] = None,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    file: Optional[str] = None,
+):
+    """Summarize contributors: commit counts, first/last commit and active weeks.
+
+    Args:
+        branch: Optional branch name (default: all branches)
+        since: Only commits after this timestamp (unix timestamp)
+        until: Only commits before this timestamp (unix timestamp)
+        file: Only commits that modified this path
+    """
+    parser = get_git_parser()
+    try:
+        branches = _stats_branches(parser, branch)
+        return parser.get_author_stats(branches, since=since, until=until, file_path=file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing author stats: {str(e)}")
+
+
+@router.get("/api/compare", dependencies=SHED_UNDER_PRESSURE)
+async def compare_branches(base: str, heads: Optional[str] = None):
+    """Ahead/behind counts of many branches against one base.
+
+    All branches are counted in one shared history walk.
+
+    Args:
+        base: Base ref (branch, tag, HEAD or commit SHA)
+        heads: Comma separated refs to compare (default: all branches)
+    """
+    parser = get_git_parser()
+    try:
+        base_sha = _resolve(parser, base)
+
+        if heads:
+            names = [h.strip() for h in heads.split(",") if h.strip()]
+        else:
+            names = [b.name for b in parser.get_branches()]
+        shas = [_resolve(parser, name) for name in names]
+
+        counts = parser.ahead_behind(base_sha, shas)
+        return {
+            "base": base,
+            "base_sha": base_sha,
+            "heads": [
+                {"name": name, "sha": sha, **count}
+                for name, sha, count in zip(names, shas, counts)
+            ],
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error comparing branches: {str(e)}")
+
+
+@router.get("/api/compare/{spec:path}", dependencies=SHED_UNDER_PRESSURE)
+async def compare_refs(spec: str, limit: int = Query(default=250, ge=0, le=1000)):
+    """Compare two refs given as "base...head" (or "base..head").
+
+    Args:
+        spec: Base and head revisions (refs, SHAs or expressions like
+            main~2; an empty side means HEAD)
+        limit: Maximum number of commits listed from the head side
+
+    Returns:
+        Merge bases, ahead/behind counts and the commits only in head
+    """
+    parts = split_range(spec)
+    if parts is None:
+        raise HTTPException(status_code=400, detail="Expected a range like main...feature")
+    ref_a, _, ref_b = parts
+
+    parser = get_git_parser()
+    try:
+        shas = [_resolve(parser, ref) for ref in (ref_a, ref_b)]
+
+        return {
+            "base": ref_a,
+            "head": ref_b,
+            "base_sha": shas[0],
+            "head_sha": shas[1],
+            **parser.compare_refs(shas[0], shas[1], limit=limit),
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error comparing refs: {str(e)}")
+
+
 @router.get("/api/info")
 async def get_info():
     """Get basic repository information."""
@@ -298,15 +947,12 @@ async def get_info():
         tags = parser.get_tags()
         current_branch = parser.get_current_branch()
 
-        # Count total commits (limited sample)
-        sample_commits = parser.get_all_commits(branches, max_commits=100)
-
         return {
             "path": str(parser.repo_path),
             "current_branch": current_branch,
             "branch_count": len(branches),
             "tag_count": len(tags),
-            "recent_commits": len(sample_commits),
+            **parser.get_summary(),
             "branches": [{"name": b.name, "is_current": b.is_current} for b in branches],
         }
     except Exception as e:
@@ -356,37 +1002,123 @@ async def commit_changes(message: str = Body(..., embed=True)):
         raise HTTPException(status_code=500, detail=f"Error committing: {str(e)}")
 
 
-@router.post("/api/push")
+def _queue_job(kind: str) -> JSONResponse:
+    job = get_job_queue().submit(kind)
+    return JSONResponse(
+        status_code=202,
+        content={"status": "queued", "message": f"Queued {kind} job {job.id}", "job": job.to_dict()},
+    )
+
+
+@router.post("/api/push", status_code=202)
 async def push_changes():
-    """Push changes to remote."""
-    client = get_git_client()
-    try:
-        client.push()
-        return {"status": "success", "message": "Pushed to remote"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error pushing: {str(e)}")
+    """Push changes to remote in a background job."""
+    return _queue_job("push")
 
 
-@router.post("/api/pull")
+@router.post("/api/pull", status_code=202)
 async def pull_changes():
-    """Pull changes from remote."""
-    client = get_git_client()
-    try:
-        client.pull()
-        return {"status": "success", "message": "Pulled from remote"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error pulling: {str(e)}")
+    """Pull changes from remote in a background job."""
+    return _queue_job("pull")
 
 
-@router.post("/api/fetch")
+@router.post("/api/fetch", status_code=202)
 async def fetch_changes():
-    """Fetch changes from remote."""
-    client = get_git_client()
-    try:
-        client.fetch()
-        return {"status": "success", "message": "Fetched from remote"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching: {str(e)}")
+    """Fetch changes from remote in a background job."""
+    return _queue_job("fetch")
+
+
+@router.post("/api/jobs", status_code=202)
+async def create_job(kind: str = Body(..., embed=True)):
+    """Queue a fetch, pull or push job.
+
+    Jobs run one at a time; follow one with GET /api/jobs/{id}/events.
+
+    Args:
+        kind: "fetch", "pull" or "push"
+    """
+    if kind not in JOB_COMMANDS:
+        raise HTTPException(
+            status_code=400, detail=f"kind must be one of: {', '.join(JOB_COMMANDS)}"
+        )
+    return _queue_job(kind)
+
+
+@router.get("/api/jobs")
+async def list_jobs():
+    """List queued, running and recently finished jobs, oldest first."""
+    return [job.to_dict() for job in get_job_queue().list()]
+
+
+@router.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a job's status and all output lines so far."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict(with_output=True)
+
+
+@router.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job, terminating its git process."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    # Waiting for git to exit blocks, so it happens off the event loop
+    if not await run_in_threadpool(job.cancel):
+        raise HTTPException(status_code=409, detail=f"Job already finished: {job_id}")
+    return job.to_dict()
+
+
+@router.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream a job's progress as server-sent events.
+
+    Every output line is sent as a "progress" event (earlier lines first,
+    so clients can connect at any time), followed by one "end" event with
+    the final job status.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def events():
+        # The worker thread wakes this stream through the event loop, so an
+        # idle stream holds no threadpool thread while it waits
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:  # Loop closed after the client went away
+                pass
+
+        job.watch(wake)
+        try:
+            seen = 0
+            while True:
+                # Cleared before reading, so a change made after the read sets it again
+                changed.clear()
+                lines, finished = job.output_since(seen)
+                for line in lines:
+                    yield f"event: progress\ndata: {json.dumps({'line': line})}\n\n"
+                seen += len(lines)
+                if finished and not lines:
+                    yield f"event: end\ndata: {json.dumps(job.to_dict())}\n\n"
+                    return
+                if not lines:
+                    try:
+                        await asyncio.wait_for(changed.wait(), JOB_EVENTS_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+        finally:
+            job.unwatch(wake)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
 
 
 @router.post("/api/branches")
@@ -1,30 +1,75 @@
 """FastAPI server for Git browser."""
 
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from .routes import router, set_git_parser, set_git_client
-from ..git_parser.parser import GitParser
+from .. import metrics, tracing
+from .middleware import MetricsMiddleware, TracingMiddleware
+from .jobs import JobQueue
+from .routes import router, set_git_parser, set_git_client, set_job_queue, set_warmup
+from .warmup import Warmup, default_warmup
+from ..git_parser.parser import (
+    GitParser,
+    DEFAULT_DIFF_DEADLINE,
+    DEFAULT_DIFF_MAX_BYTES,
+    DEFAULT_DIFF_MAX_LINES,
+    DEFAULT_DIFF_WORKERS,
+)
 from ..git_client import GitClient
 
 
-def create_app(repo_path: str) -> FastAPI:
+def create_app(
+    repo_path: str,
+    diff_max_bytes: int = DEFAULT_DIFF_MAX_BYTES,
+    diff_max_lines: int = DEFAULT_DIFF_MAX_LINES,
+    diff_workers: int = DEFAULT_DIFF_WORKERS,
+    diff_deadline: float = DEFAULT_DIFF_DEADLINE,
+    memory_limit: Optional[int] = None,
+    enable_metrics: bool = False,
+    enable_tracing: bool = False,
+    slow_request_ms: float = tracing.DEFAULT_SLOW_REQUEST_MS,
+    allow_profiling: bool = False,
+    enable_warmup: bool = False,
+) -> FastAPI:
     """Create and configure the FastAPI application.
 
     Args:
         repo_path: Path to the Git repository
+        diff_max_bytes: Largest blob size that is diffed line by line
+        diff_max_lines: Largest blob line count that is diffed line by line
+        diff_workers: Worker processes for diffing commits with many changed files
+        diff_deadline: Seconds after which unfinished file stats are marked incomplete
+        memory_limit: Bytes the server should stay under (default: unlimited)
+        enable_metrics: Collect metrics and expose them at /api/metrics
+        enable_tracing: Record per-request spans and log slow requests
+        slow_request_ms: Requests slower than this log their span breakdown
+        allow_profiling: Serve sampling profiles for requests with ?profile=1
+        enable_warmup: Preload caches in a background thread once the server starts
 
     Returns:
         Configured FastAPI application
     """
+    warmup: Optional[Warmup] = None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Warm-up runs in a thread so startup (and socket binding) never waits on it
+        if warmup is not None:
+            warmup.start()
+        yield
+        parser.close()
+
     app = FastAPI(
         title="Git Browser API",
         description="REST API for browsing Git repository history",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Configure CORS
@@ -36,13 +81,40 @@ def create_app(repo_path: str) -> FastAPI:
         allow_headers=["*"],
     )
 
+    if enable_metrics:
+        metrics.enable()
+        app.add_middleware(MetricsMiddleware, routes=[router.routes, app.router.routes])
+
+    if enable_tracing or allow_profiling:
+        if enable_tracing:
+            tracing.enable()
+        app.add_middleware(
+            TracingMiddleware,
+            slow_request_ms=slow_request_ms,
+            trace=enable_tracing,
+            allow_profiling=allow_profiling,
+        )
+
     # Initialize Git parser and client
     try:
-        parser = GitParser(repo_path)
+        parser = GitParser(
+            repo_path,
+            diff_max_bytes=diff_max_bytes,
+            diff_max_lines=diff_max_lines,
+            diff_workers=diff_workers,
+            diff_deadline=diff_deadline,
+            memory_limit=memory_limit,
+        )
         set_git_parser(parser)
         
         client = GitClient(repo_path)
         set_git_client(client)
+        # Fetched or pulled refs are indexed before the job reports completion
+        set_job_queue(JobQueue(client, on_finish=lambda job: parser.refresh()))
+
+        if enable_warmup:
+            warmup = default_warmup(parser)
+        set_warmup(warmup)
         
         print(f"✓ Git repository loaded: {parser.repo_path}")
         print(f"✓ Current branch: {parser.get_current_branch()}")
@@ -0,0 +1,83 @@
+"""Background cache warm-up after server start."""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..git_parser.parser import GitParser
+
+# Matches the default page size of /api/graph
+GRAPH_PAGE_SIZE = 500
+
+
+class Warmup:
+    """Run warm-up steps in a daemon thread and report their progress."""
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Any]]]):
+        self._steps = steps
+        self._lock = threading.Lock()
+        self._status: Dict[str, Dict[str, Any]] = {
+            name: {"name": name, "status": "pending", "duration_ms": None, "error": None}
+            for name, _ in steps
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="git-browser-warmup", daemon=True)
+        self._thread.start()
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def _run(self):
+        for name, step in self._steps:
+            self._set(name, status="running")
+            start = time.perf_counter()
+            try:
+                step()
+                self._set(name, status="done", duration_ms=(time.perf_counter() - start) * 1000)
+            except Exception as e:
+                self._set(
+                    name,
+                    status="failed",
+                    duration_ms=(time.perf_counter() - start) * 1000,
+                    error=str(e),
+                )
+                print(f"⚠ Warm-up step {name} failed: {e}")
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = [dict(self._status[name]) for name, _ in self._steps]
+        done = sum(1 for step in steps if step["status"] in ("done", "failed"))
+        return {
+            "ready": done == len(steps),
+            "progress": done / len(steps) if steps else 1.0,
+            "steps": steps,
+        }
+
+
+def default_warmup(parser: GitParser) -> Warmup:
+    """Warm-up preloading refs, pack indexes, the first graph page and HEAD's tree."""
+
+    def refs():
+        parser.get_branches()
+        parser.get_tags()
+
+    def pack_index():
+        for pack in parser.object_parser.packs.packs:
+            pack.index.preload()
+
+    def graph():
+        parser.get_commit_graph(max_commits=GRAPH_PAGE_SIZE)
+
+    def head_tree():
+        head = next((b.commit_sha for b in parser.get_branches() if b.is_current), None)
+        if head:
+            parser.list_directory(head)
+
+    return Warmup(
+        [("refs", refs), ("pack_index", pack_index), ("graph", graph), ("head_tree", head_tree)]
+    )
@@ -2,12 +2,24 @@
 
 import os
 import sys
+import time
 import argparse
+import threading
 import webbrowser
 from pathlib import Path
-import uvicorn
 
-from .api.server import create_app
+# uvicorn, FastAPI and the parser are imported inside main() once arguments are
+# parsed, so --help and argument errors return immediately
+from .git_parser.defaults import (
+    DEFAULT_DIFF_DEADLINE,
+    DEFAULT_DIFF_MAX_BYTES,
+    DEFAULT_DIFF_MAX_LINES,
+    DEFAULT_DIFF_WORKERS,
+)
+from .git_parser.memory import parse_size
+
+# How long to wait for the server socket before opening the browser anyway
+BROWSER_WAIT_SECONDS = 30.0
 
 
 def find_git_repo(start_path: str = ".") -> Path:
@@ -34,8 +46,110 @@ def find_git_repo(start_path: str = ".") -> Path:
     raise ValueError("Not a git repository (or any parent up to mount point)")
 
 
+def open_browser_when_ready(server, url: str):
+    """Open the browser once the uvicorn server is accepting connections."""
+    deadline = time.monotonic() + BROWSER_WAIT_SECONDS
+    while not server.started and not server.should_exit and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if not server.should_exit:
+        open_browser(url)
+
+
+def open_browser(url: str):
+    """Open the web UI in the default browser."""
+    try:
+        webbrowser.open(url)
+        print(f"✓ Opening browser at {url}")
+    except Exception as e:
+        print(f"⚠ Could not open browser automatically: {e}")
+        print(f"  Please open {url} manually in your browser")
+
+
+def export_main(argv):
+    """Entry point of ``git-browser export``."""
+    parser = argparse.ArgumentParser(
+        prog="git-browser export",
+        description="Export history as static, sharded JSON that the web UI can load without a server",
+    )
+    parser.add_argument(
+        "path", nargs="?", default=".", help="Path to Git repository (default: current directory)"
+    )
+    parser.add_argument(
+        "-o", "--output", default="git-browser-export", help="Output directory (default: git-browser-export)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_DIFF_WORKERS,
+        help=f"Processes exporting commits and diffs, 1 to export inline (default: {DEFAULT_DIFF_WORKERS})",
+    )
+    parser.add_argument(
+        "--diff-max-bytes",
+        type=int,
+        default=DEFAULT_DIFF_MAX_BYTES,
+        help=f"Skip line diffs of files larger than this (default: {DEFAULT_DIFF_MAX_BYTES})",
+    )
+    parser.add_argument(
+        "--diff-max-lines",
+        type=int,
+        default=DEFAULT_DIFF_MAX_LINES,
+        help=f"Skip line diffs of files with more lines (default: {DEFAULT_DIFF_MAX_LINES})",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        repo_path = find_git_repo(args.path)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    from .export import export_repository
+
+    start = time.perf_counter()
+    try:
+        counts = export_repository(
+            str(repo_path),
+            args.output,
+            workers=args.workers,
+            diff_max_bytes=args.diff_max_bytes,
+            diff_max_lines=args.diff_max_lines,
+        )
+    except Exception as e:
+        print(f"Error: Export failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"✓ Exported {repo_path} to {args.output} in {time.perf_counter() - start:.1f}s: "
+        f"{counts['commits']} commits, {counts['pages']} new graph pages, "
+        f"{counts['commit_shards']} new commits, {counts['diff_shards']} new diffs"
+    )
+
+
+def _headless(name: str):
+    """Entry point of a query command, imported only when it runs."""
+
+    def run_command(argv):
+        from . import commands
+
+        commands.run(getattr(commands, f"{name}_main"), argv)
+
+    return run_command
+
+
+# Subcommands; anything else is treated as the repository path of the server
+SUBCOMMANDS = {
+    "export": export_main,
+    "log": _headless("log"),
+    "show": _headless("show"),
+    "graph": _headless("graph"),
+}
+
+
 def main():
     """Main entry point for the CLI."""
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="Git Browser - Visual Git history explorer",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -45,6 +159,10 @@ Examples:
   git-browser /path/to/repo    # Start browser for specific repository
   git-browser --port 8080      # Use custom port
   git-browser --no-browser     # Don't open browser automatically
+  git-browser export -o site   # Write a static export of the history to site/
+  git-browser log --json -n 20 # Print commits without starting the server
+  git-browser show HEAD --stat # Show a commit and its changed files
+  git-browser graph --ndjson   # Stream the commit graph, one node per line
         """,
     )
 
@@ -66,6 +184,68 @@ Examples:
 
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
 
+    parser.add_argument(
+        "--diff-max-bytes",
+        type=int,
+        default=DEFAULT_DIFF_MAX_BYTES,
+        help=f"Skip line diffs of files larger than this (default: {DEFAULT_DIFF_MAX_BYTES})",
+    )
+
+    parser.add_argument(
+        "--diff-max-lines",
+        type=int,
+        default=DEFAULT_DIFF_MAX_LINES,
+        help=f"Skip line diffs of files with more lines (default: {DEFAULT_DIFF_MAX_LINES})",
+    )
+
+    parser.add_argument(
+        "--diff-workers",
+        type=int,
+        default=DEFAULT_DIFF_WORKERS,
+        help=f"Processes diffing commits with many changed files, 1 to diff inline (default: {DEFAULT_DIFF_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--diff-deadline",
+        type=float,
+        default=DEFAULT_DIFF_DEADLINE,
+        help=f"Seconds before unfinished file stats are returned as incomplete (default: {DEFAULT_DIFF_DEADLINE:g})",
+    )
+
+    parser.add_argument(
+        "--memory-limit",
+        type=parse_size,
+        default=None,
+        help="Memory the server should stay under, e.g. 2G; half is shared by caches (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--metrics", action="store_true", help="Expose Prometheus metrics at /api/metrics"
+    )
+
+    parser.add_argument(
+        "--trace", action="store_true", help="Log a span breakdown of slow requests"
+    )
+
+    parser.add_argument(
+        "--trace-slow-ms",
+        type=float,
+        default=1000.0,
+        help="Slow request threshold for --trace in milliseconds (default: 1000)",
+    )
+
+    parser.add_argument(
+        "--profiling",
+        action="store_true",
+        help="Allow ?profile=1 on any request to get a sampled flamegraph stack dump",
+    )
+
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Don't preload refs, pack indexes and the first graph page in the background",
+    )
+
     args = parser.parse_args()
 
     # Find the Git repository
@@ -77,9 +257,24 @@ Examples:
         print("Please run this command from within a Git repository.", file=sys.stderr)
         sys.exit(1)
 
+    import uvicorn
+    from .api.server import create_app
+
     # Create the FastAPI app
     try:
-        app = create_app(str(repo_path))
+        app = create_app(
+            str(repo_path),
+            diff_max_bytes=args.diff_max_bytes,
+            diff_max_lines=args.diff_max_lines,
+            diff_workers=args.diff_workers,
+            diff_deadline=args.diff_deadline,
+            memory_limit=args.memory_limit,
+            enable_metrics=args.metrics,
+            enable_tracing=args.trace,
+            slow_request_ms=args.trace_slow_ms,
+            allow_profiling=args.profiling,
+            enable_warmup=not args.no_warmup,
+        )
     except Exception as e:
         print(f"Error: Failed to initialize Git browser: {e}", file=sys.stderr)
         sys.exit(1)
@@ -98,18 +293,21 @@ Examples:
     print("Press CTRL+C to stop the server")
     print()
 
-    # Open browser unless --no-browser is specified
-    if not args.no_browser:
-        try:
-            webbrowser.open(url)
-            print(f"✓ Opening browser at {url}")
-        except Exception as e:
-            print(f"⚠ Could not open browser automatically: {e}")
-            print(f"  Please open {url} manually in your browser")
-
-    # Start the server
+    # Start the server; the browser opens once the socket is bound
     try:
-        uvicorn.run(app, host=args.host, port=args.port, log_level="info", reload=args.reload)
+        if args.reload:
+            if not args.no_browser:
+                open_browser(url)
+            uvicorn.run(app, host=args.host, port=args.port, log_level="info", reload=True)
+        else:
+            server = uvicorn.Server(
+                uvicorn.Config(app, host=args.host, port=args.port, log_level="info")
+            )
+            if not args.no_browser:
+                threading.Thread(
+                    target=open_browser_when_ready, args=(server, url), daemon=True
+                ).start()
+            server.run()
     except KeyboardInterrupt:
         print("\n\nShutting down Git Browser...")
         sys.exit(0)
@@ -0,0 +1,229 @@
+"""Headless query commands: ``git-browser log``, ``show`` and ``graph``.
+
+They call GitParser directly, so they share its persisted commit store and
+never import FastAPI or uvicorn and start quickly enough for hooks and
+CI jobs. Output goes to stdout as text, JSON or NDJSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional
+
+from .git_parser.models import GitAuthor, GitBranch
+from .git_parser.parser import GRAPH_FIELDS, GitParser
+
+
+def _open_parser(repo: str) -> GitParser:
+    from .cli import find_git_repo
+
+    try:
+        return GitParser(str(find_git_repo(repo)), diff_workers=1)
+    except ValueError as e:
+        _fail(str(e))
+
+
+def _fail(message: str):
+    print(f"Error: {message}", file=sys.stderr)
+    sys.exit(1)
+
+
+def _resolve(parser: GitParser, revision: str) -> str:
+    try:
+        sha = parser.resolve_revision(revision)
+    except ValueError as e:
+        _fail(str(e))
+    if not sha:
+        _fail(f"Unknown revision: {revision}")
+    return sha
+
+
+def _start_points(parser: GitParser, revision: Optional[str], branch: Optional[str]) -> List[GitBranch]:
+    if revision:
+        return [GitBranch(name=revision, commit_sha=_resolve(parser, revision))]
+    branches = parser.get_branches()
+    if branch:
+        branches = [b for b in branches if b.name == branch]
+        if not branches:
+            _fail(f"Branch not found: {branch}")
+    return branches
+
+
+def _format_date(author: GitAuthor) -> str:
+    """Author date in the author's time zone, like git's default format."""
+    tz = author.timezone
+    try:
+        sign = -1 if tz.startswith("-") else 1
+        offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5])) * sign
+    except ValueError:
+        offset = timedelta(0)
+    local = datetime.fromtimestamp(author.timestamp, timezone(offset))
+    return f"{local.strftime('%a %b %d %H:%M:%S %Y')} {tz}"
+
+
+def _dump(obj: Any) -> str:
+    data = obj.model_dump() if hasattr(obj, "model_dump") else obj
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _write_json_array(items: Iterable[Any]):
+    """Write a JSON array one element at a time."""
+    sys.stdout.write("[")
+    for i, item in enumerate(items):
+        sys.stdout.write(("," if i else "") + _dump(item))
+    sys.stdout.write("]\n")
+
+
+def _add_repo_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-C", "--repo", default=".", help="Path to Git repository (default: current directory)"
+    )
+
+
+def log_main(argv):
+    """Entry point of ``git-browser log``."""
+    parser = argparse.ArgumentParser(prog="git-browser log", description="List commits")
+    parser.add_argument("revision", nargs="?", help="Start from this revision (default: all branches)")
+    _add_repo_argument(parser)
+    parser.add_argument("-n", "--max-count", type=int, default=100, help="Maximum number of commits (default: 100)")
+    parser.add_argument("--branch", help="Only commits of this branch")
+    parser.add_argument("--author", help="Filter by author name or email (case-insensitive)")
+    parser.add_argument("--grep", help="Search in commit messages (case-insensitive)")
+    parser.add_argument("--since", type=int, help="Only commits after this unix timestamp")
+    parser.add_argument("--until", type=int, help="Only commits before this unix timestamp")
+    parser.add_argument("--file", help="Only commits that modified this path")
+    parser.add_argument("--json", action="store_true", help="Print a JSON array of commits")
+    parser.add_argument("--ndjson", action="store_true", help="Print one JSON commit per line")
+    args = parser.parse_args(argv)
+
+    git = _open_parser(args.repo)
+    start = _start_points(git, args.revision, args.branch)
+    if args.author or args.grep or args.since or args.until or args.file:
+        commits = git.find_commits(
+            start,
+            args.max_count,
+            author=args.author,
+            search=args.grep,
+            since=args.since,
+            until=args.until,
+            file_path=args.file,
+        )
+    else:
+        commits = git.get_all_commits(start, max_commits=args.max_count)
+
+    if args.json:
+        _write_json_array(commits)
+    elif args.ndjson:
+        for commit in commits:
+            print(_dump(commit))
+    else:
+        for commit in commits:
+            date = datetime.fromtimestamp(commit.author.timestamp, timezone.utc).strftime("%Y-%m-%d")
+            print(f"{commit.sha[:7]} {date} {commit.author.name}  {commit.message}")
+
+
+def show_main(argv):
+    """Entry point of ``git-browser show``."""
+    parser = argparse.ArgumentParser(prog="git-browser show", description="Show a commit")
+    parser.add_argument("revision", nargs="?", default="HEAD", help="Commit to show (default: HEAD)")
+    _add_repo_argument(parser)
+    parser.add_argument("--stat", action="store_true", help="Include changed files with line counts")
+    parser.add_argument("--json", action="store_true", help="Print the commit (and files) as JSON")
+    args = parser.parse_args(argv)
+
+    git = _open_parser(args.repo)
+    sha = _resolve(git, args.revision)
+    if args.stat:
+        details = git.get_commit_details(sha, with_stats=True)
+        if details is None:
+            _fail(f"Not a commit: {args.revision}")
+        commit = details.commit
+    else:
+        details = None
+        commit = git.get_commit(sha)
+        if commit is None:
+            _fail(f"Not a commit: {args.revision}")
+
+    if args.json:
+        print(_dump(details or commit))
+        return
+
+    print(f"commit {commit.sha}")
+    if len(commit.parents) > 1:
+        print("Merge: " + " ".join(parent[:7] for parent in commit.parents))
+    print(f"Author: {commit.author.name} <{commit.author.email}>")
+    print(f"Date:   {_format_date(commit.author)}")
+    print()
+    for line in commit.full_message.split("\n"):
+        print(f"    {line}".rstrip())
+    if details is None:
+        return
+
+    print()
+    width = max((len(f.path) for f in details.files), default=0)
+    count_width = max((len(str(f.additions + f.deletions)) for f in details.files), default=0)
+    for f in details.files:
+        if f.is_binary:
+            change = "Bin"
+        elif f.too_large:
+            change = "(not diffed)"
+        else:
+            bar = "+" * min(f.additions, 40) + "-" * min(f.deletions, 40)
+            change = f"{str(f.additions + f.deletions).rjust(count_width)} {bar}"
+        print(f" {f.path.ljust(width)} | {change}")
+    stats = details.stats
+    print(
+        f" {stats['files_changed']} files changed, "
+        f"{stats.get('additions', 0)} insertions(+), {stats.get('deletions', 0)} deletions(-)"
+    )
+
+
+def graph_main(argv):
+    """Entry point of ``git-browser graph``."""
+    parser = argparse.ArgumentParser(prog="git-browser graph", description="Print the commit graph")
+    _add_repo_argument(parser)
+    parser.add_argument("-n", "--max-count", type=int, default=500, help="Maximum number of commits (default: 500)")
+    parser.add_argument("--branch", help="Only commits of this branch")
+    parser.add_argument(
+        "--fields",
+        default=",".join(GRAPH_FIELDS),
+        help="Comma separated node fields (default: all; without message no commit is read)",
+    )
+    parser.add_argument("--indexed", action="store_true", help="Parents as positions in the output")
+    parser.add_argument("--abbrev", type=int, default=40, help="Hex digits of SHAs (default: 40)")
+    parser.add_argument("--ndjson", action="store_true", help="Print one node per line instead of a JSON array")
+    parser.add_argument("--no-remotes", action="store_true", help="Leave out remote-tracking branches")
+    args = parser.parse_args(argv)
+
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()]
+    invalid = [f for f in fields if f not in GRAPH_FIELDS]
+    if invalid or not fields:
+        _fail(f"--fields must be a comma separated subset of: {', '.join(GRAPH_FIELDS)}")
+
+    git = _open_parser(args.repo)
+    rows = git.get_graph_rows(
+        _start_points(git, None, args.branch),
+        args.max_count,
+        fields=fields,
+        indexed=args.indexed,
+        abbrev=max(4, min(args.abbrev, 40)),
+        remotes=[] if args.branch or args.no_remotes else git.get_remote_branches(),
+    )
+    if args.ndjson:
+        for row in rows:
+            print(_dump(row))
+    else:
+        _write_json_array(rows)
+
+
+def run(command, argv):
+    """Run a command, exiting quietly when stdout is closed early (e.g. by head)."""
+    try:
+        command(argv)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,241 @@
+"""Static export of repository history to sharded JSON files.
+
+The export directory can be served by any static file server (or opened
+from disk) and read by the frontend without a running backend:
+
+- ``manifest.json``: refs, repository summary and the list of graph pages,
+  newest first
+- ``graph/<digest>.ndjson``: one graph node per line, up to PAGE_SIZE commits
+  per page
+- ``commits/<sha[:2]>/<sha>.json``: commit details like /api/commits/{sha}/details,
+  plus a "diffs" map from file path to its diff shard
+- ``diffs/<key[:2]>/<key>.json``: one file diff like /api/commits/{sha}/files/{path}
+
+Graph nodes are in the display order of the graph view: newest first by
+corrected commit date (see git_parser/history.py), which is topological.
+Reading pages in manifest order therefore yields the graph page by page,
+and the first page holds the newest history. Pages are cut from the
+oldest commit up, so the newest page is the only one holding fewer than
+PAGE_SIZE commits. A page's name is a digest of the commit SHAs it holds.
+On later exports, pages whose file already exists are skipped without
+reading a single commit. New commits normally sort above all others, so
+only the newest page and the pages added above it are written. A commit
+whose corrected date falls below existing ones (such as an old branch
+fetched later) shifts every page above it, and those pages are written
+again. Commit and diff shards are named after their content too, so
+existing ones are never rewritten.
+
+Commits are exported by a pool of worker processes that each open their
+own GitParser, so object reads and diffs both run in parallel.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .git_parser.models import GitCommitDetails, GitFileChange
+from .git_parser.parser import GitParser
+
+EXPORT_VERSION = 2
+# Commits per graph page
+PAGE_SIZE = 1000
+# Commits handed to a worker at a time
+EXPORT_CHUNK = 64
+
+# Per-process state of export workers
+_parser: Optional[GitParser] = None
+_out: Optional[Path] = None
+
+
+def _write_json(path: Path, data: Any, ndjson: bool = False):
+    """Write a file atomically, so an interrupted export leaves no partial shard."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        if ndjson:
+            for row in data:
+                f.write(json.dumps(row, separators=(",", ":")))
+                f.write("\n")
+        else:
+            json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def diff_shard(old_sha: Optional[str], new_sha: Optional[str], path: str) -> str:
+    """Relative path of the shard holding the diff of a blob pair at a path."""
+    key = hashlib.sha1(f"{old_sha or ''}:{new_sha or ''}:{path}".encode("utf-8")).hexdigest()
+    return f"diffs/{key[:2]}/{key}.json"
+
+
+def commit_shard(sha: str) -> str:
+    """Relative path of the shard holding a commit's details."""
+    return f"commits/{sha[:2]}/{sha}.json"
+
+
+def _init_worker(repo_path: str, out: str, diff_max_bytes: int, diff_max_lines: int):
+    global _parser, _out
+    _parser = GitParser(
+        repo_path, diff_max_bytes=diff_max_bytes, diff_max_lines=diff_max_lines, diff_workers=1
+    )
+    _out = Path(out)
+
+
+def _export_commits(shas: List[str]) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Worker entry point: write the shards of a chunk of commits.
+
+    Returns:
+        Tuple of (graph rows of the commits in order, commit shards
+        written, diff shards written)
+    """
+    rows = []
+    commits_written = diffs_written = 0
+    for sha in shas:
+        commit = _parser.get_commit(sha)
+        if commit is None:
+            continue
+        rows.append(
+            {
+                "sha": commit.sha,
+                "message": commit.message,
+                "author": commit.author.name,
+                "timestamp": commit.author.timestamp,
+                "parents": commit.parents,
+            }
+        )
+
+        shard = _out / commit_shard(sha)
+        if shard.exists():
+            continue
+        files = []
+        diffs = {}
+        for path, change_type, old_sha, new_sha in _parser.tree_changes(
+            _parser.parent_tree(commit), commit.tree
+        ):
+            diff = _parser.generate_diff(old_sha, new_sha, path)
+            files.append(
+                GitFileChange(
+                    path=path,
+                    change_type=change_type,
+                    additions=diff["additions"],
+                    deletions=diff["deletions"],
+                    is_binary=diff["is_binary"],
+                    too_large=diff["too_large"],
+                )
+            )
+            diffs[path] = diff_shard(old_sha, new_sha, path)
+            if not (_out / diffs[path]).exists():
+                _write_json(_out / diffs[path], diff)
+                diffs_written += 1
+
+        details = GitCommitDetails(
+            commit=commit,
+            files=files,
+            stats={
+                "files_changed": len(files),
+                "additions": sum(f.additions for f in files),
+                "deletions": sum(f.deletions for f in files),
+            },
+        )
+        _write_json(shard, {**details.model_dump(), "diffs": diffs})
+        commits_written += 1
+    return rows, commits_written, diffs_written
+
+
+def export_repository(
+    repo_path: str,
+    out: str,
+    workers: int = 1,
+    diff_max_bytes: Optional[int] = None,
+    diff_max_lines: Optional[int] = None,
+) -> Dict[str, int]:
+    """Export (or update an earlier export of) a repository into a directory.
+
+    Args:
+        repo_path: Path to the repository
+        out: Output directory
+        workers: Worker processes exporting commits (1 exports inline)
+        diff_max_bytes: Largest blob size that is diffed line by line
+        diff_max_lines: Largest blob line count that is diffed line by line
+
+    Returns:
+        Counts of commits, pages, commit shards and diff shards written
+    """
+    parser = GitParser(repo_path, diff_workers=1)
+    limits = (
+        parser.diff_max_bytes if diff_max_bytes is None else diff_max_bytes,
+        parser.diff_max_lines if diff_max_lines is None else diff_max_lines,
+    )
+    out_dir = Path(out)
+    history = parser.get_history_order()
+    store = history.store
+    # Newest first, like the graph view
+    order = [int(commit_id) for commit_id in history.order]
+
+    pages: List[str] = []
+    missing: List[Tuple[str, List[str]]] = []
+    # Cut from the oldest commit up, so new commits only change the newest page
+    for end in range(len(order), 0, -PAGE_SIZE):
+        shas = [store.sha_of(commit_id) for commit_id in order[max(end - PAGE_SIZE, 0) : end]]
+        digest = hashlib.sha256(
+            b"%d:" % EXPORT_VERSION + b"".join(bytes.fromhex(sha) for sha in shas)
+        ).hexdigest()[:32]
+        name = f"graph/{digest}.ndjson"
+        pages.append(name)
+        if not (out_dir / name).exists():
+            missing.append((name, shas))
+    pages.reverse()
+
+    counts = {"commits": len(order), "pages": len(missing), "commit_shards": 0, "diff_shards": 0}
+    # (index into missing, commit SHAs)
+    chunks = [
+        (page, shas[i : i + EXPORT_CHUNK])
+        for page, (_, shas) in enumerate(missing)
+        for i in range(0, len(shas), EXPORT_CHUNK)
+    ]
+    initargs = (str(parser.repo_path), str(out_dir), *limits)
+    if workers > 1 and len(chunks) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=initargs,
+        )
+        with executor:
+            results = list(executor.map(_export_commits, [shas for _, shas in chunks]))
+    else:
+        _init_worker(*initargs)
+        results = [_export_commits(shas) for _, shas in chunks]
+
+    page_rows: List[List[Dict[str, Any]]] = [[] for _ in missing]
+    for (page, _), (rows, commit_shards, diff_shards) in zip(chunks, results):
+        page_rows[page].extend(rows)
+        counts["commit_shards"] += commit_shards
+        counts["diff_shards"] += diff_shards
+    for (name, _), rows in zip(missing, page_rows):
+        _write_json(out_dir / name, rows, ndjson=True)
+
+    manifest = {
+        "version": EXPORT_VERSION,
+        "generated_at": int(time.time()),
+        "repository": parser.repo_path.name,
+        "current_branch": parser.get_current_branch(),
+        "head": parser.resolve_ref("HEAD"),
+        "branches": [branch.model_dump() for branch in parser.get_branches()],
+        "remotes": [branch.model_dump() for branch in parser.get_remote_branches()],
+        "tags": [tag.model_dump() for tag in parser.get_tags(messages=True)],
+        "info": parser.get_summary(),
+        "graph": pages,
+    }
+    _write_json(out_dir / "manifest.json", manifest)
+
+    # Pages replaced by a grown newest page are no longer referenced
+    referenced = {out_dir / name for name in pages}
+    for page in (out_dir / "graph").glob("*.ndjson"):
+        if page not in referenced:
+            page.unlink()
+    return counts
@@ -1,6 +1,7 @@
 import subprocess
 import os
 from typing import List, Optional, Tuple
+from . import metrics
 from .git_parser.models import RepoStatus, FileStatus
 
 class GitClient:
@@ -19,10 +20,31 @@ class GitClient:
                 text=True,
                 env={**os.environ, "LC_ALL": "C"} # Ensure consistent output
             )
+            if metrics.enabled:
+                metrics.SUBPROCESSES.inc(args[0], "ok" if result.returncode == 0 else "error")
             return result.stdout, result.stderr, result.returncode
         except Exception as e:
+            if metrics.enabled:
+                metrics.SUBPROCESSES.inc(args[0], "failed")
             return "", str(e), -1
 
+    def start_git(self, args: List[str]) -> subprocess.Popen:
+        """Start a long-running git command with stdout and stderr merged into one pipe.
+
+        Prompts for credentials are disabled, since nobody could answer them.
+        On POSIX the command gets its own process group, so it can be
+        stopped together with the transport helpers (ssh, ...) it spawns.
+        """
+        return subprocess.Popen(
+            ["git"] + args,
+            cwd=self.repo_path,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, "LC_ALL": "C", "GIT_TERMINAL_PROMPT": "0"},
+            start_new_session=os.name == "posix",
+        )
+
     def get_status(self) -> RepoStatus:
         """Get repository status using git status --porcelain."""
         stdout, stderr, code = self._run_git(["status", "--porcelain", "-b"])
@@ -0,0 +1,277 @@
+"""Reachability bitmaps answering "which refs contain this commit".
+
+Every ref tip gets a bitmap over commit store IDs with one bit per commit
+it reaches. A commit's containing refs are then one bit test per ref.
+
+Bitmaps are built by walking from the tip and stop wherever a reachable
+set is already known: the bitmap of another tip (tips are built oldest
+first, so a release tag reuses the previous one) or a commit bitmap from
+git's own ``pack-*.bitmap`` files. Bitmaps never change once built,
+because commits added to the store later are never ancestors of existing
+ones; moving refs only builds bitmaps for the new tips.
+
+Tip bitmaps are kept in an LRUCache registered with the memory budget
+(one N/8-byte bitmap per tip adds up with many tags), and a bitmap
+evicted from it is rebuilt the next time its tip is tested.
+
+Reading pack bitmaps requires NumPy; without it every bitmap is walked.
+"""
+
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .cache import LRUCache
+from .commit_store import CommitStore
+from .optional import numpy
+from .pack import PackFile
+
+BITMAP_MAGIC = b"BITM"
+
+
+def _read_ewah(data: bytes, pos: int):
+    """Decode an EWAH compressed bitmap.
+
+    Returns:
+        Tuple of (bit array as uint64 words, bit count, position after it)
+    """
+    np = numpy()
+    bit_size, word_count = struct.unpack_from(">II", data, pos)
+    pos += 8
+    words = np.frombuffer(data, dtype=">u8", count=word_count, offset=pos).astype(np.uint64)
+    pos += word_count * 8 + 4  # Trailing position of the last run-length word
+
+    out = np.zeros((bit_size + 63) // 64, dtype=np.uint64)
+    i = written = 0
+    while i < word_count:
+        marker = int(words[i])
+        run_length = (marker >> 1) & 0xFFFFFFFF
+        literals = marker >> 33
+        if marker & 1:
+            out[written : written + run_length] = np.uint64(0xFFFFFFFFFFFFFFFF)
+        written += run_length
+        out[written : written + literals] = words[i + 1 : i + 1 + literals]
+        written += literals
+        i += 1 + literals
+    return out, bit_size, pos
+
+
+def _skip_ewah(data: bytes, pos: int) -> int:
+    word_count = struct.unpack_from(">I", data, pos + 4)[0]
+    return pos + 8 + word_count * 8 + 4
+
+
+def _bits(words, bit_size: int):
+    np = numpy()
+    return np.unpackbits(words.astype("<u8").view(np.uint8), bitorder="little")[:bit_size]
+
+
+class PackBitmap:
+    """Commit bitmaps stored by git next to a pack (``git repack -b``).
+
+    Bit positions count objects in pack order; they are translated to
+    commit store IDs once per pack when the first bitmap is used.
+    """
+
+    def __init__(self, path: Path, pack: PackFile):
+        self.path = path
+        self.pack = pack
+        with open(path, "rb") as f:
+            self._data = f.read()
+
+        magic, version, _flags, count = struct.unpack_from(">4sHHI", self._data, 0)
+        if magic != BITMAP_MAGIC or version != 1:
+            raise ValueError(f"Unsupported bitmap index: {path}")
+
+        pos = 12 + 20  # Header and pack checksum
+        self._commit_types, _, pos = _read_ewah(self._data, pos)
+        for _ in range(3):  # Tree, blob and tag type bitmaps
+            pos = _skip_ewah(self._data, pos)
+
+        # Entry i: (ewah position, index of the entry it is XORed with)
+        self._entries = []
+        # Binary commit SHA -> entry index
+        self.commits: Dict[bytes, int] = {}
+        names = pack.index.names()
+        for i in range(count):
+            index_pos, xor_offset, _ = struct.unpack_from(">IBB", self._data, pos)
+            self._entries.append((pos + 6, i - xor_offset if xor_offset else None))
+            self.commits[bytes(names[index_pos * 20 : index_pos * 20 + 20])] = i
+            pos = _skip_ewah(self._data, pos + 6)
+        names.release()
+
+        self._decoded: Dict[int, tuple] = {}
+        self._decoded_bytes = 0
+        self._store_ids = None
+        self._store_size = 0
+
+    def file_bytes(self) -> int:
+        """Bytes of the .bitmap file held in memory; kept until the pack goes away."""
+        return len(self._data)
+
+    def memory_bytes(self) -> int:
+        """Bytes of decoded bitmaps and the position mapping, for memory accounting."""
+        mapping = self._store_ids
+        return self._decoded_bytes + (mapping.nbytes if mapping is not None else 0)
+
+    def _entry_words(self, i: int):
+        np = numpy()
+        decoded = self._decoded.get(i)
+        if decoded is None:
+            words, bit_size, _ = _read_ewah(self._data, self._entries[i][0])
+            base = self._entries[i][1]
+            if base is not None:
+                base_words, base_size = self._entry_words(base)
+                length = max(len(words), len(base_words))
+                words = np.pad(words, (0, length - len(words))) ^ np.pad(
+                    base_words, (0, length - len(base_words))
+                )
+                bit_size = max(bit_size, base_size)
+            decoded = self._decoded[i] = (words, bit_size)
+            self._decoded_bytes += words.nbytes
+        return decoded
+
+    def _position_to_store_id(self, store: CommitStore):
+        """Map pack positions of commits to store IDs (-1 for other objects)."""
+        np = numpy()
+        index = self.pack.index
+        order = np.argsort(np.array(index.offsets(), dtype=np.int64), kind="stable")
+        positions = np.flatnonzero(_bits(self._commit_types, index.count))
+
+        names = index.names()
+        pack_shas = np.frombuffer(names, dtype="S20")[order[positions]]
+        names.release()
+
+        by_sha = np.frombuffer(store.by_sha, dtype=np.int32)
+        store_shas = np.frombuffer(bytes(store.shas), dtype="S20")[by_sha]
+        found = np.searchsorted(store_shas, pack_shas)
+        found = np.minimum(found, len(store_shas) - 1)
+        matches = store_shas[found] == pack_shas
+
+        mapping = np.full(index.count, -1, dtype=np.int64)
+        mapping[positions[matches]] = by_sha[found[matches]]
+        return mapping
+
+    def commit_ids(self, sha: bytes, store: CommitStore):
+        """Store IDs of all commits reachable from a bitmapped commit."""
+        np = numpy()
+        mapping = self._store_ids
+        if mapping is None or self._store_size != len(store):
+            mapping = self._store_ids = self._position_to_store_id(store)
+            self._store_size = len(store)
+        words, bit_size = self._entry_words(self.commits[sha])
+        ids = mapping[np.flatnonzero(_bits(words, min(bit_size, len(mapping))))]
+        return ids[ids >= 0]
+
+    def release(self, mapping: bool = False):
+        """Drop decoded bitmaps kept for XOR chains.
+
+        Args:
+            mapping: Also drop the pack position to store ID mapping
+        """
+        self._decoded = {}
+        self._decoded_bytes = 0
+        if mapping:
+            self._store_ids = None
+
+
+def load_pack_bitmaps(packs: Iterable[PackFile]) -> List[PackBitmap]:
+    """Open the bitmap of every pack that has one (requires NumPy)."""
+    if numpy() is None:
+        return []
+    bitmaps = []
+    for pack in packs:
+        path = pack.path.with_suffix(".bitmap")
+        if path.exists():
+            try:
+                bitmaps.append(PackBitmap(path, pack))
+            except Exception as e:
+                print(f"Ignoring bitmap {path}: {e}")
+    return bitmaps
+
+
+class ReachabilityIndex:
+    """Per-tip reachability bitmaps over commit store IDs."""
+
+    def __init__(self, store: CommitStore, cache: LRUCache, pack_bitmaps: Optional[List[PackBitmap]] = None):
+        """Create an index over a store.
+
+        Args:
+            store: Commit store whose IDs the bitmaps use
+            cache: Tip commit ID -> bitmap (bit i of byte i // 8 for
+                commit ID i); must not hold bitmaps of another store
+            pack_bitmaps: git's pack bitmaps, to shortcut walks
+        """
+        self.store = store
+        self.pack_bitmaps = pack_bitmaps or []
+        self.bitmaps = cache
+        self.tips: List[int] = []
+        self._tip_set: Set[int] = set()
+        self.snapshot = None
+
+    def update(self, tip_ids: Iterable[int]):
+        """Build bitmaps for new tips; those of tips no longer referenced age out of the cache."""
+        self.tips = sorted(set(tip_ids), key=lambda t: self.store.generation[t])
+        self._tip_set = set(self.tips)
+        for tip in self.tips:
+            self.bitmap(tip)
+        for pack_bitmap in self.pack_bitmaps:
+            pack_bitmap.release()
+
+    def bitmap(self, tip: int) -> bytes:
+        """The bitmap of a tip, built if it is not cached."""
+        bitmap = self.bitmaps.get(tip)
+        if bitmap is None:
+            bitmap = self._build(tip)
+            self.bitmaps.put(tip, bitmap, len(bitmap))
+        return bitmap
+
+    def _pack_bitmap(self, commit_id: int) -> Optional[bytes]:
+        np = numpy()
+        sha = bytes(self.store.shas[commit_id * 20 : commit_id * 20 + 20])
+        for pack_bitmap in self.pack_bitmaps:
+            if sha in pack_bitmap.commits:
+                mask = np.zeros(len(self.store), dtype=bool)
+                mask[pack_bitmap.commit_ids(sha, self.store)] = True
+                return np.packbits(mask, bitorder="little").tobytes()
+        return None
+
+    def _build(self, tip: int) -> bytes:
+        store = self.store
+        bits = bytearray((len(store) + 7) // 8)
+        stack = [tip]
+        while stack:
+            commit_id = stack.pop()
+            if bits[commit_id >> 3] >> (commit_id & 7) & 1:
+                continue
+
+            known = self.bitmaps.get(commit_id) if commit_id in self._tip_set and commit_id != tip else None
+            if known is None and self.pack_bitmaps:
+                known = self._pack_bitmap(commit_id)
+            if known is not None:
+                merged = int.from_bytes(bits, "little") | int.from_bytes(known, "little")
+                bits[:] = merged.to_bytes(len(bits), "little")
+                continue
+
+            bits[commit_id >> 3] |= 1 << (commit_id & 7)
+            stack.extend(store.parents_of(commit_id))
+        return bytes(bits)
+
+    def contains(self, tip: int, commit_id: int) -> bool:
+        if tip not in self._tip_set:
+            return False
+        bitmap = self.bitmap(tip)
+        if commit_id >> 3 >= len(bitmap):
+            return False
+        return bool(bitmap[commit_id >> 3] >> (commit_id & 7) & 1)
+
+    def union(self) -> int:
+        """All commits reachable from any tip, as an integer bitset."""
+        merged = 0
+        for tip in self.tips:
+            merged |= int.from_bytes(self.bitmap(tip), "little")
+        return merged
+
+    def containing(self, commit_id: int) -> List[int]:
+        """Tips whose history includes the commit."""
+        return [tip for tip in self.tips if self.contains(tip, commit_id)]
@@ -0,0 +1,86 @@
+"""Size-bounded caches used by the parsers."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .. import metrics
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by the total size of its values.
+
+    Sizes are supplied by the caller (usually the byte length of the
+    cached content). Lookups and evictions are reported to the metrics
+    module under the cache name. A cache registered with a MemoryBudget
+    also reports its puts there, which may evict from it or other caches.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.budget = None  # MemoryBudget, set when registered
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if metrics.enabled:
+            metrics.CACHE_REQUESTS.inc(self.name, "hit" if value is not None else "miss")
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int):
+        """Store a value, evicting least recently used entries to make room."""
+        if size > self.max_bytes:
+            return
+
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self.current_bytes -= self._sizes.pop(old_key)
+                evicted += 1
+
+        if evicted and metrics.enabled:
+            metrics.CACHE_EVICTIONS.inc(self.name, amount=evicted)
+        if self.budget is not None:
+            self.budget.charge()
+
+    def evict_bytes(self, amount: int) -> int:
+        """Evict least recently used entries until amount bytes are freed.
+
+        Returns:
+            Bytes actually freed
+        """
+        freed = evicted = 0
+        with self._lock:
+            while freed < amount and self._entries:
+                old_key, _ = self._entries.popitem(last=False)
+                freed += self._sizes.pop(old_key)
+                evicted += 1
+            self.current_bytes -= freed
+        if evicted and metrics.enabled:
+            metrics.CACHE_EVICTIONS.inc(self.name, amount=evicted)
+        return freed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.current_bytes = 0
@@ -0,0 +1,396 @@
+"""Columnar, array-backed store of commit metadata for whole-history queries.
+
+Every commit reachable from the refs gets an integer ID. Per-commit columns
+(timestamps, author IDs, first parents) live in ``array`` arrays and parent
+lists in CSR form (``parent_offsets``/``parent_ids``), so full history
+costs a few dozen bytes per commit instead of a pydantic object each.
+
+The store is built once by walking history, persisted under
+``.git/git-browser/`` and extended incrementally when refs move: only
+commits not already in the store are read.
+
+When NumPy is installed, queries run as vectorized operations over
+zero-copy views of the arrays; otherwise they fall back to plain loops.
+An array exporting its buffer to such a view cannot grow, so columns are
+never resized in place: extending builds new columns and swaps them in.
+Views kept beyond a query must be copies.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .objects import GitObjectParser
+from .optional import numpy
+
+STORE_MAGIC = b"GBCSTOR3"
+STORE_DIR = "git-browser"
+STORE_FILE = "commit-store"
+
+# Column name -> array typecode, in file order
+COLUMNS = [
+    ("commit_time", "q"),
+    ("author_time", "q"),
+    ("author_tz", "h"),
+    ("author_id", "i"),
+    ("first_parent", "i"),
+    ("generation", "i"),
+    ("parent_offsets", "q"),
+    ("parent_ids", "i"),
+]
+
+
+def _parse_ident(line: bytes) -> Tuple[str, int, int]:
+    """Split 'Name <email> timestamp +hhmm' into ('Name <email>', timestamp, tz minutes)."""
+    try:
+        ident, timestamp, tz = line.rsplit(b" ", 2)
+        minutes = int(tz[1:3]) * 60 + int(tz[3:5])
+        return ident.decode("utf-8", errors="replace"), int(timestamp), -minutes if tz[:1] == b"-" else minutes
+    except ValueError:
+        return "Unknown <unknown@example.com>", 0, 0
+
+
+def parse_commit_header(content: bytes) -> Tuple[List[str], str, int, int, int]:
+    """Read only the header fields the store needs from a commit object.
+
+    Returns:
+        Tuple of (parent_shas, author_ident, author_time, author_tz_minutes, commit_time)
+    """
+    header_end = content.find(b"\n\n")
+    header = content if header_end == -1 else content[:header_end]
+
+    parents: List[str] = []
+    author = "Unknown <unknown@example.com>"
+    author_time = author_tz = commit_time = 0
+    for line in header.split(b"\n"):
+        if line.startswith(b"parent "):
+            parents.append(line[7:].decode("ascii"))
+        elif line.startswith(b"author "):
+            author, author_time, author_tz = _parse_ident(line[7:])
+        elif line.startswith(b"committer "):
+            _, commit_time, _ = _parse_ident(line[10:])
+    return parents, author, author_time, author_tz, commit_time
+
+
+def _compute_generations(generation: array, parent_offsets: array, parent_ids: array, first_new: int):
+    """Fill in generation numbers of commits added from first_new on.
+
+    Parents of new commits may themselves be new with a higher ID, so
+    commits are visited in depth-first post-order.
+    """
+    for start in range(first_new, len(generation)):
+        stack = [start]
+        while stack:
+            commit_id = stack[-1]
+            if generation[commit_id]:
+                stack.pop()
+                continue
+            parents = parent_ids[parent_offsets[commit_id] : parent_offsets[commit_id + 1]]
+            pending = [p for p in parents if not generation[p]]
+            if pending:
+                stack.extend(pending)
+                continue
+            generation[commit_id] = 1 + max((generation[p] for p in parents), default=0)
+            stack.pop()
+
+
+class CommitStore:
+    """Commit metadata for the whole history, indexed by integer commit ID."""
+
+    def __init__(self):
+        self.shas = bytearray()  # 20 bytes per commit, in ID order
+        self.commit_time = array("q")
+        self.author_time = array("q")
+        self.author_tz = array("h")  # Author UTC offset in minutes
+        self.author_id = array("i")
+        self.first_parent = array("i")  # -1 for root commits
+        # 1 + the largest parent generation; a commit can only reach lower ones
+        self.generation = array("i")
+        self.parent_offsets = array("q", [0])
+        self.parent_ids = array("i")
+        self.authors: List[str] = []  # "Name <email>" per author ID
+        self.by_sha = array("i")  # commit IDs sorted by SHA
+        self.snapshot: List[Tuple[str, str]] = []  # ref snapshot the store was built for
+        self._author_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.commit_time)
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the columns, for memory accounting."""
+        columns = (
+            self.commit_time,
+            self.author_time,
+            self.author_tz,
+            self.author_id,
+            self.first_parent,
+            self.generation,
+            self.parent_offsets,
+            self.parent_ids,
+            self.by_sha,
+        )
+        # Author identities are short strings kept in a list and a dict
+        return len(self.shas) + sum(c.itemsize * len(c) for c in columns) + 150 * len(self.authors)
+
+    # Lookups -------------------------------------------------------------
+
+    def sha_of(self, commit_id: int) -> str:
+        return self.shas[commit_id * 20 : commit_id * 20 + 20].hex()
+
+    def _sha_bytes(self, commit_id: int) -> bytes:
+        return bytes(self.shas[commit_id * 20 : commit_id * 20 + 20])
+
+    def index_of(self, sha: str) -> Optional[int]:
+        """Binary search the SHA-sorted permutation for a commit ID."""
+        try:
+            target = bytes.fromhex(sha)
+        except ValueError:
+            return None
+        lo, hi = 0, len(self.by_sha)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self._sha_bytes(self.by_sha[mid])
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return self.by_sha[mid]
+        return None
+
+    def parents_of(self, commit_id: int) -> Sequence[int]:
+        return self.parent_ids[self.parent_offsets[commit_id] : self.parent_offsets[commit_id + 1]]
+
+    def author_name(self, author_id: int) -> str:
+        ident = self.authors[author_id]
+        return ident[: ident.rfind(" <")] if " <" in ident else ident
+
+    # Building ------------------------------------------------------------
+
+    def _author(self, ident: str) -> int:
+        author_id = self._author_index.get(ident)
+        if author_id is None:
+            author_id = self._author_index[ident] = len(self.authors)
+            self.authors.append(ident)
+        return author_id
+
+    def extend(self, object_parser: GitObjectParser, tips: Iterable[str]) -> int:
+        """Add every commit reachable from tips that is not stored yet.
+
+        Returns:
+            Number of commits added
+        """
+        new: Dict[str, Tuple[List[str], str, int, int, int]] = {}
+        order: List[str] = []
+        stack = [sha for sha in tips if self.index_of(sha) is None]
+        while stack:
+            sha = stack.pop()
+            if sha in new or self.index_of(sha) is not None:
+                continue
+            obj_data = object_parser.read_object(sha)
+            if not obj_data or obj_data[0] != "commit":
+                continue
+            header = parse_commit_header(obj_data[1])
+            new[sha] = header
+            order.append(sha)
+            stack.extend(header[0])
+
+        if not order:
+            return 0
+
+        base = len(self)
+        new_ids = {sha: base + i for i, sha in enumerate(order)}
+        shas = bytearray(self.shas)
+        columns = {name: array(typecode, getattr(self, name)) for name, typecode in COLUMNS}
+        for sha in order:
+            parents, author, author_time, author_tz, commit_time = new[sha]
+            parent_ids = []
+            for parent in parents:
+                parent_id = new_ids.get(parent)
+                if parent_id is None:
+                    parent_id = self.index_of(parent)
+                if parent_id is not None:  # Missing in shallow clones
+                    parent_ids.append(parent_id)
+
+            shas += bytes.fromhex(sha)
+            columns["commit_time"].append(commit_time)
+            columns["author_time"].append(author_time)
+            columns["author_tz"].append(author_tz)
+            columns["author_id"].append(self._author(author))
+            columns["first_parent"].append(parent_ids[0] if parent_ids else -1)
+            columns["generation"].append(0)
+            columns["parent_ids"].extend(parent_ids)
+            columns["parent_offsets"].append(len(columns["parent_ids"]))
+
+        _compute_generations(columns["generation"], columns["parent_offsets"], columns["parent_ids"], base)
+        count = len(columns["commit_time"])
+        by_sha = array("i", sorted(range(count), key=lambda i: shas[i * 20 : i * 20 + 20]))
+
+        # Parent IDs before their offsets and the length (commit_time) last,
+        # so unlocked readers never index past the columns they see
+        self.shas, self.by_sha = shas, by_sha
+        for name, _ in reversed(COLUMNS):
+            setattr(self, name, columns[name])
+        return len(order)
+
+    # Persistence ---------------------------------------------------------
+
+    @staticmethod
+    def path_for(git_dir: Path) -> Path:
+        return git_dir / STORE_DIR / STORE_FILE
+
+    def save(self, path: Path) -> bool:
+        """Atomically write the store. Returns False if the location is read-only."""
+        meta = {
+            "count": len(self),
+            "parents": len(self.parent_ids),
+            "byteorder": sys.byteorder,
+            "authors": self.authors,
+            "snapshot": self.snapshot,
+        }
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=".commit-store-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(STORE_MAGIC)
+                f.write(len(meta_bytes).to_bytes(4, "little"))
+                f.write(meta_bytes)
+                f.write(self.shas)
+                for name, _ in COLUMNS:
+                    getattr(self, name).tofile(f)
+                self.by_sha.tofile(f)
+            os.replace(tmp_name, path)
+            return True
+        except OSError as e:
+            print(f"Could not persist commit store to {path}: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["CommitStore"]:
+        """Read a persisted store, or None if missing or unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(STORE_MAGIC)) != STORE_MAGIC:
+                    return None
+                meta_len = int.from_bytes(f.read(4), "little")
+                meta = json.loads(f.read(meta_len).decode("utf-8"))
+                count = meta["count"]
+                lengths = {
+                    "commit_time": count,
+                    "author_time": count,
+                    "author_tz": count,
+                    "author_id": count,
+                    "first_parent": count,
+                    "generation": count,
+                    "parent_offsets": count + 1,
+                    "parent_ids": meta["parents"],
+                }
+
+                store = cls()
+                store.shas = bytearray(f.read(count * 20))
+                for name, typecode in COLUMNS + [("by_sha", "i")]:
+                    column = array(typecode)
+                    column.fromfile(f, lengths.get(name, count))
+                    if meta["byteorder"] != sys.byteorder:
+                        column.byteswap()
+                    setattr(store, name, column)
+        except (OSError, EOFError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable commit store {path}: {e}")
+            return None
+
+        store.authors = meta["authors"]
+        store._author_index = {ident: i for i, ident in enumerate(store.authors)}
+        store.snapshot = [tuple(entry) for entry in meta["snapshot"]]
+        return store
+
+    # Queries -------------------------------------------------------------
+
+    def reachable(self, tip_ids: Iterable[int]):
+        """Mark every commit reachable from the tips.
+
+        Returns:
+            Boolean NumPy array (or bytearray without NumPy) indexed by commit ID
+        """
+        np = numpy()
+        tips = [t for t in tip_ids if t is not None]
+        if np is not None:
+            offsets = np.frombuffer(self.parent_offsets, dtype=np.int64)
+            parents = np.frombuffer(self.parent_ids, dtype=np.int32)
+            mask = np.zeros(len(self), dtype=bool)
+            frontier = np.unique(np.array(tips, dtype=np.int64))
+            while frontier.size:
+                frontier = frontier[~mask[frontier]]
+                mask[frontier] = True
+                starts = offsets[frontier]
+                counts = offsets[frontier + 1] - starts
+                total = int(counts.sum())
+                if not total:
+                    break
+                # Gather all parent slices of the frontier in one step
+                shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+                frontier = np.unique(parents[shift + np.arange(total)])
+            return mask
+
+        mask = bytearray(len(self))
+        stack = tips
+        while stack:
+            commit_id = stack.pop()
+            if mask[commit_id]:
+                continue
+            mask[commit_id] = 1
+            stack.extend(self.parents_of(commit_id))
+        return mask
+
+    def matching_authors(self, needle: str) -> List[int]:
+        """Author IDs whose name or email contains needle (case-insensitive)."""
+        needle = needle.lower()
+        return [i for i, ident in enumerate(self.authors) if needle in ident.lower()]
+
+    def select(
+        self,
+        tip_ids: Iterable[int],
+        author: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> List[int]:
+        """Commit IDs reachable from tips matching the filters, newest first.
+
+        Author and time filters use the author identity and timestamp, like
+        GitParser.filter_commits. Ordering is by committer timestamp.
+        """
+        np = numpy()
+        mask = self.reachable(tip_ids)
+        author_ids = self.matching_authors(author) if author else None
+
+        if np is not None:
+            if author_ids is not None:
+                mask &= np.isin(np.frombuffer(self.author_id, dtype=np.int32), author_ids)
+            author_time = np.frombuffer(self.author_time, dtype=np.int64)
+            if since:
+                mask &= author_time >= since
+            if until:
+                mask &= author_time <= until
+            ids = np.flatnonzero(mask)
+            commit_time = np.frombuffer(self.commit_time, dtype=np.int64)
+            # Stable sort keeps ID order between commits with equal timestamps
+            ids = ids[np.argsort(-commit_time[ids], kind="stable")]
+            return ids.tolist()
+
+        allowed = set(author_ids) if author_ids is not None else None
+        ids = [
+            i
+            for i in range(len(self))
+            if mask[i]
+            and (allowed is None or self.author_id[i] in allowed)
+            and (not since or self.author_time[i] >= since)
+            and (not until or self.author_time[i] <= until)
+        ]
+        ids.sort(key=lambda i: -self.commit_time[i])
+        return ids
@@ -0,0 +1,65 @@
+"""Reader for the subset of git's config file format the browser needs."""
+
+import re
+from pathlib import Path
+from typing import Dict
+
+SECTION_RE = re.compile(r'^\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+ENTRY_RE = re.compile(r"^([A-Za-z][\w-]*)\s*(?:=\s*(.*))?$")
+
+
+def _unquote(value: str) -> str:
+    """Strip comments and quotes from a config value."""
+    out = []
+    quoted = False
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\" and i + 1 < len(value):
+            i += 1
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(value[i], value[i]))
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out).strip()
+
+
+def read_config(path: Path) -> Dict[str, Dict[str, str]]:
+    """Parse a git config file.
+
+    Returns:
+        Section -> {key: value}. Sections are named like git names them,
+        e.g. "core" or "branch.main" (section names and keys lowercased,
+        subsections kept as written). The last of repeated keys wins and
+        keys without a value are "true".
+    """
+    config: Dict[str, Dict[str, str]] = {}
+    try:
+        lines = path.read_text(errors="replace").splitlines()
+    except OSError:
+        return config
+
+    section = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        match = SECTION_RE.match(line)
+        if match:
+            name = match.group(1).lower()
+            if match.group(2) is not None:
+                name += "." + re.sub(r"\\(.)", r"\1", match.group(2))
+            section = config.setdefault(name, {})
+            line = line[match.end():].strip()
+            if not line:
+                continue
+        entry = ENTRY_RE.match(line)
+        if section is None or not entry:
+            continue
+        value = entry.group(2)
+        section[entry.group(1).lower()] = "true" if value is None else _unquote(value)
+    return config
@@ -0,0 +1,15 @@
+"""Default limits shared by the parser and the command line.
+
+Kept free of imports so the CLI can show them in --help without loading
+the parser, pydantic or NumPy.
+"""
+
+import os
+
+# Blobs above these limits are reported as too large instead of diffed
+DEFAULT_DIFF_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_DIFF_MAX_LINES = 50000
+
+DEFAULT_DIFF_WORKERS = min(os.cpu_count() or 1, 8)
+# File stats not computed within this many seconds are marked incomplete
+DEFAULT_DIFF_DEADLINE = 30.0
@@ -0,0 +1,141 @@
+"""Line diff statistics computed in a pool of worker processes.
+
+difflib is pure Python and holds the GIL, so diffing many files in threads
+uses a single core. DiffPool sends batches of blob pairs to worker
+processes instead. Blobs are read in the calling process while workers
+diff earlier batches, and results are collected up to a deadline; pairs
+not finished by then are reported as incomplete.
+
+Workers are started with "spawn" so they never inherit the server's
+threads and locks, and only import this module.
+"""
+
+import difflib
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Batches are submitted once they hold this many bytes of blob content...
+DIFF_BATCH_BYTES = 1024 * 1024
+# ...or this many pairs, whichever comes first
+DIFF_BATCH_PAIRS = 32
+
+
+def count_changes(old: bytes, new: bytes) -> Tuple[int, int]:
+    """Count added and deleted lines between two blob contents.
+
+    The counts match those of a unified diff of the same contents.
+    """
+    old_lines = old.decode("utf-8", errors="replace").splitlines(keepends=True)
+    new_lines = new.decode("utf-8", errors="replace").splitlines(keepends=True)
+    additions = deletions = 0
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_lines, new_lines).get_opcodes():
+        if tag != "equal":
+            deletions += i2 - i1
+            additions += j2 - j1
+    return additions, deletions
+
+
+def _diff_batch(pairs: List[Tuple[bytes, bytes]]) -> Tuple[List[Tuple[int, int]], float]:
+    """Worker entry point. Returns the counts and the CPU time spent."""
+    start = time.thread_time()
+    counts = [count_changes(old, new) for old, new in pairs]
+    return counts, time.thread_time() - start
+
+
+class DiffPool:
+    """Process pool computing line diff statistics of many blob pairs."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Submitted batches, so close() can cancel the queued ones
+        self._futures: "weakref.WeakSet[Future]" = weakref.WeakSet()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def count_changes(
+        self,
+        pairs: Iterable[Tuple[int, bytes, bytes]],
+        deadline: float,
+        on_cpu_time: Optional[Callable[[float], None]] = None,
+    ) -> Dict[int, Tuple[int, int]]:
+        """Diff (key, old, new) pairs until the perf_counter() deadline.
+
+        Pairs are consumed lazily, so blob reading stops at the deadline too.
+
+        Returns:
+            key -> (additions, deletions) for every pair finished in time
+        """
+        results: Dict[int, Tuple[int, int]] = {}
+        pending: Dict[Future, List[int]] = {}
+
+        def collect(futures):
+            for future in futures:
+                keys = pending.pop(future)
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                counts, cpu_time = future.result()
+                results.update(zip(keys, counts))
+                if on_cpu_time:
+                    on_cpu_time(cpu_time)
+
+        def submit(batch) -> bool:
+            try:
+                future = self._pool().submit(_diff_batch, [(old, new) for _, old, new in batch])
+            except BrokenProcessPool as e:
+                # A worker died; start a fresh pool next time
+                print(f"Diff worker pool failed: {e}")
+                self._executor = None
+                return False
+            pending[future] = [key for key, _, _ in batch]
+            self._futures.add(future)
+            return True
+
+        batch: List[Tuple[int, bytes, bytes]] = []
+        batch_bytes = 0
+        for key, old, new in pairs:
+            if time.perf_counter() >= deadline:
+                batch = []
+                break
+            batch.append((key, old, new))
+            batch_bytes += len(old) + len(new)
+            if batch_bytes >= DIFF_BATCH_BYTES or len(batch) >= DIFF_BATCH_PAIRS:
+                if not submit(batch):
+                    batch = []
+                    break
+                batch, batch_bytes = [], 0
+                # Keep the queue short so read content is not held in memory
+                while len(pending) > 2 * self.workers:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    done, _ = wait(list(pending), timeout=remaining, return_when=FIRST_COMPLETED)
+                    collect(done)
+        if batch:
+            submit(batch)
+
+        remaining = deadline - time.perf_counter()
+        done, not_done = wait(list(pending), timeout=max(remaining, 0))
+        collect(done)
+        for future in not_done:
+            # Running batches cannot be interrupted; their results are dropped
+            future.cancel()
+        pending.clear()
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            # shutdown(cancel_futures=True) needs Python 3.9
+            for future in list(self._futures):
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
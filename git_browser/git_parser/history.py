@@ -0,0 +1,179 @@
+"""A precomputed display order of the whole history for windowed graph views.
+
+Commits are ordered newest first by corrected commit date: a commit's
+commit time, raised to one second past its newest parent's corrected date
+where clocks were skewed. The order is therefore topological (parents
+always come after their children) while staying close to plain date
+order, and a position in it can be found directly from a commit's rank or,
+since corrected dates decrease along the order, by binary search on a
+timestamp.
+
+Corrected dates of existing commits never change, because commits added
+to the store later are never their ancestors; updates only compute the
+new commits' dates and re-sort.
+
+Lanes crossing into a window (edges from a child above it to a parent at
+or below it) are found by comparing the ranks of both ends of every
+parent edge, so no commit above the window is visited.
+
+When NumPy is installed, sorting and the edge scan are vectorized;
+otherwise they fall back to plain loops.
+"""
+
+import bisect
+from array import array
+from typing import List, Optional, Tuple
+
+from .commit_store import CommitStore
+from .optional import numpy
+
+
+def _nbytes(values) -> int:
+    if hasattr(values, "nbytes"):  # NumPy array
+        return int(values.nbytes)
+    if isinstance(values, array):
+        return values.itemsize * len(values)
+    # List of ints: a pointer and, for most values, an int object each
+    return 36 * len(values)
+
+
+class HistoryOrder:
+    """Position of every commit store ID in corrected-date order."""
+
+    def __init__(self, store: CommitStore):
+        self.store = store
+        self.corrected = array("q")  # Corrected commit date per commit ID
+        self.order: List[int] = []  # Commit IDs, newest first
+        self.rank: List[int] = []  # Commit ID -> position in order
+        self._dates: List[int] = []  # Negated corrected dates in order, ascending
+        self._edges: Optional[Tuple] = None  # (child ranks, parent ranks, parent IDs)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the order and edge ranks, for memory accounting."""
+        columns = [self.corrected, self.order, self.rank, self._dates, *(self._edges or ())]
+        return sum(_nbytes(column) for column in columns)
+
+    def update(self):
+        """Extend the order with commits added to the store since the last update."""
+        np = numpy()
+        store = self.store
+        first_new = len(self.corrected)
+        if first_new == len(store):
+            return
+
+        corrected = self.corrected
+        corrected.extend([0] * (len(store) - first_new))
+        # Parents have lower generations, so theirs are computed first
+        for commit_id in sorted(range(first_new, len(store)), key=store.generation.__getitem__):
+            date = store.commit_time[commit_id]
+            for parent in store.parents_of(commit_id):
+                if corrected[parent] >= date:
+                    date = corrected[parent] + 1
+            corrected[commit_id] = date
+
+        if np is not None:
+            dates = np.frombuffer(corrected, dtype=np.int64)
+            ids = np.arange(len(dates))
+            # Newest first; the higher ID (found later) wins ties
+            order = np.lexsort((-ids, -dates))
+            rank = np.empty_like(order)
+            rank[order] = ids
+            self.order, self.rank = order, rank
+            self._dates = -dates[order]
+        else:
+            self.order = sorted(range(len(corrected)), key=lambda i: (-corrected[i], -i))
+            self.rank = [0] * len(corrected)
+            for position, commit_id in enumerate(self.order):
+                self.rank[commit_id] = position
+            self._dates = [-corrected[commit_id] for commit_id in self.order]
+        self._edges = None
+
+    def position_of_time(self, timestamp: int) -> int:
+        """Position of the newest commit whose corrected date is at or before timestamp."""
+        np = numpy()
+        if np is not None:
+            return int(np.searchsorted(self._dates, -timestamp, side="left"))
+        return bisect.bisect_left(self._dates, -timestamp)
+
+    def _edge_ranks(self) -> Tuple:
+        np = numpy()
+        if self._edges is None:
+            store = self.store
+            if np is not None:
+                # Copies: a kept view would stop the store's arrays from growing
+                offsets = np.array(store.parent_offsets, dtype=np.int64)
+                parents = np.array(store.parent_ids, dtype=np.int32)
+                children = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+                self._edges = (self.rank[children], self.rank[parents], parents)
+            else:
+                child_ranks, parent_ranks = [], []
+                for commit_id in range(len(store)):
+                    for parent in store.parents_of(commit_id):
+                        child_ranks.append(self.rank[commit_id])
+                        parent_ranks.append(self.rank[parent])
+                self._edges = (child_ranks, parent_ranks, list(store.parent_ids))
+        return self._edges
+
+    def crossing(self, position: int) -> List[Tuple[int, int]]:
+        """Parent edges passing the top of position: from above it to it or below.
+
+        Returns:
+            (child ID, parent ID) pairs ordered by the child's position, in
+            parent order for each child
+        """
+        np = numpy()
+        child_ranks, parent_ranks, parents = self._edge_ranks()
+        if np is not None:
+            selected = np.nonzero((child_ranks < position) & (parent_ranks >= position))[0]
+            # Edges are stored by child, in parent order; keep that among equal ranks
+            selected = selected[np.argsort(child_ranks[selected], kind="stable")]
+            return [(int(self.order[child_ranks[i]]), int(parents[i])) for i in selected]
+        selected = [
+            i
+            for i in range(len(parents))
+            if child_ranks[i] < position <= parent_ranks[i]
+        ]
+        selected.sort(key=child_ranks.__getitem__)
+        return [(self.order[child_ranks[i]], parents[i]) for i in selected]
+
+
+def assign_lanes(lanes: List[Optional[str]], rows: List[Tuple[str, List[str]]]) -> List[int]:
+    """Lay out (sha, parents) rows in columns, like ``git log --graph``.
+
+    Args:
+        lanes: Commit each column is waiting for (None for a free column);
+            updated in place to the columns below the last row
+        rows: Commits in display order with their parent SHAs
+
+    Returns:
+        The column of each row
+    """
+    columns = []
+    for sha, parents in rows:
+        if sha in lanes:
+            column = lanes.index(sha)
+            # Other columns waiting for this commit merge into it
+            for i in range(column + 1, len(lanes)):
+                if lanes[i] == sha:
+                    lanes[i] = None
+        elif None in lanes:
+            column = lanes.index(None)
+        else:
+            column = len(lanes)
+            lanes.append(None)
+        columns.append(column)
+
+        lanes[column] = parents[0] if parents else None
+        for parent in parents[1:]:
+            if parent in lanes:
+                continue
+            if None in lanes:
+                lanes[lanes.index(None)] = parent
+            else:
+                lanes.append(parent)
+        while lanes and lanes[-1] is None:
+            lanes.pop()
+    return columns
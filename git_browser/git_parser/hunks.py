@@ -0,0 +1,130 @@
+"""Hunk-level access to unified diffs and intra-line word diffs."""
+
+import difflib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+# Words, runs of whitespace and single punctuation characters
+WORD_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def index_hunks(diff: str) -> List[int]:
+    """Offsets in a unified diff where each hunk header starts.
+
+    Content lines always start with " ", "+" or "-", so every line
+    starting with "@@" is a hunk header.
+    """
+    starts = []
+    pos = 0 if diff.startswith("@@") else diff.find("\n@@")
+    while pos != -1:
+        if diff[pos] == "\n":
+            pos += 1
+        starts.append(pos)
+        pos = diff.find("\n@@", pos)
+    return starts
+
+
+def slice_hunks(diff: str, starts: List[int], first: int, last: int) -> Tuple[str, List[str]]:
+    """Split out the file header and hunks first..last-1 of a diff."""
+    header = diff[: starts[0]].rstrip("\n") if starts else diff
+    ends = starts[1:] + [len(diff) + 1]
+    hunks = [diff[starts[i] : ends[i] - 1] for i in range(first, min(last, len(starts)))]
+    return header, hunks
+
+
+def parse_range(value: str, total: int) -> Optional[Tuple[int, int]]:
+    """Parse "a-b" (hunks a to b-1), "a-" (a to the end) or "a" (just a).
+
+    Returns None for malformed ranges and ranges starting past the last
+    hunk. Bounds are clamped to total, so first <= last <= total always
+    holds; a diff without hunks accepts any range as the empty window (0, 0).
+    """
+    match = re.fullmatch(r"(\d+)(?:-(\d*))?", value.strip())
+    if not match:
+        return None
+    first = int(match.group(1))
+    if match.group(2) is None:
+        last = first + 1
+    elif match.group(2) == "":
+        last = max(first, total)
+    else:
+        last = int(match.group(2))
+    if last < first or (total > 0 and first >= total):
+        return None
+    return min(first, total), min(last, total)
+
+
+def _segments(old: str, new: str) -> Tuple[List[List[str]], List[List[str]]]:
+    old_tokens = WORD_TOKEN.findall(old)
+    new_tokens = WORD_TOKEN.findall(new)
+    old_segments: List[List[str]] = []
+    new_segments: List[List[str]] = []
+
+    def add(segments, kind, tokens):
+        text = "".join(tokens)
+        if not text:
+            return
+        if segments and segments[-1][0] == kind:
+            segments[-1][1] += text
+        else:
+            segments.append([kind, text])
+
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            add(old_segments, "equal", old_tokens[i1:i2])
+            add(new_segments, "equal", new_tokens[j1:j2])
+        else:
+            add(old_segments, "delete", old_tokens[i1:i2])
+            add(new_segments, "insert", new_tokens[j1:j2])
+    return old_segments, new_segments
+
+
+def word_diff(hunk: str) -> List[Dict[str, Any]]:
+    """Pair removed and added lines of a hunk and diff them word by word.
+
+    Each run of "-" lines directly followed by "+" lines is paired line by
+    line; unpaired lines are left out since they changed completely.
+
+    Returns:
+        List of {"old_line", "new_line", "old", "new"} where old/new are
+        [kind, text] segments with kind "equal", "delete" or "insert"
+    """
+    lines = hunk.split("\n")
+    match = HUNK_HEADER.match(lines[0])
+    if not match:
+        return []
+    old_line, new_line = int(match.group(1)), int(match.group(3))
+
+    pairs = []
+    removed: List[Tuple[int, str]] = []
+    added: List[Tuple[int, str]] = []
+
+    def flush():
+        for (old_no, old_text), (new_no, new_text) in zip(removed, added):
+            old_segments, new_segments = _segments(old_text, new_text)
+            pairs.append(
+                {"old_line": old_no, "new_line": new_no, "old": old_segments, "new": new_segments}
+            )
+        removed.clear()
+        added.clear()
+
+    for line in lines[1:]:
+        if line.startswith("-"):
+            if added:
+                flush()
+            removed.append((old_line, line[1:]))
+            old_line += 1
+        elif line.startswith("+"):
+            added.append((new_line, line[1:]))
+            new_line += 1
+        elif line.startswith(" "):
+            flush()
+            old_line += 1
+            new_line += 1
+        elif line.startswith("\\"):
+            flush()
+        # Anything else is the separator after content lines that kept their newline
+    flush()
+    return pairs
@@ -0,0 +1,224 @@
+"""Memory budget shared by all caches and indexes of a parser.
+
+Every LRUCache of GitParser and GitObjectParser registers here with a
+weight, and so does every derived index (reachability bitmaps, history
+order, changed paths, decoded pack bitmaps), wrapped in a Rebuildable
+that drops the index when it has to give way; it is rebuilt on next use.
+Each cache keeps its own size cap, but together they must also fit in
+CACHE_SHARE of the server's memory limit, minus what non-evictable
+structures (the commit store) hold. When a put goes over, entries are
+evicted from whichever cache is furthest above its weighted share, so an
+idle cache gives way to a busy one but a cheap-to-refill cache gives way
+first.
+
+The rest of the limit is headroom for request processing. Load is shed
+(the most expensive endpoints answer 503) while either
+
+- the accounted bytes of caches, indexes and the commit store reach
+  SHED_THRESHOLD of the limit even after caches were trimmed, or
+- the process's resident size reaches SHED_THRESHOLD of the limit and
+  has grown by more than RSS_GROWTH of the limit since caches were last
+  trimmed for it. CPython rarely returns freed memory to the operating
+  system, so resident size stays high after a trim while the freed memory
+  is reused; only growth beyond it means memory is really running out.
+  Each time that happens, caches are trimmed and requests are refused for
+  SHED_SECONDS.
+
+Resident size is read from /proc, so on platforms without it (macOS,
+Windows) only the accounted bytes are used.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cache import LRUCache
+
+# Part of the memory limit available to caches; the rest is for requests
+CACHE_SHARE = 0.5
+# Memory use, relative to the limit, above which load is shed
+SHED_THRESHOLD = 0.9
+# Resident growth since the last trim, relative to the limit, that counts
+# as new pressure rather than reuse of freed memory
+RSS_GROWTH = 0.05
+# Seconds requests are refused after resident size grew under pressure
+SHED_SECONDS = 5.0
+# Under pressure, caches are trimmed to this part of their budget
+PRESSURE_TRIM = 0.5
+
+
+def resident_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None where it is unknown."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte count like "512M", "2G" or "1048576".
+
+    Raises:
+        ValueError: If the value is not a size
+    """
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    text = value.strip().upper()
+    for suffix in ("B", "I"):
+        if text.endswith(suffix):
+            text = text[:-1]
+    number, unit = (text[:-1], units[text[-1]]) if text and text[-1] in units else (text, 1)
+    try:
+        size = int(float(number) * unit)
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}") from None
+    if size <= 0:
+        raise ValueError(f"Invalid size: {value}")
+    return size
+
+
+class Rebuildable:
+    """Budget entry for an index that is dropped as a whole and rebuilt on demand."""
+
+    max_bytes = None
+
+    def __init__(self, name: str, size: Callable[[], int], drop: Callable[[], None]):
+        """Describe an index to the budget.
+
+        Args:
+            name: Name reported by /api/memory
+            size: Returns the bytes the index currently holds (0 if not built)
+            drop: Releases the index; must not wait for locks held while
+                the index is built, since building may charge the budget
+        """
+        self.name = name
+        self._size = size
+        self._drop = drop
+        self.budget = None
+
+    @property
+    def current_bytes(self) -> int:
+        return self._size()
+
+    def __len__(self) -> int:
+        return 1 if self._size() else 0
+
+    def evict_bytes(self, amount: int) -> int:
+        size = self._size()
+        if size:
+            self._drop()
+        return size
+
+
+class MemoryBudget:
+    """Byte accounting and weighted eviction across registered caches."""
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes
+        self._caches: List[Tuple[Union[LRUCache, Rebuildable], float]] = []
+        # Name -> function returning bytes held by a non-evictable structure
+        self._fixed: Dict[str, Callable[[], int]] = {}
+        self._lock = threading.Lock()
+        # Resident size when caches were last trimmed for it
+        self._rss_floor: Optional[int] = None
+        self._shed_until = 0.0
+
+    def register(self, cache: Union[LRUCache, Rebuildable], weight: float = 1.0):
+        """Account a cache's bytes to this budget.
+
+        Args:
+            cache: Cache or index to account
+            weight: Relative share of the budget; entries of caches with a
+                higher weight survive longer under pressure
+        """
+        with self._lock:
+            self._caches.append((cache, weight))
+        cache.budget = self
+
+    def register_fixed(self, name: str, size: Callable[[], int]):
+        """Account memory that cannot be evicted, e.g. the commit store."""
+        self._fixed[name] = size
+
+    def fixed_bytes(self) -> int:
+        return sum(size() for size in self._fixed.values())
+
+    def cache_bytes(self) -> int:
+        return sum(cache.current_bytes for cache, _ in self._caches)
+
+    def cache_limit(self) -> Optional[int]:
+        """Bytes all caches together may hold, or None without a limit."""
+        if self.limit_bytes is None:
+            return None
+        return max(int(self.limit_bytes * CACHE_SHARE) - self.fixed_bytes(), 0)
+
+    def charge(self):
+        """Called by caches after a put: evict across caches while over budget."""
+        limit = self.cache_limit()
+        if limit is not None and self.cache_bytes() > limit:
+            self._reclaim(limit)
+
+    def _reclaim(self, target: int):
+        with self._lock:
+            excess = self.cache_bytes() - target
+            while excess > 0:
+                # The cache furthest above its weighted share gives way first
+                cache, _ = max(self._caches, key=lambda c: c[0].current_bytes / c[1])
+                freed = cache.evict_bytes(min(excess, cache.current_bytes))
+                if not freed:
+                    break
+                excess -= freed
+
+    def under_pressure(self) -> bool:
+        """Check whether memory is so tight that expensive work should be refused.
+
+        See the module docstring for the two signals used. Caches are
+        trimmed whenever pressure is found, to give memory back before
+        refusing for long.
+        """
+        if self.limit_bytes is None:
+            return False
+        threshold = self.limit_bytes * SHED_THRESHOLD
+        trim_to = int((self.cache_limit() or 0) * PRESSURE_TRIM)
+        if self.cache_bytes() + self.fixed_bytes() >= threshold:
+            self._reclaim(trim_to)
+            if self.cache_bytes() + self.fixed_bytes() >= threshold:
+                return True
+
+        if time.monotonic() < self._shed_until:
+            return True
+        rss = resident_bytes()
+        if rss is None or rss < threshold:
+            self._rss_floor = None
+            return False
+        if self._rss_floor is not None and rss < self._rss_floor + self.limit_bytes * RSS_GROWTH:
+            # Still reusing what the last trim freed
+            return False
+        self._reclaim(trim_to)
+        self._rss_floor = rss
+        self._shed_until = time.monotonic() + SHED_SECONDS
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        """Per-cache and overall usage, for /api/memory."""
+        caches = [
+            {
+                "name": cache.name,
+                "bytes": cache.current_bytes,
+                "entries": len(cache),
+                "max_bytes": cache.max_bytes,
+                "weight": weight,
+            }
+            for cache, weight in self._caches
+        ]
+        fixed = [{"name": name, "bytes": size()} for name, size in self._fixed.items()]
+        return {
+            "limit_bytes": self.limit_bytes,
+            "cache_limit_bytes": self.cache_limit(),
+            "resident_bytes": resident_bytes(),
+            "shedding": time.monotonic() < self._shed_until,
+            "cache_bytes": sum(c["bytes"] for c in caches),
+            "fixed_bytes": sum(f["bytes"] for f in fixed),
+            "caches": caches,
+            "fixed": fixed,
+        }
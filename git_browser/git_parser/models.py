@@ -32,6 +32,9 @@ class GitBranch(BaseModel):
     name: str
     commit_sha: str
     is_current: bool = False
+    upstream: Optional[str] = None  # e.g. "origin/main", from .git/config
+    ahead: Optional[int] = None  # Commits not in the upstream
+    behind: Optional[int] = None  # Upstream commits not in the branch
 
 
 class GitTag(BaseModel):
@@ -51,6 +54,19 @@ class GitFileChange(BaseModel):
     old_path: Optional[str] = None
     additions: int = 0
     deletions: int = 0
+    is_binary: bool = False
+    too_large: bool = False  # Not diffed because it exceeds the diff limits
+    incomplete: bool = False  # Not diffed before the diff deadline
+
+
+class GitTreeEntry(BaseModel):
+    """Entry of a single directory level in a tree."""
+
+    name: str
+    path: str
+    type: str  # "blob", "tree" or "commit" (submodule)
+    mode: str
+    sha: str
 
 
 class GitCommitDetails(BaseModel):
@@ -59,6 +75,35 @@ class GitCommitDetails(BaseModel):
     commit: GitCommit
     files: List[GitFileChange]
     stats: Dict[str, int]  # {"files_changed": N, "additions": N, "deletions": N}
+    incomplete: bool = False  # Some file stats missed the diff deadline
+
+
+class GitCommitBatchItem(BaseModel):
+    """One commit of a batch lookup, or the error that prevented it."""
+
+    sha: str
+    commit: Optional[GitCommit] = None
+    files: Optional[List[GitFileChange]] = None  # Only at the "files" level
+    stats: Optional[Dict[str, int]] = None  # At the "stats" and "files" levels
+    incomplete: bool = False  # Some file stats missed the diff deadline
+    error: Optional[str] = None
+
+
+class GitReflogEntry(BaseModel):
+    """One reflog entry: a ref moving from old_sha to new_sha."""
+
+    old_sha: str  # All zeros when the ref was created
+    new_sha: str
+    committer: GitAuthor
+    message: str
+
+
+class GitReflogPage(BaseModel):
+    """Reflog entries of a ref, newest first."""
+
+    ref: str
+    entries: List[GitReflogEntry]
+    next_cursor: Optional[int] = None  # Pass as cursor= for older entries
 
 
 class GitGraphNode(BaseModel):
@@ -70,6 +115,7 @@ class GitGraphNode(BaseModel):
     timestamp: int
     parents: List[str]
     branches: List[str]
+    remotes: List[str] = []
     tags: List[str]
 
 
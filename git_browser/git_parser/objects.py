@@ -1,38 +1,82 @@
 """Git object parsers for reading .git directory."""
 
+import bisect
 import os
 import zlib
 import re
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 from pathlib import Path
 
+from .. import metrics, tracing
+from .cache import LRUCache
+from .pack import PackStore, TYPE_NAMES, READ_CHUNK
+
+# Commits, trees and tags are small and immutable; blobs are never cached here
+DEFAULT_OBJECT_CACHE_BYTES = 32 * 1024 * 1024
+
+# File counts per tree SHA; an entry costs about this much
+FILE_COUNT_ENTRY_BYTES = 128
+FILE_COUNT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+def _count_inflated(chunks: Iterator[bytes], source: str) -> Iterator[bytes]:
+    for chunk in chunks:
+        metrics.BYTES_INFLATED.inc(source, amount=len(chunk))
+        yield chunk
+
 
 class GitObjectParser:
     """Parser for Git objects stored in .git/objects directory."""
 
-    def __init__(self, git_dir: Path):
+    def __init__(self, git_dir: Path, cache_bytes: int = DEFAULT_OBJECT_CACHE_BYTES):
         self.git_dir = git_dir
         self.objects_dir = git_dir / "objects"
+        self.packs = PackStore(self.objects_dir)
+        self.cache = LRUCache("objects", cache_bytes)
+        self.file_counts = LRUCache("file_counts", FILE_COUNT_CACHE_BYTES)
+        # Fanout directory name -> (mtime, sorted loose object names in it)
+        self._loose_listings: Dict[str, Tuple[float, List[str]]] = {}
+
+    def _loose_path(self, sha: str) -> Path:
+        # Git stores objects as objects/XX/YYYYYY... where XX are first 2 chars of SHA
+        return self.objects_dir / sha[:2] / sha[2:]
 
+    @tracing.traced("read_object")
     def read_object(self, sha: str) -> Optional[Tuple[str, bytes]]:
         """Read a Git object by its SHA-1 hash.
 
+        Loose objects are checked first, then the packfiles. Non-blob
+        objects are kept in an LRU cache.
+
         Returns:
             Tuple of (object_type, content) or None if object not found
         """
-        # Git stores objects as objects/XX/YYYYYY... where XX are first 2 chars of SHA
-        obj_dir = self.objects_dir / sha[:2]
-        obj_file = obj_dir / sha[2:]
+        cached = self.cache.get(sha)
+        if cached is not None:
+            return cached
 
-        if not obj_file.exists():
-            return None
+        obj_file = self._loose_path(sha)
+
+        if obj_file.exists():
+            obj_data = self._read_loose_object(sha, obj_file)
+        else:
+            obj_data = self._read_packed_object(sha)
+
+        if obj_data and obj_data[0] != "blob":
+            self.cache.put(sha, obj_data, len(obj_data[1]))
+        return obj_data
 
+    def _read_loose_object(self, sha: str, obj_file: Path) -> Optional[Tuple[str, bytes]]:
+        """Read and inflate a loose object file."""
         try:
             # Read and decompress the object
             with open(obj_file, "rb") as f:
                 compressed_data = f.read()
 
             decompressed_data = zlib.decompress(compressed_data)
+            if metrics.enabled:
+                metrics.OBJECT_READS.inc("loose")
+                metrics.BYTES_INFLATED.inc("loose", amount=len(decompressed_data))
 
             # Git objects format: "type size\0content"
             null_idx = decompressed_data.index(b"\x00")
@@ -46,6 +90,108 @@ class GitObjectParser:
             print(f"Error reading object {sha}: {e}")
             return None
 
+    def _read_packed_object(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        """Read an object from the packfiles, resolving deltas."""
+        located = self.packs.locate(sha)
+        if located is None:
+            return None
+
+        pack, offset = located
+        if metrics.enabled:
+            metrics.OBJECT_READS.inc("pack")
+        try:
+            return pack.read_at(offset, self.read_object)
+        except Exception as e:
+            print(f"Error reading packed object {sha}: {e}")
+            return None
+
+    def stream_object(
+        self, sha: str, chunk_size: int = READ_CHUNK
+    ) -> Optional[Tuple[str, int, Iterator[bytes]]]:
+        """Open an object for incremental reading.
+
+        Loose objects and undeltified packed objects are inflated chunk by
+        chunk, so memory stays bounded by chunk_size regardless of object
+        size. Deltified packed objects have to be reconstructed in memory
+        first; git stores very large blobs undeltified, so this only
+        affects small and medium objects.
+
+        Returns:
+            Tuple of (object_type, size, chunk_iterator) or None if not found
+        """
+        obj_file = self._loose_path(sha)
+        if obj_file.exists():
+            try:
+                obj_type, size = self._read_loose_header(obj_file)
+            except Exception as e:
+                print(f"Error reading object {sha}: {e}")
+                return None
+            chunks = self._iter_loose_content(obj_file, chunk_size)
+            if metrics.enabled:
+                metrics.OBJECT_READS.inc("loose")
+                chunks = _count_inflated(chunks, "loose")
+            return obj_type, size, chunks
+
+        located = self.packs.locate(sha)
+        if located is None:
+            return None
+
+        pack, offset = located
+        if metrics.enabled:
+            metrics.OBJECT_READS.inc("pack")
+        try:
+            type_num, size, data_offset = pack.object_info(offset)
+            if type_num in TYPE_NAMES:
+                return TYPE_NAMES[type_num], size, pack.stream_at(data_offset)
+
+            obj_type, content = pack.read_at(offset, self.read_object)
+        except Exception as e:
+            print(f"Error reading packed object {sha}: {e}")
+            return None
+
+        chunks = (content[i : i + chunk_size] for i in range(0, len(content), chunk_size))
+        return obj_type, len(content), chunks
+
+    def _read_loose_header(self, obj_file: Path) -> Tuple[str, int]:
+        """Inflate just enough of a loose object to read its header."""
+        decompressor = zlib.decompressobj()
+        header = b""
+        with open(obj_file, "rb") as f:
+            while b"\x00" not in header:
+                chunk = f.read(1024)
+                if not chunk:
+                    raise ValueError("Truncated object header")
+                header += decompressor.decompress(chunk, 1024 - len(header))
+                if len(header) >= 1024 and b"\x00" not in header:
+                    raise ValueError("Object header too long")
+
+        obj_type, size = header[: header.index(b"\x00")].decode("ascii").split(" ")
+        return obj_type, int(size)
+
+    def _iter_loose_content(self, obj_file: Path, chunk_size: int) -> Iterator[bytes]:
+        """Yield the inflated content of a loose object, skipping the header."""
+        decompressor = zlib.decompressobj()
+        in_header = True
+        with open(obj_file, "rb") as f:
+            while not decompressor.eof:
+                compressed = f.read(chunk_size)
+                if not compressed:
+                    break
+                data = decompressor.decompress(compressed, chunk_size)
+                while True:
+                    if in_header:
+                        null_idx = data.find(b"\x00")
+                        if null_idx == -1:
+                            data = b""
+                        else:
+                            data = data[null_idx + 1 :]
+                            in_header = False
+                    if data:
+                        yield data
+                    if not decompressor.unconsumed_tail or decompressor.eof:
+                        break
+                    data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+
     def parse_commit(self, content: bytes) -> Dict[str, Any]:
         """Parse a commit object.
 
@@ -107,6 +253,7 @@ class GitObjectParser:
 
         return {"name": name, "email": email, "timestamp": int(timestamp), "timezone": timezone}
 
+    @tracing.traced("parse_tree")
     def parse_tree(self, content: bytes) -> list:
         """Parse a tree object.
 
@@ -159,6 +306,7 @@ class GitObjectParser:
             return None
         return obj_data[1]
 
+    @tracing.traced("get_tree_contents")
     def get_tree_contents(self, tree_sha: str, prefix: str = "") -> Dict[str, str]:
         """Recursively read tree and return path -> blob_sha mapping.
 
@@ -192,3 +340,160 @@ class GitObjectParser:
             # Ignore submodules (commit type)
 
         return files
+
+    def _tree_entries(self, tree_sha: Optional[str]) -> Dict[str, Dict[str, str]]:
+        if not tree_sha:
+            return {}
+        obj_data = self.read_object(tree_sha)
+        if not obj_data or obj_data[0] != "tree":
+            return {}
+        return {entry["name"]: entry for entry in self.parse_tree(obj_data[1])}
+
+    @tracing.traced("diff_trees")
+    def diff_trees(
+        self, old_tree_sha: Optional[str], new_tree_sha: Optional[str], prefix: str = ""
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """List files that differ between two trees.
+
+        Subtrees with the same SHA on both sides are skipped without being
+        read, so the cost follows the size of the change, not of the tree.
+        Submodules are ignored, like in get_tree_contents.
+
+        Returns:
+            Sorted list of (path, old blob SHA, new blob SHA); None marks a
+            missing side
+        """
+        changes: List[Tuple[str, Optional[str], Optional[str]]] = []
+        if old_tree_sha == new_tree_sha:
+            return changes
+
+        old_entries = self._tree_entries(old_tree_sha)
+        new_entries = self._tree_entries(new_tree_sha)
+        for name in old_entries.keys() | new_entries.keys():
+            old = old_entries.get(name)
+            new = new_entries.get(name)
+            if old and new and old["sha"] == new["sha"] and old["type"] == new["type"]:
+                continue
+
+            path = f"{prefix}/{name}" if prefix else name
+            old_tree = old["sha"] if old and old["type"] == "tree" else None
+            new_tree = new["sha"] if new and new["type"] == "tree" else None
+            if old_tree or new_tree:
+                changes.extend(self.diff_trees(old_tree, new_tree, path))
+
+            old_blob = old["sha"] if old and old["type"] == "blob" else None
+            new_blob = new["sha"] if new and new["type"] == "blob" else None
+            if (old_blob or new_blob) and old_blob != new_blob:
+                changes.append((path, old_blob, new_blob))
+
+        if not prefix:
+            changes.sort()
+        return changes
+
+    def count_files(self, tree_sha: str) -> int:
+        """Count the files below a tree.
+
+        Counts are cached per tree SHA, so counting a new commit's tree
+        only reads the directories that changed.
+        """
+        count = self.file_counts.get(tree_sha)
+        if count is not None:
+            return count
+
+        count = 0
+        obj_data = self.read_object(tree_sha)
+        if obj_data and obj_data[0] == "tree":
+            for entry in self.parse_tree(obj_data[1]):
+                if entry["type"] == "blob":
+                    count += 1
+                elif entry["type"] == "tree":
+                    count += self.count_files(entry["sha"])
+
+        self.file_counts.put(tree_sha, count, FILE_COUNT_ENTRY_BYTES)
+        return count
+
+    def count_objects(self) -> Dict[str, int]:
+        """Count packed and loose objects without reading any of them.
+
+        Packed counts come from the pack index headers. An object stored
+        in several packs (or both packed and loose) is counted each time,
+        like ``git count-objects``.
+        """
+        packed = sum(pack.index.count for pack in self.packs.packs)
+        loose = 0
+        for fanout_dir in self.objects_dir.glob("[0-9a-f][0-9a-f]"):
+            loose += sum(1 for name in os.listdir(fanout_dir) if len(name) == 38)
+        return {"packed": packed, "loose": loose}
+
+    def _loose_names(self, fanout: str) -> List[str]:
+        """Sorted object names (without the fanout prefix) of a loose directory.
+
+        Listings are cached and only re-read when the directory changes.
+        """
+        fanout_dir = self.objects_dir / fanout
+        try:
+            mtime = fanout_dir.stat().st_mtime
+        except OSError:
+            return []
+        cached = self._loose_listings.get(fanout)
+        if cached is None or cached[0] != mtime:
+            names = sorted(name for name in os.listdir(fanout_dir) if len(name) == 38)
+            cached = self._loose_listings[fanout] = (mtime, names)
+        return cached[1]
+
+    def find_prefix(self, prefix: str, limit: int = 2) -> List[str]:
+        """Full SHAs of objects starting with a hex prefix (at most limit).
+
+        Packed objects are found by binary search in the pack indexes and
+        loose ones by bisecting the cached listing of their fanout directory.
+        """
+        prefix = prefix.lower()
+        matches = self.packs.find_prefix(prefix, limit)
+        names = self._loose_names(prefix[:2])
+        rest = prefix[2:]
+        i = bisect.bisect_left(names, rest)
+        while i < len(names) and names[i].startswith(rest) and len(matches) < limit:
+            sha = prefix[:2] + names[i]
+            if sha not in matches:
+                matches.append(sha)
+            i += 1
+        return matches
+
+    def resolve_path(self, tree_sha: str, path: str) -> Optional[Dict[str, str]]:
+        """Resolve a path inside a tree by reading only the trees along it.
+
+        Args:
+            tree_sha: Root tree SHA
+            path: Slash separated path ("" for the root itself)
+
+        Returns:
+            Tree entry dictionary (mode, type, sha, name) or None if not found
+        """
+        entry = {"mode": "40000", "type": "tree", "sha": tree_sha, "name": ""}
+
+        for component in [part for part in path.split("/") if part]:
+            if entry["type"] != "tree":
+                return None
+
+            obj_data = self.read_object(entry["sha"])
+            if not obj_data or obj_data[0] != "tree":
+                return None
+
+            entry = next(
+                (e for e in self.parse_tree(obj_data[1]) if e["name"] == component), None
+            )
+            if entry is None:
+                return None
+
+        return entry
+
+    def list_tree(self, tree_sha: str) -> Optional[List[Dict[str, str]]]:
+        """List the entries of a single tree level.
+
+        Returns:
+            List of tree entries or None if the object is not a tree
+        """
+        obj_data = self.read_object(tree_sha)
+        if not obj_data or obj_data[0] != "tree":
+            return None
+        return self.parse_tree(obj_data[1])
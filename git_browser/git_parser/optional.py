@@ -0,0 +1,23 @@
+"""Lazy imports of optional dependencies.
+
+NumPy (the "fast" extra) takes a large part of a second to import, which
+the CLI's query commands and cold server starts would pay before doing any
+work. Modules call numpy() inside their vectorized code paths instead of
+importing it at module level, so it is loaded on first use, and fall back
+to plain loops when it returns None.
+"""
+
+from typing import Any, Dict
+
+_modules: Dict[str, Any] = {}
+
+
+def numpy() -> Any:
+    """Return the numpy module, or None when it is not installed."""
+    if "numpy" not in _modules:
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - optional dependency
+            np = None
+        _modules["numpy"] = np
+    return _modules["numpy"]
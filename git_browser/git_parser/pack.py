@@ -0,0 +1,380 @@
+"""Readers for Git packfiles stored in .git/objects/pack."""
+
+import mmap
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .. import metrics
+
+# Pack object type numbers (see gitformat-pack)
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+TYPE_NAMES = {OBJ_COMMIT: "commit", OBJ_TREE: "tree", OBJ_BLOB: "blob", OBJ_TAG: "tag"}
+
+IDX_V2_MAGIC = b"\xfftOc"
+
+# Amount of compressed data handed to zlib per step when inflating
+READ_CHUNK = 64 * 1024
+
+
+class PackIndex:
+    """Version 2 pack index (.idx) backed by a memory map.
+
+    The SHA table is sorted, so lookups are a binary search inside the
+    fanout bucket of the first byte.
+    """
+
+    def __init__(self, idx_path: Path):
+        self.path = idx_path
+        with open(idx_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._data[:4] != IDX_V2_MAGIC or struct.unpack(">I", self._data[4:8])[0] != 2:
+            raise ValueError(f"Unsupported pack index version: {idx_path}")
+
+        self.fanout = struct.unpack(">256I", self._data[8 : 8 + 256 * 4])
+        self.count = self.fanout[255]
+        self._names_start = 8 + 256 * 4
+        self._crc_start = self._names_start + self.count * 20
+        self._offsets_start = self._crc_start + self.count * 4
+        self._large_offsets_start = self._offsets_start + self.count * 4
+
+    def sha_at(self, index: int) -> bytes:
+        """Return the binary SHA stored at a position of the sorted table."""
+        start = self._names_start + index * 20
+        return self._data[start : start + 20]
+
+    def offset_at(self, index: int) -> int:
+        """Return the pack offset of the object at a table position."""
+        start = self._offsets_start + index * 4
+        offset = struct.unpack(">I", self._data[start : start + 4])[0]
+        if offset & 0x80000000:
+            large = self._large_offsets_start + (offset & 0x7FFFFFFF) * 8
+            offset = struct.unpack(">Q", self._data[large : large + 8])[0]
+        return offset
+
+    def names(self) -> memoryview:
+        """The sorted table of binary SHAs, 20 bytes per object."""
+        return memoryview(self._data)[self._names_start : self._crc_start]
+
+    def offsets(self) -> List[int]:
+        """Pack offsets of all objects in table order."""
+        return [self.offset_at(i) for i in range(self.count)]
+
+    def find(self, sha: bytes) -> Optional[int]:
+        """Find the table position of a binary SHA, or None."""
+        first = sha[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_sha = self.sha_at(mid)
+            if mid_sha < sha:
+                lo = mid + 1
+            elif mid_sha > sha:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def find_prefix(self, prefix: str, limit: int = 2) -> List[bytes]:
+        """Binary SHAs starting with a hex prefix, at most limit of them.
+
+        The lower bound of the prefix is binary searched inside its fanout
+        bucket; matches are the entries that follow it.
+        """
+        low = bytes.fromhex(prefix.ljust(40, "0")[:40])
+        first = low[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.sha_at(mid) < low:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        matches = []
+        while lo < self.fanout[first] and len(matches) < limit:
+            sha = self.sha_at(lo)
+            if not sha.hex().startswith(prefix):
+                break
+            matches.append(sha)
+            lo += 1
+        return matches
+
+    def preload(self):
+        """Fault the whole index into memory so first lookups avoid disk reads."""
+        for page in range(0, len(self._data), mmap.PAGESIZE):
+            self._data[page]
+
+    def close(self):
+        self._data.close()
+
+
+class PackFile:
+    """A packfile paired with its index."""
+
+    def __init__(self, pack_path: Path):
+        self.path = pack_path
+        self.index = PackIndex(pack_path.with_suffix(".idx"))
+        with open(pack_path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def contains(self, sha: bytes) -> bool:
+        return self.index.find(sha) is not None
+
+    def offset_of(self, sha: bytes) -> Optional[int]:
+        position = self.index.find(sha)
+        if position is None:
+            return None
+        return self.index.offset_at(position)
+
+    def _read_header(self, offset: int) -> Tuple[int, int, int]:
+        """Parse an object header.
+
+        Returns:
+            Tuple of (type_number, inflated_size, data_offset)
+        """
+        byte = self._data[offset]
+        offset += 1
+        obj_type = (byte >> 4) & 0x07
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = self._data[offset]
+            offset += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return obj_type, size, offset
+
+    def _read_ofs_delta_base(self, offset: int) -> Tuple[int, int]:
+        """Decode the negative base offset of an OFS_DELTA entry."""
+        byte = self._data[offset]
+        offset += 1
+        base = byte & 0x7F
+        while byte & 0x80:
+            byte = self._data[offset]
+            offset += 1
+            base = ((base + 1) << 7) | (byte & 0x7F)
+        return base, offset
+
+    def _inflate_chunks(self, offset: int) -> Iterator[bytes]:
+        """Incrementally inflate the zlib stream starting at offset."""
+        for chunk in self._inflate_raw(offset):
+            if metrics.enabled:
+                metrics.BYTES_INFLATED.inc("pack", amount=len(chunk))
+            yield chunk
+
+    def _inflate_raw(self, offset: int) -> Iterator[bytes]:
+        decompressor = zlib.decompressobj()
+        end = len(self._data)
+        while not decompressor.eof and offset < end:
+            chunk = self._data[offset : offset + READ_CHUNK]
+            offset += len(chunk)
+            out = decompressor.decompress(chunk, READ_CHUNK)
+            if out:
+                yield out
+            while decompressor.unconsumed_tail and not decompressor.eof:
+                out = decompressor.decompress(decompressor.unconsumed_tail, READ_CHUNK)
+                if out:
+                    yield out
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def _inflate(self, offset: int, size: int) -> bytes:
+        return b"".join(self._inflate_chunks(offset))[:size]
+
+    def object_info(self, offset: int) -> Tuple[int, int, int]:
+        """Return (type_number, size, data_offset) for the entry at offset.
+
+        For delta entries the data offset points past the base reference.
+        """
+        obj_type, size, data_offset = self._read_header(offset)
+        if obj_type == OBJ_OFS_DELTA:
+            _, data_offset = self._read_ofs_delta_base(data_offset)
+        elif obj_type == OBJ_REF_DELTA:
+            data_offset += 20
+        return obj_type, size, data_offset
+
+    def read_at(self, offset: int, resolve_ref) -> Tuple[str, bytes]:
+        """Read and fully resolve the object stored at offset.
+
+        Args:
+            offset: Entry offset inside the pack
+            resolve_ref: Callable mapping a hex SHA to (type, content) for REF_DELTA bases
+
+        Returns:
+            Tuple of (object_type, content)
+        """
+        obj_type, size, data_offset = self._read_header(offset)
+
+        if obj_type in TYPE_NAMES:
+            return TYPE_NAMES[obj_type], self._inflate(data_offset, size)
+
+        if obj_type == OBJ_OFS_DELTA:
+            relative, data_offset = self._read_ofs_delta_base(data_offset)
+            base_type, base = self.read_at(offset - relative, resolve_ref)
+        elif obj_type == OBJ_REF_DELTA:
+            base_sha = self._data[data_offset : data_offset + 20].hex()
+            data_offset += 20
+            base_obj = resolve_ref(base_sha)
+            if base_obj is None:
+                raise ValueError(f"Missing delta base {base_sha}")
+            base_type, base = base_obj
+        else:
+            raise ValueError(f"Unknown pack object type {obj_type} at offset {offset}")
+
+        delta = self._inflate(data_offset, size)
+        return base_type, apply_delta(base, delta)
+
+    def stream_at(self, data_offset: int) -> Iterator[bytes]:
+        """Stream the inflated data of a non-delta entry."""
+        return self._inflate_chunks(data_offset)
+
+    def close(self):
+        self._data.close()
+        self.index.close()
+
+
+def _read_delta_size(delta: bytes, idx: int) -> Tuple[int, int]:
+    size = 0
+    shift = 0
+    while True:
+        byte = delta[idx]
+        idx += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, idx
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a git delta instruction stream to a base object."""
+    base_size, idx = _read_delta_size(delta, 0)
+    if base_size != len(base):
+        raise ValueError("Delta base size mismatch")
+    result_size, idx = _read_delta_size(delta, idx)
+
+    out: List[bytes] = []
+    end = len(delta)
+    while idx < end:
+        op = delta[idx]
+        idx += 1
+        if op & 0x80:
+            # Copy from base
+            copy_offset = 0
+            copy_size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    copy_offset |= delta[idx] << (8 * i)
+                    idx += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    copy_size |= delta[idx] << (8 * i)
+                    idx += 1
+            if copy_size == 0:
+                copy_size = 0x10000
+            out.append(base[copy_offset : copy_offset + copy_size])
+        elif op:
+            # Insert literal data
+            out.append(delta[idx : idx + op])
+            idx += op
+        else:
+            raise ValueError("Invalid delta opcode 0")
+
+    result = b"".join(out)
+    if len(result) != result_size:
+        raise ValueError("Delta result size mismatch")
+    return result
+
+
+class PackStore:
+    """All packfiles of a repository, rescanned when the pack directory changes."""
+
+    def __init__(self, objects_dir: Path):
+        self.pack_dir = objects_dir / "pack"
+        self._packs: List[PackFile] = []
+        self._scanned_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> bool:
+        """Reload the pack list if the pack directory changed.
+
+        Returns:
+            True if the pack list was reloaded
+        """
+        try:
+            mtime = self.pack_dir.stat().st_mtime
+        except OSError:
+            return False
+
+        with self._lock:
+            if mtime == self._scanned_mtime:
+                return False
+            self._load(mtime)
+            return True
+
+    def _load(self, mtime: float):
+        known = {pack.path: pack for pack in self._packs}
+        packs = []
+        for pack_path in sorted(self.pack_dir.glob("*.pack")):
+            if pack_path in known:
+                packs.append(known.pop(pack_path))
+                continue
+            if not pack_path.with_suffix(".idx").exists():
+                continue
+            try:
+                packs.append(PackFile(pack_path))
+            except Exception as e:
+                print(f"Error opening pack {pack_path}: {e}")
+
+        # Packs removed by gc are not closed here: a request may still be
+        # reading them, and their maps are released once unreferenced
+        self._packs = packs
+        self._scanned_mtime = mtime
+
+    @property
+    def packs(self) -> List[PackFile]:
+        if self._scanned_mtime is None:
+            self._refresh()
+        return self._packs
+
+    def find_prefix(self, prefix: str, limit: int = 2) -> List[str]:
+        """Hex SHAs of packed objects starting with a prefix (at most limit)."""
+        matches: List[str] = []
+        for pack in self.packs:
+            for sha in pack.index.find_prefix(prefix, limit):
+                if sha.hex() not in matches:
+                    matches.append(sha.hex())
+            if len(matches) >= limit:
+                break
+        return matches[:limit]
+
+    def locate(self, sha: str) -> Optional[Tuple[PackFile, int]]:
+        """Find the pack and entry offset holding an object."""
+        try:
+            binary = bytes.fromhex(sha)
+        except ValueError:
+            return None
+        if len(binary) != 20:
+            return None
+
+        for attempt in range(2):
+            for pack in self.packs:
+                offset = pack.offset_of(binary)
+                if offset is not None:
+                    return pack, offset
+            # A fetch or gc may have added packs since the last scan
+            if attempt == 0 and not self._refresh():
+                break
+        return None
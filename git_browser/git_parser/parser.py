@@ -1,30 +1,102 @@
 """Main Git repository parser."""
 
-import os
 import difflib
+import threading
+from collections import deque
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple
 from .models import (
     GitRepository,
     GitBranch,
     GitTag,
     GitCommit,
     GitAuthor,
+    GitCommitBatchItem,
     GitCommitDetails,
     GitFileChange,
     GitGraphNode,
+    GitReflogEntry,
+    GitReflogPage,
+    GitTreeEntry,
 )
+from .. import metrics, tracing
+from . import diffing, hunks, reachability, reflog, revisions, stats
+from .bitmaps import ReachabilityIndex, load_pack_bitmaps
+from .cache import LRUCache
+from .commit_store import CommitStore
+from .config import read_config
+from .defaults import (
+    DEFAULT_DIFF_DEADLINE,
+    DEFAULT_DIFF_MAX_BYTES,
+    DEFAULT_DIFF_MAX_LINES,
+    DEFAULT_DIFF_WORKERS,
+)
+from .refs import PackedRef, RefStamp, read_packed_refs
+from .history import HistoryOrder, assign_lanes
+from .memory import MemoryBudget, Rebuildable
 from .objects import GitObjectParser
+from .paths import ChangedPathIndex
+
+# Like git, a blob is binary if a NUL byte shows up in its first 8000 bytes
+BINARY_SNIFF_BYTES = 8000
+
+# Changed files are diffed in worker processes once there are this many
+PARALLEL_DIFF_MIN_FILES = 16
+
+# Resolved revision expressions kept per ref snapshot (a few thousand)
+REVISION_CACHE_BYTES = 1024 * 1024
+# Peeled tag objects; a few thousand tags take well under a megabyte
+PEELED_TAG_CACHE_BYTES = 4 * 1024 * 1024
+# Rough bytes of one cached SHA mapping (strings and cache bookkeeping)
+SHA_ENTRY_BYTES = 200
+
+# Fields of graph nodes that can be selected with get_graph_rows
+GRAPH_FIELDS = ("sha", "message", "author", "timestamp", "parents", "branches", "remotes", "tags")
+
+# Largest number of commits on either side of a graph window's anchor
+MAX_GRAPH_WINDOW = 5000
+
+# Detail levels of batch commit lookups, from cheapest to most expensive
+BATCH_DETAIL_LEVELS = ("header", "stats", "files")
+
+# Aggregated statistics are small; this holds a few hundred dashboards' worth
+STATS_CACHE_BYTES = 4 * 1024 * 1024
+# Indexed diffs are kept whole, so paging through a huge diff diffs it once
+HUNK_CACHE_BYTES = 64 * 1024 * 1024
+# Ref tip reachability bitmaps, N/8 bytes each for N commits
+REACHABILITY_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _short_ref(ref: str) -> str:
+    """"refs/remotes/origin/main" -> "origin/main", "refs/heads/main" -> "main"."""
+    for prefix in ("refs/heads/", "refs/remotes/"):
+        if ref.startswith(prefix):
+            return ref[len(prefix):]
+    return ref
 
 
 class GitParser:
     """Parser for reading Git repository information."""
 
-    def __init__(self, repo_path: str):
+    def __init__(
+        self,
+        repo_path: str,
+        diff_max_bytes: int = DEFAULT_DIFF_MAX_BYTES,
+        diff_max_lines: int = DEFAULT_DIFF_MAX_LINES,
+        diff_workers: int = DEFAULT_DIFF_WORKERS,
+        diff_deadline: float = DEFAULT_DIFF_DEADLINE,
+        memory_limit: Optional[int] = None,
+    ):
         """Initialize parser with repository path.
 
         Args:
             repo_path: Path to the repository (can be root or .git directory)
+            diff_max_bytes: Largest blob size that is diffed line by line
+            diff_max_lines: Largest blob line count that is diffed line by line
+            diff_workers: Worker processes for diffing many files (1 diffs inline)
+            diff_deadline: Seconds after which unfinished file stats are marked incomplete
+            memory_limit: Bytes the process should stay under (default: unlimited)
         """
         self.repo_path = Path(repo_path).resolve()
 
@@ -39,6 +111,86 @@ class GitParser:
             raise ValueError(f"Not a git repository: {repo_path}")
 
         self.object_parser = GitObjectParser(self.git_dir)
+        self.diff_max_bytes = diff_max_bytes
+        self.diff_max_lines = diff_max_lines
+        self.diff_deadline = diff_deadline
+        self._diff_pool = diffing.DiffPool(diff_workers) if diff_workers > 1 else None
+        self._commit_store: Optional[CommitStore] = None
+        self._commit_store_lock = threading.Lock()
+        self._reachability: Optional[ReachabilityIndex] = None
+        self._reachability_lock = threading.Lock()
+        # (packed-refs mtime and size, refs, whether packed tags are peeled)
+        self._packed_refs: Tuple[Any, Dict[str, PackedRef], bool] = (None, {}, False)
+        # Anything derived from refs is cached per stamp, so unchanged refs are never listed
+        self.ref_stamp = RefStamp(self.git_dir)
+        self._ref_snapshot: Tuple[Any, List[Tuple[str, str]]] = (None, [])
+        # Tag object SHA -> the object it finally points at
+        self.peeled_tag_cache = LRUCache("peeled_tags", PEELED_TAG_CACHE_BYTES)
+        # Tip commit ID -> bitmap, for the current reachability index
+        self.reachability_cache = LRUCache("reachability", REACHABILITY_CACHE_BYTES)
+        self._history: Optional[HistoryOrder] = None
+        self._history_lock = threading.Lock()
+        self._changed_paths: Optional[ChangedPathIndex] = None
+        self._changed_paths_lock = threading.Lock()
+        # (ref stamp, ref snapshot and HEAD, counts)
+        self._summary: Optional[Tuple[Any, Tuple, Dict[str, int]]] = None
+        # Revision expression -> SHA, for the ref stamp in _revision_key
+        self._revision_key: Any = None
+        self.revision_cache = LRUCache("revisions", REVISION_CACHE_BYTES)
+        # Keyed by ref snapshot and query, so moved refs never hit stale entries
+        self.stats_cache = LRUCache("stats", STATS_CACHE_BYTES)
+        # (old blob SHA, new blob SHA, path) -> (generate_diff result, hunk offsets)
+        self.hunk_cache = LRUCache("hunks", HUNK_CACHE_BYTES)
+
+        # Parsed objects are needed by nearly every request and indexes are
+        # expensive to rebuild, so they outlast hunks under pressure
+        self.memory = MemoryBudget(memory_limit)
+        self.memory.register(self.object_parser.cache, weight=4)
+        self.memory.register(self.object_parser.file_counts, weight=2)
+        self.memory.register(self.stats_cache, weight=2)
+        self.memory.register(self.hunk_cache, weight=1)
+        self.memory.register(self.peeled_tag_cache, weight=1)
+        self.memory.register(self.revision_cache, weight=1)
+        self.memory.register(self.reachability_cache, weight=3)
+        self.memory.register(
+            Rebuildable("history", self._history_bytes, lambda: setattr(self, "_history", None)), weight=3
+        )
+        self.memory.register(
+            Rebuildable("changed_paths", self._changed_paths_bytes, lambda: setattr(self, "_changed_paths", None)),
+            weight=3,
+        )
+        self.memory.register(Rebuildable("pack_bitmaps", self._pack_bitmap_bytes, self._release_pack_bitmaps), weight=1)
+        self.memory.register_fixed(
+            "commit_store", lambda: self._commit_store.memory_bytes() if self._commit_store is not None else 0
+        )
+        self.memory.register_fixed("pack_bitmap_files", self._pack_bitmap_file_bytes)
+
+    def _history_bytes(self) -> int:
+        history = self._history
+        return history.memory_bytes() if history is not None else 0
+
+    def _changed_paths_bytes(self) -> int:
+        index = self._changed_paths
+        return index.memory_bytes() if index is not None else 0
+
+    def _pack_bitmaps(self) -> list:
+        index = self._reachability
+        return index.pack_bitmaps if index is not None else []
+
+    def _pack_bitmap_bytes(self) -> int:
+        return sum(pack_bitmap.memory_bytes() for pack_bitmap in self._pack_bitmaps())
+
+    def _pack_bitmap_file_bytes(self) -> int:
+        return sum(pack_bitmap.file_bytes() for pack_bitmap in self._pack_bitmaps())
+
+    def _release_pack_bitmaps(self):
+        for pack_bitmap in self._pack_bitmaps():
+            pack_bitmap.release(mapping=True)
+
+    def close(self):
+        """Stop the diff worker processes."""
+        if self._diff_pool is not None:
+            self._diff_pool.close()
 
     def parse_repository(self) -> GitRepository:
         """Parse the complete repository structure.
@@ -47,7 +199,7 @@ class GitParser:
             GitRepository object with all repository information
         """
         branches = self.get_branches()
-        tags = self.get_tags()
+        tags = self.get_tags(messages=True)
         current_branch = self.get_current_branch()
 
         # Get all commits from all branches
@@ -79,87 +231,175 @@ class GitParser:
         except Exception:
             return None
 
-    def get_branches(self) -> List[GitBranch]:
-        """Get all branches in the repository."""
-        branches = []
-        heads_dir = self.git_dir / "refs" / "heads"
+    def get_branches(self, tracking: bool = False) -> List[GitBranch]:
+        """Get all local branches, loose and packed, sorted by name.
 
-        if not heads_dir.exists():
-            return branches
+        Each branch's upstream comes from .git/config. Ahead/behind counts
+        against the upstreams cost a history walk, so they are only filled
+        in when asked for.
 
+        Args:
+            tracking: Count commits ahead of and behind each upstream
+        """
         current_branch = self.get_current_branch()
+        config = read_config(self.git_dir / "config")
+        branches = []
+        for name, commit_sha in sorted(self._list_refs("refs/heads/").items()):
+            upstream = self.upstream_ref(name, config)
+            branches.append(
+                GitBranch(
+                    name=name,
+                    commit_sha=commit_sha,
+                    is_current=(name == current_branch),
+                    upstream=_short_ref(upstream) if upstream else None,
+                )
+            )
+        if tracking:
+            self._fill_tracking(branches, config)
+        return branches
+
+    def get_remote_branches(self) -> List[GitBranch]:
+        """Get all remote-tracking branches (e.g. "origin/main"), sorted by name.
 
-        # Recursively find all branch files
-        for branch_file in heads_dir.rglob("*"):
-            if branch_file.is_file():
+        Symbolic refs such as origin/HEAD are left out.
+        """
+        return [
+            GitBranch(name=name, commit_sha=commit_sha)
+            for name, commit_sha in sorted(self._list_refs("refs/remotes/").items())
+        ]
+
+    def _list_refs(self, prefix: str) -> Dict[str, str]:
+        """Loose and packed refs under a prefix like "refs/heads/", by name below it."""
+        refs = {
+            ref[len(prefix):]: entry.sha
+            for ref, entry in self.packed_refs()[0].items()
+            if ref.startswith(prefix)
+        }
+        ref_dir = self.git_dir / prefix
+        if not ref_dir.exists():
+            return refs
+        for ref_file in ref_dir.rglob("*"):
+            if ref_file.is_file():
                 try:
-                    with open(branch_file, "r") as f:
-                        commit_sha = f.read().strip()
-
-                    # Get branch name relative to refs/heads
-                    branch_name = str(branch_file.relative_to(heads_dir))
-
-                    branches.append(
-                        GitBranch(
-                            name=branch_name,
-                            commit_sha=commit_sha,
-                            is_current=(branch_name == current_branch),
-                        )
-                    )
-                except Exception as e:
-                    print(f"Error reading branch {branch_file}: {e}")
+                    value = ref_file.read_text().strip()
+                except OSError as e:
+                    print(f"Error reading ref {ref_file}: {e}")
+                    continue
+                name = ref_file.relative_to(ref_dir).as_posix()
+                # Loose refs take precedence over packed ones
+                if revisions.FULL_SHA_RE.fullmatch(value):
+                    refs[name] = value
+                else:
+                    refs.pop(name, None)
+        return refs
+
+    def _fill_tracking(self, branches: List[GitBranch], config: Dict[str, Dict[str, str]]):
+        """Set ahead/behind of branches with an upstream, all in one walk."""
+        store = self.get_commit_store()
+        remotes = {f"refs/remotes/{b.name}": b.commit_sha for b in self.get_remote_branches()}
+        locals_ = {f"refs/heads/{b.name}": b.commit_sha for b in branches}
+        pairs = []
+        tracked = []
+        for branch in branches:
+            if not branch.upstream:
+                continue
+            ref = self.upstream_ref(branch.name, config)
+            upstream_sha = remotes.get(ref) or locals_.get(ref)
+            tip, base = store.index_of(branch.commit_sha), store.index_of(upstream_sha or "")
+            if tip is not None and base is not None:
+                pairs.append((tip, base))
+                tracked.append(branch)
+        for branch, counts in zip(tracked, reachability.ahead_behind_pairs(store, pairs)):
+            branch.ahead = counts["ahead"]
+            branch.behind = counts["behind"]
+
+    def get_tags(self, messages: bool = False) -> List[GitTag]:
+        """Get all tags in the repository, loose and packed, sorted by name.
+
+        Annotated tags are peeled to the object they finally point at
+        (following tag-of-tag chains). Peeled targets come from the "^"
+        lines of packed-refs where possible; otherwise the tag object is
+        read once and the result kept per object SHA, since objects never
+        change. Tag messages need the tag object, so they are only read
+        when asked for.
 
-        return branches
+        Args:
+            messages: Include the messages of annotated tags
+        """
+        refs: Dict[str, Tuple[str, Optional[str]]] = {}
+        packed, peeled_tags = self.packed_refs()
+        for ref, entry in packed.items():
+            if ref.startswith("refs/tags/"):
+                # Without a "^" line a packed tag is known to be lightweight
+                peeled = entry.peeled or (entry.sha if peeled_tags else None)
+                refs[ref[len("refs/tags/"):]] = (entry.sha, peeled)
 
-    def get_tags(self) -> List[GitTag]:
-        """Get all tags in the repository."""
-        tags = []
         tags_dir = self.git_dir / "refs" / "tags"
+        if tags_dir.exists():
+            for tag_file in tags_dir.rglob("*"):
+                if tag_file.is_file():
+                    try:
+                        ref = tag_file.read_text().strip()
+                    except OSError as e:
+                        print(f"Error reading tag {tag_file}: {e}")
+                        continue
+                    # Loose refs take precedence over packed ones
+                    refs[tag_file.relative_to(tags_dir).as_posix()] = (ref, None)
 
-        if not tags_dir.exists():
-            return tags
-
-        for tag_file in tags_dir.rglob("*"):
-            if tag_file.is_file():
-                try:
-                    with open(tag_file, "r") as f:
-                        ref = f.read().strip()
-
-                    tag_name = str(tag_file.relative_to(tags_dir))
-
-                    # Check if it's an annotated tag
-                    obj_data = self.object_parser.read_object(ref)
-                    if obj_data and obj_data[0] == "tag":
-                        # Annotated tag - parse to get commit SHA
-                        tag_content = obj_data[1].decode("utf-8", errors="replace")
-                        commit_sha = None
-                        message = []
-                        in_message = False
-
-                        for line in tag_content.split("\n"):
-                            if in_message:
-                                message.append(line)
-                            elif line.startswith("object "):
-                                commit_sha = line.split(" ", 1)[1]
-                            elif line == "":
-                                in_message = True
-
-                        tags.append(
-                            GitTag(
-                                name=tag_name,
-                                commit_sha=commit_sha or ref,
-                                tag_type="annotated",
-                                message="\n".join(message).strip(),
-                            )
-                        )
-                    else:
-                        # Lightweight tag - points directly to commit
-                        tags.append(GitTag(name=tag_name, commit_sha=ref, tag_type="lightweight"))
+        tags = []
+        for name in sorted(refs):
+            ref, peeled = refs[name]
+            if peeled is None:
+                peeled = self._peel_tag(ref)
+                if peeled is None:
+                    print(f"Error reading tag {name}: object {ref} not found")
+                    continue
+            annotated = peeled != ref
+            tags.append(
+                GitTag(
+                    name=name,
+                    commit_sha=peeled,
+                    tag_type="annotated" if annotated else "lightweight",
+                    message=self.tag_message(ref) if messages and annotated else None,
+                )
+            )
+        return tags
 
-                except Exception as e:
-                    print(f"Error reading tag {tag_file}: {e}")
+    def packed_refs(self) -> Tuple[Dict[str, PackedRef], bool]:
+        """Get the parsed packed-refs file, re-read only when it changes.
 
-        return tags
+        Returns:
+            Tuple of (ref name -> PackedRef, whether packed tags are peeled)
+        """
+        path = self.git_dir / "packed-refs"
+        try:
+            stat = path.stat()
+        except OSError:
+            return {}, False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._packed_refs
+        if cached[0] != stamp:
+            cached = (stamp, *read_packed_refs(path))
+            self._packed_refs = cached
+        return cached[1], cached[2]
+
+    def _peel_tag(self, sha: str) -> Optional[str]:
+        """Peel a tag ref's object, remembering the result per object SHA."""
+        peeled = self.peeled_tag_cache.get(sha)
+        if peeled is None:
+            peeled = self._peel(sha)
+            if peeled is not None:
+                self.peeled_tag_cache.put(sha, peeled, SHA_ENTRY_BYTES)
+        return peeled
+
+    def tag_message(self, sha: str) -> Optional[str]:
+        """Read the message of an annotated tag object."""
+        obj_data = self.object_parser.read_object(sha)
+        if not obj_data or obj_data[0] != "tag":
+            return None
+        content = obj_data[1].decode("utf-8", errors="replace")
+        _, _, message = content.partition("\n\n")
+        return message.strip()
 
     def get_commit(self, sha: str) -> Optional[GitCommit]:
         """Get a specific commit by SHA.
@@ -187,6 +427,86 @@ class GitParser:
             full_message=commit_data["full_message"],
         )
 
+    def get_root_tree(self, sha: str) -> Optional[str]:
+        """Resolve a commit or tree SHA to a root tree SHA.
+
+        Args:
+            sha: Commit or tree SHA-1 hash
+
+        Returns:
+            Tree SHA or None if the object is neither a commit nor a tree
+        """
+        obj_data = self.object_parser.read_object(sha)
+        if not obj_data:
+            return None
+
+        if obj_data[0] == "commit":
+            return self.object_parser.parse_commit(obj_data[1])["tree"]
+        if obj_data[0] == "tree":
+            return sha
+        return None
+
+    def list_directory(self, sha: str, path: str = "") -> Optional[List[GitTreeEntry]]:
+        """List one directory level of a commit or tree.
+
+        Only the trees along the path are read; nothing below the listed
+        directory is touched.
+
+        Args:
+            sha: Commit or tree SHA-1 hash
+            path: Directory path relative to the repository root
+
+        Returns:
+            List of GitTreeEntry objects or None if the directory does not exist
+        """
+        root_tree = self.get_root_tree(sha)
+        if not root_tree:
+            return None
+
+        path = path.strip("/")
+        entry = self.object_parser.resolve_path(root_tree, path)
+        if not entry or entry["type"] != "tree":
+            return None
+
+        entries = self.object_parser.list_tree(entry["sha"])
+        if entries is None:
+            return None
+
+        return [
+            GitTreeEntry(
+                name=e["name"],
+                path=f"{path}/{e['name']}" if path else e["name"],
+                type=e["type"],
+                mode=e["mode"],
+                sha=e["sha"],
+            )
+            for e in entries
+        ]
+
+    def open_blob(self, sha: str, path: str) -> Optional[Tuple[str, int, Iterator[bytes]]]:
+        """Open a file of a commit or tree for streaming.
+
+        Args:
+            sha: Commit or tree SHA-1 hash
+            path: File path relative to the repository root
+
+        Returns:
+            Tuple of (blob_sha, size, chunk_iterator) or None if not a file
+        """
+        root_tree = self.get_root_tree(sha)
+        if not root_tree:
+            return None
+
+        entry = self.object_parser.resolve_path(root_tree, path.strip("/"))
+        if not entry or entry["type"] != "blob":
+            return None
+
+        stream = self.object_parser.stream_object(entry["sha"])
+        if not stream or stream[0] != "blob":
+            return None
+
+        return entry["sha"], stream[1], stream[2]
+
     def get_all_commits(
         self, branches: List[GitBranch], max_commits: int = 1000
     ) -> List[GitCommit]:
@@ -219,23 +539,598 @@ class GitParser:
 
         return commits
 
-    def get_commit_graph(self, branches: Optional[List[GitBranch]] = None, max_commits: int = 1000) -> List[GitGraphNode]:
+    def ref_snapshot(self) -> List[Tuple[str, str]]:
+        """Sorted (ref name, commit SHA) pairs of all branches, remote-tracking branches and tags.
+
+        Equal snapshots mean no ref moved, so anything derived from history
+        can be reused. The refs are only listed again when the ref stamp
+        changed.
+        """
+        stamp = self.ref_stamp.current()
+        cached = self._ref_snapshot
+        if stamp is not None and cached[0] == stamp:
+            return cached[1]
+        refs = [(f"refs/heads/{name}", sha) for name, sha in self._list_refs("refs/heads/").items()]
+        refs += [(f"refs/remotes/{b.name}", b.commit_sha) for b in self.get_remote_branches()]
+        refs += [(f"refs/tags/{t.name}", t.commit_sha) for t in self.get_tags()]
+        snapshot = sorted(refs)
+        self._ref_snapshot = (stamp, snapshot)
+        return snapshot
+
+    def get_commit_store(self) -> CommitStore:
+        """Get the columnar commit store, updated for the current refs.
+
+        The store is loaded from .git/git-browser on first use, extended
+        with commits added since it was saved, and written back whenever
+        the ref snapshot changes.
+        """
+        snapshot = self.ref_snapshot()
+        with self._commit_store_lock:
+            store = self._commit_store
+            if store is None:
+                store = CommitStore.load(CommitStore.path_for(self.git_dir)) or CommitStore()
+
+            if store.snapshot != snapshot:
+                store.extend(self.object_parser, [sha for _, sha in snapshot])
+                store.snapshot = snapshot
+                store.save(CommitStore.path_for(self.git_dir))
+
+            self._commit_store = store
+            return store
+
+    def refresh(self):
+        """Bring the commit store and the indexes derived from it up to date.
+
+        Requests do this lazily when they notice that refs moved; calling
+        it after a fetch or pull does the work before the next request.
+        """
+        self.get_reachability_index()
+        self.get_history_order()
+        self.get_summary()
+
+    def get_reachability_index(self) -> ReachabilityIndex:
+        """Get per-ref reachability bitmaps, updated for the current refs.
+
+        Bitmaps of refs that did not move are kept; only new ref tips are
+        walked, reusing older tips' bitmaps and git's pack bitmaps.
+        """
+        store = self.get_commit_store()
+        with self._reachability_lock:
+            index = self._reachability
+            if index is None or index.store is not store:
+                # Cached bitmaps use the old store's commit IDs
+                self.reachability_cache.clear()
+                index = ReachabilityIndex(
+                    store, self.reachability_cache, load_pack_bitmaps(self.object_parser.packs.packs)
+                )
+
+            if index.snapshot != store.snapshot:
+                tips = [store.index_of(sha) for _, sha in store.snapshot]
+                index.update(tip for tip in tips if tip is not None)
+                index.snapshot = store.snapshot
+
+            self._reachability = index
+        self.memory.charge()
+        return index
+
+    def contained_in(self, sha: str) -> Dict[str, List[str]]:
+        """Branches and tags whose history includes a commit.
+
+        Args:
+            sha: Commit SHA-1 hash
+
+        Returns:
+            Dictionary with sorted "branches", "remotes" and "tags" name lists
+        """
+        index = self.get_reachability_index()
+        commit_id = index.store.index_of(sha)
+        result: Dict[str, List[str]] = {"branches": [], "remotes": [], "tags": []}
+        if commit_id is None:
+            return result
+
+        tips = set(index.containing(commit_id))
+        for ref, ref_sha in index.snapshot:
+            if index.store.index_of(ref_sha) not in tips:
+                continue
+            if ref.startswith("refs/heads/"):
+                result["branches"].append(ref[len("refs/heads/"):])
+            elif ref.startswith("refs/remotes/"):
+                result["remotes"].append(ref[len("refs/remotes/"):])
+            elif ref.startswith("refs/tags/"):
+                result["tags"].append(ref[len("refs/tags/"):])
+        return result
+
+    def get_summary(self) -> Dict[str, int]:
+        """Exact commit, author, file and object counts.
+
+        Commits and authors are counted over the union of the per-ref
+        reachability bitmaps, files over HEAD's tree with per-tree cached
+        counts and objects from the pack index headers. The result is kept
+        until a ref or HEAD moves, which the ref stamp tells without listing
+        refs; all parts update incrementally then.
+        """
+        stamp = self.ref_stamp.current()
+        summary = self._summary
+        if stamp is not None and summary is not None and summary[0] == stamp:
+            return summary[2]
+
+        index = self.get_reachability_index()
+        store = index.store
+        head = self.resolve_ref("HEAD")
+        key = (tuple(index.snapshot), head)
+        if summary is not None and summary[1] == key:
+            self._summary = (stamp, key, summary[2])
+            return summary[2]
+
+        reachable = index.union()
+        head_commit = self.get_commit(head) if head else None
+        objects = self.object_parser.count_objects()
+        counts = {
+            # int.bit_count() needs Python 3.10
+            "commit_count": bin(reachable).count("1"),
+            "author_count": stats.distinct_authors(store, reachable),
+            "file_count": self.object_parser.count_files(head_commit.tree) if head_commit else 0,
+            "object_count": objects["packed"] + objects["loose"],
+            "packed_object_count": objects["packed"],
+            "loose_object_count": objects["loose"],
+        }
+        self._summary = (stamp, key, counts)
+        return counts
+
+    def find_commits(
+        self,
+        branches: List[GitBranch],
+        limit: int,
+        author: Optional[str] = None,
+        search: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        file_path: Optional[str] = None,
+    ) -> List[GitCommit]:
+        """Find commits reachable from branches matching the filters, newest first.
+
+        Reachability, author and time filters run over the commit store, so
+        they cover the whole history and only matching commits are read.
+        Message and path filters still need the commit objects; they are
+        checked on at most limit * 3 candidates, like before.
+
+        Args:
+            branches: Branches whose history is searched
+            limit: Maximum number of commits to return
+            author: Filter by author name or email (case-insensitive)
+            search: Search in commit message (case-insensitive)
+            since: Only commits after this timestamp
+            until: Only commits before this timestamp
+            file_path: Only commits that modified this file path
+
+        Returns:
+            List of matching GitCommit objects
+        """
+        store = self.get_commit_store()
+        tips = [store.index_of(branch.commit_sha) for branch in branches]
+        ids = store.select(tips, author=author, since=since, until=until)
+
+        if search or file_path:
+            ids = ids[: limit * 3]
+
+        commits = []
+        for commit_id in ids:
+            commit = self.get_commit(store.sha_of(commit_id))
+            if commit is None:
+                continue
+            if (search or file_path) and not self.filter_commits(
+                [commit], search=search, file_path=file_path
+            ):
+                continue
+            commits.append(commit)
+            if len(commits) >= limit:
+                break
+
+        return commits
+
+    def _select_for_stats(
+        self,
+        store: CommitStore,
+        branches: List[GitBranch],
+        author: Optional[str],
+        since: Optional[int],
+        until: Optional[int],
+        file_path: Optional[str],
+    ) -> List[int]:
+        ids = store.select(
+            [store.index_of(branch.commit_sha) for branch in branches],
+            author=author,
+            since=since,
+            until=until,
+        )
+        if file_path and file_path.strip("/"):
+            ids = self.get_changed_path_index().touching(ids, file_path)
+        return ids
+
+    def get_changed_path_index(self) -> ChangedPathIndex:
+        """Get the paths changed by every commit, updated for the current refs.
+
+        The index is built on the first path-filtered query, which diffs
+        every commit against its first parent once; later queries only
+        diff commits added since.
+        """
+        store = self.get_commit_store()
+        with self._changed_paths_lock:
+            index = self._changed_paths
+            if index is None or index.store is not store:
+                index = ChangedPathIndex(store)
+            index.update(self.object_parser)
+            self._changed_paths = index
+        self.memory.charge()
+        return index
+
+    def _cached_stats(self, key: Tuple, compute) -> Any:
+        result = self.stats_cache.get(key)
+        if result is None:
+            result = compute()
+            # Rough size of the JSON a bucket turns into
+            self.stats_cache.put(key, result, 128 * (len(result) + 1))
+        return result
+
+    def get_activity(
+        self,
+        branches: List[GitBranch],
+        group_by: List[str],
+        author: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Count commits grouped by author, week, weekday and/or hour.
+
+        Results are cached per ref snapshot, so repeated dashboard queries
+        are answered without touching the store again.
+
+        Args:
+            branches: Branches whose history is counted
+            group_by: Dimensions to group by, see stats.DIMENSIONS
+            author: Filter by author name or email (case-insensitive)
+            since: Only commits after this timestamp
+            until: Only commits before this timestamp
+            file_path: Only commits that modified this path
+
+        Returns:
+            List of buckets, see stats.activity
+        """
+        store = self.get_commit_store()
+        key = (
+            "activity",
+            tuple(store.snapshot),
+            tuple(sorted(b.commit_sha for b in branches)),
+            tuple(group_by),
+            author,
+            since,
+            until,
+            file_path,
+        )
+        return self._cached_stats(
+            key,
+            lambda: stats.activity(
+                store, self._select_for_stats(store, branches, author, since, until, file_path), group_by
+            ),
+        )
+
+    def get_author_stats(
+        self,
+        branches: List[GitBranch],
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Summarize every author's commits, most active first.
+
+        Args:
+            branches: Branches whose history is counted
+            since: Only commits after this timestamp
+            until: Only commits before this timestamp
+            file_path: Only commits that modified this path
+
+        Returns:
+            List of author summaries, see stats.author_summary
+        """
+        store = self.get_commit_store()
+        key = (
+            "authors",
+            tuple(store.snapshot),
+            tuple(sorted(b.commit_sha for b in branches)),
+            since,
+            until,
+            file_path,
+        )
+        return self._cached_stats(
+            key,
+            lambda: stats.author_summary(
+                store, self._select_for_stats(store, branches, None, since, until, file_path)
+            ),
+        )
+
+    def resolve_ref(self, name: str) -> Optional[str]:
+        """Resolve HEAD, a branch, a tag or a commit SHA to a commit SHA."""
+        try:
+            return self.resolve_revision(name)
+        except ValueError:
+            return None
+
+    def _read_ref(self, ref: str, depth: int = 0) -> Optional[str]:
+        """Read a full ref name (loose file first, then packed-refs), following symrefs."""
+        ref_file = self.git_dir / ref
+        value = None
+        if ref_file.is_file():
+            value = ref_file.read_text().strip()
+        else:
+            entry = self.packed_refs()[0].get(ref)
+            value = entry.sha if entry else None
+        if value and value.startswith("ref: ") and depth < 5:
+            return self._read_ref(value[5:], depth + 1)
+        return value if value and revisions.FULL_SHA_RE.fullmatch(value) else None
+
+    def upstream_ref(self, branch: str, config: Optional[Dict[str, Dict[str, str]]] = None) -> Optional[str]:
+        """Remote-tracking ref a branch is configured to track, from .git/config.
+
+        Args:
+            branch: Local branch name
+            config: Already parsed config, to avoid re-reading it per branch
+        """
+        if config is None:
+            config = read_config(self.git_dir / "config")
+        section = config.get(f"branch.{branch}", {})
+        remote, merge = section.get("remote"), section.get("merge")
+        if not remote or not merge:
+            return None
+        if remote == ".":
+            return merge  # Tracks a local branch
+        if merge.startswith("refs/heads/"):
+            merge = merge[len("refs/heads/"):]
+        return f"refs/remotes/{remote}/{merge}"
+
+    def reflog_ref(self, name: str) -> Optional[str]:
+        """Full name of the ref whose reflog a name refers to, like git's DWIM rules."""
+        if ".." in name.split("/") or name.startswith("/"):
+            return None
+        candidates = [name] if name == "HEAD" or name.startswith("refs/") else []
+        candidates += [f"refs/{name}", f"refs/tags/{name}", f"refs/heads/{name}", f"refs/remotes/{name}"]
+        for ref in candidates:
+            if (self.git_dir / "logs" / ref).is_file():
+                return ref
+        return None
+
+    def get_reflog(self, name: str, cursor: Optional[int] = None, limit: int = 50) -> Optional[GitReflogPage]:
+        """Read a page of a ref's reflog, newest entries first.
+
+        The log file is read backward from the cursor in fixed-size blocks,
+        so recent entries of a huge reflog cost one block.
+
+        Args:
+            name: HEAD, a branch, remote-tracking branch, tag or full ref name
+            cursor: next_cursor of the previous page (default: newest entries)
+            limit: Maximum number of entries to return
+
+        Returns:
+            GitReflogPage, or None if the ref has no reflog
+
+        Raises:
+            ValueError: If the cursor is not one this reflog returned
+        """
+        ref = self.reflog_ref(name)
+        if ref is None:
+            return None
+        entries, next_cursor = reflog.read_reflog(self.git_dir / "logs" / ref, cursor, limit)
+        return GitReflogPage(
+            ref=ref,
+            entries=[GitReflogEntry(**entry) for entry in entries],
+            next_cursor=next_cursor,
+        )
+
+    def _peel(self, sha: str) -> Optional[str]:
+        """Follow annotated tags to the object they point at."""
+        for _ in range(10):
+            obj_data = self.object_parser.read_object(sha)
+            if not obj_data or obj_data[0] != "tag":
+                return sha if obj_data else None
+            header = obj_data[1].split(b"\n", 1)[0]
+            if not header.startswith(b"object "):
+                return None
+            sha = header[7:].decode("ascii")
+        return None
+
+    def _resolve_name(self, name: str, upstream: bool) -> Tuple[Optional[str], bool]:
+        """Resolve the starting name of a revision.
+
+        Returns:
+            Tuple of (object SHA or None, whether the result only depends
+            on refs and HEAD, which the ref stamp covers, and can be cached)
+        """
+        if upstream:
+            branch = name if name and name != "HEAD" else self.get_current_branch()
+            if not branch:
+                raise ValueError("HEAD is detached and has no upstream")
+            ref = self.upstream_ref(branch)
+            if ref is None:
+                raise ValueError(f"No upstream configured for branch {branch}")
+            return self._read_ref(ref), False
+
+        if name == "HEAD":
+            return self._read_ref("HEAD"), True
+
+        # Same precedence as git (see gitrevisions)
+        for ref in (
+            name,
+            f"refs/{name}",
+            f"refs/tags/{name}",
+            f"refs/heads/{name}",
+            f"refs/remotes/{name}",
+            f"refs/remotes/{name}/HEAD",
+        ):
+            if not ref.startswith("refs/"):
+                continue
+            sha = self._read_ref(ref)
+            if sha:
+                return sha, True
+
+        if revisions.ABBREV_SHA_RE.fullmatch(name):
+            matches = self.object_parser.find_prefix(name)
+            if len(matches) > 1:
+                raise ValueError(f"Short SHA {name} is ambiguous")
+            return (matches[0] if matches else None), True
+        return None, True
+
+    def _navigate(self, sha: str, steps) -> Optional[str]:
+        """Apply ~n, ^n and ^{type} steps to an object."""
+        for op, arg in steps:
+            commit = self.get_commit(self._peel(sha) or "")
+            if commit is None:
+                return None
+            if op == "peel":
+                sha = commit.tree if arg == "tree" else commit.sha
+            elif op == "^":
+                if arg == 0:
+                    sha = commit.sha
+                elif arg > len(commit.parents):
+                    return None
+                else:
+                    sha = commit.parents[arg - 1]
+            else:
+                for _ in range(arg):
+                    if not commit.parents:
+                        return None
+                    commit = self.get_commit(commit.parents[0])
+                    if commit is None:
+                        return None
+                sha = commit.sha
+        return sha
+
+    def resolve_revision(self, spec: str) -> Optional[str]:
+        """Resolve a revision expression (see revisions) to an object SHA.
+
+        Annotated tags resolve to the object they tag. Results are cached
+        until the ref stamp changes, so a cached lookup costs a few stat
+        calls however many refs there are; full SHAs are returned without
+        any lookup.
+
+        Returns:
+            Full SHA, or None if the revision does not exist
+
+        Raises:
+            ValueError: If the expression is malformed or an abbreviated
+                SHA is ambiguous
+        """
+        spec = spec.strip()
+        if revisions.FULL_SHA_RE.fullmatch(spec):
+            return spec.lower()
+
+        stamp = self.ref_stamp.current()
+        if stamp is None or self._revision_key != stamp:
+            self.revision_cache.clear()
+            self._revision_key = stamp
+        cached = self.revision_cache.get(spec)
+        if cached is not None:
+            return cached
+
+        revision = revisions.parse_revision(spec)
+        sha, cacheable = self._resolve_name(revision.name, revision.upstream)
+        if sha is not None:
+            sha = self._navigate(sha, revision.steps) if revision.steps else self._peel(sha)
+        if sha is not None and cacheable and stamp is not None:
+            self.revision_cache.put(spec, sha, len(spec) + SHA_ENTRY_BYTES)
+        return sha
+
+    def resolve_range(self, spec: str) -> Optional[Tuple[str, str, str]]:
+        """Resolve "A..B" or "A...B" to (A's SHA, separator, B's SHA).
+
+        Returns:
+            None if spec is not a range or a side does not exist
+
+        Raises:
+            ValueError: As resolve_revision
+        """
+        parts = revisions.split_range(spec)
+        if parts is None:
+            return None
+        left, separator, right = parts
+        left_sha, right_sha = self.resolve_revision(left), self.resolve_revision(right)
+        if left_sha is None or right_sha is None:
+            return None
+        return left_sha, separator, right_sha
+
+    def _store_ids(self, store: CommitStore, shas: List[str]) -> List[int]:
+        ids = []
+        for sha in shas:
+            commit_id = store.index_of(sha)
+            if commit_id is None:
+                raise ValueError(f"Commit is not reachable from any ref: {sha}")
+            ids.append(commit_id)
+        return ids
+
+    def compare_refs(self, base_sha: str, head_sha: str, limit: int = 250) -> Dict[str, Any]:
+        """Relate two commits: merge bases, ahead/behind and the base..head range.
+
+        Args:
+            base_sha: Commit the head is compared against
+            head_sha: Commit compared with the base
+            limit: Maximum number of commits listed from base..head
+
+        Returns:
+            Dictionary with merge_bases, ahead (commits only in head), behind
+            (commits only in base) and the first commits of base..head,
+            children before parents
+        """
+        store = self.get_commit_store()
+        base, head = self._store_ids(store, [base_sha, head_sha])
+        counts = reachability.ahead_behind(store, base, [head])[0]
+
+        commits = []
+        for commit_id in reachability.iter_range(store, base, head):
+            if len(commits) >= limit:
+                break
+            commit = self.get_commit(store.sha_of(commit_id))
+            if commit:
+                commits.append(commit)
+
+        return {
+            "merge_bases": [store.sha_of(c) for c in reachability.merge_bases(store, base, head)],
+            "ahead": counts["ahead"],
+            "behind": counts["behind"],
+            "commits": commits,
+            "truncated": counts["ahead"] > len(commits),
+        }
+
+    def ahead_behind(self, base_sha: str, head_shas: List[str]) -> List[Dict[str, int]]:
+        """Ahead/behind counts of many commits against one base, from a single walk."""
+        store = self.get_commit_store()
+        ids = self._store_ids(store, [base_sha] + head_shas)
+        return reachability.ahead_behind(store, ids[0], ids[1:])
+
+    def get_commit_graph(
+        self,
+        branches: Optional[List[GitBranch]] = None,
+        max_commits: int = 1000,
+        remotes: Optional[List[GitBranch]] = None,
+    ) -> List[GitGraphNode]:
         """Get commit graph for visualization.
 
         Args:
             branches: Optional list of branches to include. If None, includes all branches.
             max_commits: Maximum number of commits to include
+            remotes: Remote-tracking branches to include as well, decorated
+                separately from local branches
 
         Returns:
             List of GitGraphNode objects
         """
         if branches is None:
             branches = self.get_branches()
+        remotes = remotes or []
         tags = self.get_tags()
-        commits = self.get_all_commits(branches, max_commits)
+        commits = self.get_all_commits(branches + remotes, max_commits)
 
         # Build SHA to branches/tags mapping
         sha_to_branches: Dict[str, List[str]] = {}
+        sha_to_remotes: Dict[str, List[str]] = {}
         sha_to_tags: Dict[str, List[str]] = {}
 
         for branch in branches:
@@ -243,6 +1138,9 @@ class GitParser:
                 sha_to_branches[branch.commit_sha] = []
             sha_to_branches[branch.commit_sha].append(branch.name)
 
+        for remote in remotes:
+            sha_to_remotes.setdefault(remote.commit_sha, []).append(remote.name)
+
         for tag in tags:
             if tag.commit_sha not in sha_to_tags:
                 sha_to_tags[tag.commit_sha] = []
@@ -258,12 +1156,228 @@ class GitParser:
                 timestamp=commit.author.timestamp,
                 parents=commit.parents,
                 branches=sha_to_branches.get(commit.sha, []),
+                remotes=sha_to_remotes.get(commit.sha, []),
                 tags=sha_to_tags.get(commit.sha, []),
             )
             graph_nodes.append(node)
 
         return graph_nodes
 
+    def get_graph_rows(
+        self,
+        branches: List[GitBranch],
+        max_commits: int,
+        fields: Sequence[str] = GRAPH_FIELDS,
+        indexed: bool = False,
+        abbrev: int = 40,
+        remotes: Optional[List[GitBranch]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get commit graph nodes with only the selected fields.
+
+        Commits come in the same order as get_commit_graph. Unless the
+        message is requested, nodes are built from the commit store and no
+        commit object is read; decorations are only looked up when branches
+        or tags are requested.
+
+        Args:
+            branches: Branches to start from
+            max_commits: Maximum number of commits to include
+            fields: Subset of GRAPH_FIELDS to return
+            indexed: Encode parents as indexes into the returned list
+                (-1 for parents outside it) instead of SHAs
+            abbrev: Number of hex digits of SHAs to return
+            remotes: Remote-tracking branches to start from as well
+
+        Returns:
+            One dictionary per commit with the selected fields
+        """
+        remotes = remotes or []
+        starts = branches + remotes
+        if "message" in fields:
+            rows = [
+                {
+                    "sha": commit.sha,
+                    "message": commit.message,
+                    "author": commit.author.name,
+                    "timestamp": commit.author.timestamp,
+                    "parents": commit.parents,
+                }
+                for commit in self.get_all_commits(starts, max_commits)
+            ]
+        else:
+            store = self.get_commit_store()
+            ids: List[int] = []
+            seen = set()
+            to_visit = deque(store.index_of(branch.commit_sha) for branch in starts)
+            while to_visit and len(ids) < max_commits:
+                commit_id = to_visit.popleft()
+                if commit_id is None or commit_id in seen:
+                    continue
+                seen.add(commit_id)
+                ids.append(commit_id)
+                to_visit.extend(store.parents_of(commit_id))
+            rows = [
+                {
+                    "sha": store.sha_of(commit_id),
+                    "author": store.author_name(store.author_id[commit_id])
+                    if "author" in fields
+                    else None,
+                    "timestamp": store.author_time[commit_id],
+                    "parents": [store.sha_of(parent) for parent in store.parents_of(commit_id)],
+                }
+                for commit_id in ids
+            ]
+
+        return self._select_graph_fields(rows, branches, remotes, fields, indexed, abbrev)
+
+    def _select_graph_fields(
+        self,
+        rows: List[Dict[str, Any]],
+        branches: List[GitBranch],
+        remotes: List[GitBranch],
+        fields: Sequence[str],
+        indexed: bool,
+        abbrev: int,
+    ) -> List[Dict[str, Any]]:
+        """Turn full graph rows into nodes with only the selected fields."""
+        decorations: Dict[str, Dict[str, List[str]]] = {"branches": {}, "remotes": {}, "tags": {}}
+        for field, refs in (("branches", branches), ("remotes", remotes)):
+            if field in fields:
+                for ref in refs:
+                    decorations[field].setdefault(ref.commit_sha, []).append(ref.name)
+        if "tags" in fields:
+            for tag in self.get_tags():
+                decorations["tags"].setdefault(tag.commit_sha, []).append(tag.name)
+
+        positions = {row["sha"]: i for i, row in enumerate(rows)} if indexed else {}
+        nodes = []
+        for row in rows:
+            node: Dict[str, Any] = {}
+            for field in fields:
+                if field == "sha":
+                    node["sha"] = row["sha"][:abbrev]
+                elif field == "parents":
+                    if indexed:
+                        node["parents"] = [positions.get(parent, -1) for parent in row["parents"]]
+                    else:
+                        node["parents"] = [parent[:abbrev] for parent in row["parents"]]
+                elif field in decorations:
+                    node[field] = decorations[field].get(row["sha"], [])
+                else:
+                    node[field] = row[field]
+            nodes.append(node)
+        return nodes
+
+    def get_history_order(self) -> HistoryOrder:
+        """Get the corrected-date order of the whole history, updated for the current refs."""
+        store = self.get_commit_store()
+        with self._history_lock:
+            history = self._history
+            if history is None or history.store is not store:
+                history = HistoryOrder(store)
+            history.update()
+            self._history = history
+        self.memory.charge()
+        return history
+
+    def get_graph_window(
+        self,
+        anchor: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        before: int = 50,
+        after: int = 50,
+        fields: Sequence[str] = GRAPH_FIELDS,
+        abbrev: int = 40,
+    ) -> Dict[str, Any]:
+        """Get the slice of the commit graph around an anchor commit or time.
+
+        Commits of all branches, remote-tracking branches and tags are laid out newest first in
+        corrected-date order (see history.py), which is computed once per
+        ref snapshot. A window is a slice of that order, so the cost of a
+        page does not depend on how deep into history it is: only the
+        window's commits are read, and the lanes coming in from above are
+        found from the parent edges crossing the window's top.
+
+        Args:
+            anchor: SHA of the commit to center on
+            timestamp: Center on the newest commit whose corrected date is
+                at or before this time instead (used when anchor is None)
+            before: Number of newer commits to include above the anchor
+            after: Number of older commits to include below the anchor
+            fields: Subset of GRAPH_FIELDS to return for each node
+            abbrev: Number of hex digits of SHAs to return
+
+        Returns:
+            Dictionary with the anchor's SHA and position, the total number
+            of commits, the window's start position, its nodes (each with
+            its "lane" column), "lanes_in" (the commit each column waits for
+            above the first node, None for free columns), "lanes_out" (the
+            same below the last node, to carry into the next page) and
+            "incoming" ({"sha", "from"} edges from commits above the window)
+
+        Raises:
+            ValueError: If the anchor commit is not reachable from any ref
+        """
+        history = self.get_history_order()
+        store = history.store
+        if anchor is not None:
+            commit_id = store.index_of(anchor)
+            if commit_id is None:
+                raise ValueError(f"Commit is not reachable from any branch or tag: {anchor}")
+            position = int(history.rank[commit_id])
+        else:
+            position = min(history.position_of_time(timestamp or 0), max(len(history) - 1, 0))
+
+        start = max(position - before, 0)
+        end = min(position + after + 1, len(history))
+        ids = [int(commit_id) for commit_id in history.order[start:end]]
+        incoming = history.crossing(start)
+
+        rows = []
+        for commit_id in ids:
+            sha = store.sha_of(commit_id)
+            row = {
+                "sha": sha,
+                "author": store.author_name(store.author_id[commit_id]),
+                "timestamp": store.author_time[commit_id],
+                "parents": [store.sha_of(parent) for parent in store.parents_of(commit_id)],
+            }
+            if "message" in fields:
+                commit = self.get_commit(sha)
+                row["message"] = commit.message if commit else ""
+            rows.append(row)
+
+        lanes: List[Optional[str]] = []
+        for _, parent in incoming:
+            sha = store.sha_of(parent)
+            if sha not in lanes:
+                lanes.append(sha)
+        lanes_in = list(lanes)
+        columns = assign_lanes(lanes, [(row["sha"], row["parents"]) for row in rows])
+
+        nodes = self._select_graph_fields(
+            rows, self.get_branches(), self.get_remote_branches(), fields, False, abbrev
+        )
+        for node, column in zip(nodes, columns):
+            node["lane"] = column
+
+        def short(sha):
+            return sha[:abbrev] if sha else None
+
+        return {
+            "anchor": store.sha_of(history.order[position])[:abbrev] if len(history) else None,
+            "anchor_position": position,
+            "total": len(history),
+            "start": start,
+            "nodes": nodes,
+            "lanes_in": [short(sha) for sha in lanes_in],
+            "lanes_out": [short(sha) for sha in lanes],
+            "incoming": [
+                {"sha": short(store.sha_of(parent)), "from": short(store.sha_of(child))}
+                for child, parent in incoming
+            ],
+        }
+
     def filter_commits(
         self,
         commits: List[GitCommit],
@@ -315,24 +1429,55 @@ class GitParser:
         if file_path:
             filtered_by_file = []
             for commit in filtered:
-                # Get parent tree
-                parent_tree = None
-                if commit.parents:
-                    parent_commit = self.get_commit(commit.parents[0])
-                    if parent_commit:
-                        parent_tree = parent_commit.tree
-
-                # Get changed files
-                files = self.compare_trees(parent_tree, commit.tree)
+                # Changed paths only; no need to diff the files
+                changes = self.tree_changes(self.parent_tree(commit), commit.tree)
 
                 # Check if our file is in the changes
-                if any(f.path == file_path or f.path.startswith(file_path + '/') for f in files):
+                if any(path == file_path or path.startswith(file_path + '/') for path, _, _, _ in changes):
                     filtered_by_file.append(commit)
 
             filtered = filtered_by_file
 
         return filtered
 
+    def tree_changes(
+        self, old_tree_sha: Optional[str], new_tree_sha: str
+    ) -> List[Tuple[str, str, Optional[str], Optional[str]]]:
+        """List changed files between two trees without diffing them.
+
+        Returns:
+            Sorted list of (path, change type, old blob SHA, new blob SHA)
+        """
+        changes = []
+        for path, old_sha, new_sha in self.object_parser.diff_trees(old_tree_sha, new_tree_sha):
+            if old_sha is None:
+                change_type = "added"
+            elif new_sha is None:
+                change_type = "deleted"
+            else:
+                change_type = "modified"
+            changes.append((path, change_type, old_sha, new_sha))
+        return changes
+
+    def describe_changes(
+        self, changes: List[Tuple[str, str, Optional[str], Optional[str]]], with_stats: bool = True
+    ) -> List[GitFileChange]:
+        """Turn tree_changes entries into GitFileChange objects.
+
+        Args:
+            changes: Entries from tree_changes
+            with_stats: Compute additions/deletions; otherwise they stay 0
+        """
+        if not with_stats:
+            return [GitFileChange(path=path, change_type=change_type) for path, change_type, _, _ in changes]
+
+        stats = self.diff_stats([(old_sha, new_sha) for _, _, old_sha, new_sha in changes])
+        return [
+            GitFileChange(path=path, change_type=change_type, **file_stats)
+            for (path, change_type, _, _), file_stats in zip(changes, stats)
+        ]
+
+    @tracing.traced("compare_trees")
     def compare_trees(self, old_tree_sha: Optional[str], new_tree_sha: str) -> List[GitFileChange]:
         """Compare two trees and return file changes.
 
@@ -343,61 +1488,205 @@ class GitParser:
         Returns:
             List of GitFileChange objects
         """
-        # Get tree contents for both trees
-        old_files = self.object_parser.get_tree_contents(old_tree_sha) if old_tree_sha else {}
-        new_files = self.object_parser.get_tree_contents(new_tree_sha)
+        return self.describe_changes(self.tree_changes(old_tree_sha, new_tree_sha))
 
-        file_changes = []
+    def file_stats(
+        self, old_tree_sha: Optional[str], new_tree_sha: str, paths: List[str]
+    ) -> List[GitFileChange]:
+        """Compute file changes with stats for selected paths only.
 
-        # Find all unique file paths
-        all_paths = set(old_files.keys()) | set(new_files.keys())
-
-        for path in sorted(all_paths):
-            old_sha = old_files.get(path)
-            new_sha = new_files.get(path)
+        Only the trees along each path are read. Paths that are unchanged
+        or not files are left out.
 
+        Args:
+            old_tree_sha: Parent tree SHA (None for initial commit)
+            new_tree_sha: Current tree SHA
+            paths: File paths, in the order results should come back
+        """
+        changes = []
+        for path in paths:
+            old_sha, new_sha = self.path_blobs(old_tree_sha, new_tree_sha, path)
             if old_sha == new_sha:
-                # File unchanged
                 continue
-            elif old_sha is None:
-                # File added
-                diff_data = self.generate_diff(None, new_sha, path)
-                file_changes.append(
-                    GitFileChange(
-                        path=path,
-                        change_type="added",
-                        additions=diff_data["additions"],
-                        deletions=diff_data["deletions"],
-                    )
-                )
+            if old_sha is None:
+                change_type = "added"
             elif new_sha is None:
-                # File deleted
-                diff_data = self.generate_diff(old_sha, None, path)
-                file_changes.append(
-                    GitFileChange(
-                        path=path,
-                        change_type="deleted",
-                        additions=diff_data["additions"],
-                        deletions=diff_data["deletions"],
-                    )
-                )
+                change_type = "deleted"
             else:
-                # File modified
-                diff_data = self.generate_diff(old_sha, new_sha, path)
-                file_changes.append(
-                    GitFileChange(
-                        path=path,
-                        change_type="modified",
-                        additions=diff_data["additions"],
-                        deletions=diff_data["deletions"],
-                    )
-                )
+                change_type = "modified"
+            changes.append((path, change_type, old_sha, new_sha))
+        return self.describe_changes(changes)
+
+    def path_blobs(
+        self, old_tree_sha: Optional[str], new_tree_sha: str, path: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Blob SHAs of a file path in two trees (None where it is not a file)."""
+        sides = []
+        for tree_sha in (old_tree_sha, new_tree_sha):
+            entry = self.object_parser.resolve_path(tree_sha, path) if tree_sha else None
+            sides.append(entry["sha"] if entry and entry["type"] == "blob" else None)
+        return sides[0], sides[1]
+
+    @tracing.traced("diff_stats")
+    def diff_stats(
+        self, pairs: List[Tuple[Optional[str], Optional[str]]], deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Compute line statistics of many (old blob SHA, new blob SHA) pairs.
+
+        Blobs are read here; once there are PARALLEL_DIFF_MIN_FILES pairs
+        the line diffs run in the worker pool. Pairs not finished within
+        the deadline get "incomplete" set and zero counts. Results are in
+        the order of pairs.
 
-        return file_changes
+        Args:
+            pairs: Blob SHA pairs (None for a missing side)
+            deadline: Seconds allowed (default: diff_deadline)
+
+        Returns:
+            List of dictionaries with additions, deletions, is_binary,
+            too_large and incomplete
+        """
+        end = time.perf_counter() + (self.diff_deadline if deadline is None else deadline)
+        results = [
+            {"additions": 0, "deletions": 0, "is_binary": False, "too_large": False, "incomplete": True}
+            for _ in pairs
+        ]
+
+        def text_pairs():
+            for i, (old_sha, new_sha) in enumerate(pairs):
+                if time.perf_counter() >= end:
+                    return
+                old_side = self._read_diff_side(old_sha)
+                new_side = self._read_diff_side(new_sha)
+                if self._skip_line_diff(results[i], old_sha, new_sha, old_side, new_side):
+                    results[i]["incomplete"] = False
+                    continue
+                yield i, old_side["content"], new_side["content"]
+
+        def add_cpu_time(seconds: float):
+            if metrics.enabled:
+                metrics.DIFF_CPU_SECONDS.inc(amount=seconds)
+
+        if self._diff_pool is not None and len(pairs) >= PARALLEL_DIFF_MIN_FILES:
+            counts = self._diff_pool.count_changes(text_pairs(), end, on_cpu_time=add_cpu_time)
+        else:
+            counts = {}
+            for i, old, new in text_pairs():
+                cpu_start = time.thread_time()
+                counts[i] = diffing.count_changes(old, new)
+                add_cpu_time(time.thread_time() - cpu_start)
+
+        for i, (additions, deletions) in counts.items():
+            results[i].update(additions=additions, deletions=deletions, incomplete=False)
+        if metrics.enabled:
+            metrics.DIFFS.inc("text", amount=len(counts))
+            incomplete = sum(1 for r in results if r["incomplete"])
+            if incomplete:
+                metrics.DIFFS.inc("incomplete", amount=incomplete)
+        return results
+
+    @tracing.traced("read_blob")
+    def _read_diff_side(self, sha: Optional[str]) -> Dict[str, Any]:
+        """Read one side of a diff through the streaming object reader.
+
+        The blob is inflated chunk by chunk. Reading stops as soon as the
+        blob is known to be binary or over the size limit, so neither case
+        ever holds more than one chunk in memory.
 
+        Returns:
+            Dictionary with "size", "is_binary", "too_large", "lines" (line
+            count or None if not read) and "content" (bytes or None)
+        """
+        side: Dict[str, Any] = {
+            "size": 0,
+            "is_binary": False,
+            "too_large": False,
+            "lines": 0,
+            "content": b"" if sha is None else None,
+        }
+        if sha is None:
+            return side
+
+        stream = self.object_parser.stream_object(sha)
+        if not stream or stream[0] != "blob":
+            side["content"] = b""
+            return side
+
+        _, size, chunks = stream
+        side["size"] = size
+        side["too_large"] = size > self.diff_max_bytes
+
+        parts: List[bytes] = []
+        sniffed = 0
+        lines = 0
+        for chunk in chunks:
+            if sniffed < BINARY_SNIFF_BYTES:
+                if b"\x00" in chunk[: BINARY_SNIFF_BYTES - sniffed]:
+                    side["is_binary"] = True
+                    break
+                sniffed += len(chunk)
+            if side["too_large"]:
+                if sniffed >= BINARY_SNIFF_BYTES:
+                    break
+                continue
+            lines += chunk.count(b"\n")
+            parts.append(chunk)
+
+        if side["is_binary"] or side["too_large"]:
+            side["lines"] = None
+            return side
+
+        content = b"".join(parts)
+        if content and not content.endswith(b"\n"):
+            lines += 1
+        side["lines"] = lines
+        if lines > self.diff_max_lines:
+            side["too_large"] = True
+        else:
+            side["content"] = content
+        return side
+
+    def _skip_line_diff(
+        self,
+        result: Dict[str, Any],
+        old_sha: Optional[str],
+        new_sha: Optional[str],
+        old_side: Dict[str, Any],
+        new_side: Dict[str, Any],
+    ) -> bool:
+        """Flag binary and too large blob pairs in result.
+
+        Returns:
+            True if the pair must not be diffed line by line
+        """
+        if old_side["is_binary"] or new_side["is_binary"]:
+            result["is_binary"] = True
+            if metrics.enabled:
+                metrics.DIFFS.inc("binary")
+            return True
+
+        if old_side["too_large"] or new_side["too_large"]:
+            result["too_large"] = True
+            if metrics.enabled:
+                metrics.DIFFS.inc("too_large")
+            # Whole-file additions/deletions are known without diffing
+            if old_sha is None and new_side["lines"] is not None:
+                result["additions"] = new_side["lines"]
+            if new_sha is None and old_side["lines"] is not None:
+                result["deletions"] = old_side["lines"]
+            return True
+
+        return False
+
+    @tracing.traced("generate_diff")
     def generate_diff(self, old_sha: Optional[str], new_sha: Optional[str], path: str) -> Dict[str, Any]:
         """Generate unified diff for a file change.
 
+        Blobs are read incrementally. Binary blobs are detected by sniffing
+        for NUL bytes, and blobs above diff_max_bytes or diff_max_lines are
+        not diffed; the result is flagged "too_large" and only carries their
+        sizes (plus line counts of pure additions/deletions when known).
+
         Args:
             old_sha: Old blob SHA (None for new files)
             new_sha: New blob SHA (None for deleted files)
@@ -410,29 +1699,36 @@ class GitParser:
                 "old_sha": str,
                 "new_sha": str,
                 "is_binary": bool,
+                "too_large": bool,
+                "old_size": int,
+                "new_size": int,
                 "diff": str (unified diff format),
                 "additions": int,
                 "deletions": int
             }
         """
-        # Read blob contents
-        old_content = self.object_parser.read_blob(old_sha) if old_sha else b""
-        new_content = self.object_parser.read_blob(new_sha) if new_sha else b""
+        old_side = self._read_diff_side(old_sha)
+        new_side = self._read_diff_side(new_sha)
 
-        # Check if binary (try to decode as UTF-8)
-        try:
-            old_lines = old_content.decode("utf-8").splitlines(keepends=True)
-            new_lines = new_content.decode("utf-8").splitlines(keepends=True)
-        except UnicodeDecodeError:
-            return {
-                "path": path,
-                "old_sha": old_sha,
-                "new_sha": new_sha,
-                "is_binary": True,
-                "diff": None,
-                "additions": 0,
-                "deletions": 0,
-            }
+        result: Dict[str, Any] = {
+            "path": path,
+            "old_sha": old_sha,
+            "new_sha": new_sha,
+            "is_binary": False,
+            "too_large": False,
+            "old_size": old_side["size"],
+            "new_size": new_side["size"],
+            "diff": None,
+            "additions": 0,
+            "deletions": 0,
+        }
+
+        if self._skip_line_diff(result, old_sha, new_sha, old_side, new_side):
+            return result
+
+        cpu_start = time.thread_time() if metrics.enabled else 0.0
+        old_lines = old_side["content"].decode("utf-8", errors="replace").splitlines(keepends=True)
+        new_lines = new_side["content"].decode("utf-8", errors="replace").splitlines(keepends=True)
 
         # Generate unified diff
         diff_lines = list(
@@ -449,21 +1745,182 @@ class GitParser:
         additions = sum(1 for line in diff_lines if line.startswith("+") and not line.startswith("+++"))
         deletions = sum(1 for line in diff_lines if line.startswith("-") and not line.startswith("---"))
 
-        return {
-            "path": path,
-            "old_sha": old_sha,
-            "new_sha": new_sha,
-            "is_binary": False,
-            "diff": "\n".join(diff_lines),
-            "additions": additions,
-            "deletions": deletions,
-        }
+        result["diff"] = "\n".join(diff_lines)
+        result["additions"] = additions
+        result["deletions"] = deletions
+        if metrics.enabled:
+            metrics.DIFF_CPU_SECONDS.inc(amount=time.thread_time() - cpu_start)
+            metrics.DIFFS.inc("text")
+        return result
+
+    def _indexed_diff(
+        self, old_sha: Optional[str], new_sha: Optional[str], path: str
+    ) -> Tuple[Dict[str, Any], List[int]]:
+        """generate_diff result plus the offsets of its hunks, cached."""
+        key = (old_sha, new_sha, path)
+        cached = self.hunk_cache.get(key)
+        if cached is None:
+            diff = self.generate_diff(old_sha, new_sha, path)
+            starts = hunks.index_hunks(diff["diff"]) if diff["diff"] else []
+            cached = (diff, starts)
+            self.hunk_cache.put(key, cached, len(diff["diff"] or "") + 8 * len(starts) + 256)
+        return cached
+
+    def get_diff_hunks(
+        self,
+        old_sha: Optional[str],
+        new_sha: Optional[str],
+        path: str,
+        hunk_range: str,
+        word_diff: bool = False,
+    ) -> Dict[str, Any]:
+        """Generate a window of hunks of a file's unified diff.
+
+        The whole diff is computed once and cached with the offset of every
+        hunk, so later windows are plain string slices. Word diffs are only
+        computed for the hunks returned.
+
+        Args:
+            old_sha: Old blob SHA (None for new files)
+            new_sha: New blob SHA (None for deleted files)
+            path: File path
+            hunk_range: "a-b" for hunks a to b-1, "a-" for a to the end, "a" for one hunk
+            word_diff: Also return intra-line word diffs of the returned hunks
+
+        Returns:
+            The generate_diff dictionary with "diff" holding the file header
+            and selected hunks, plus "total_hunks", "hunk_start", "hunk_end"
+            and, with word_diff, "word_diff" (one list of line pairs per hunk)
 
-    def get_commit_details(self, sha: str) -> Optional[GitCommitDetails]:
+        Raises:
+            ValueError: If hunk_range is malformed
+        """
+        diff, starts = self._indexed_diff(old_sha, new_sha, path)
+        bounds = hunks.parse_range(hunk_range, len(starts))
+        if bounds is None:
+            raise ValueError(f"Invalid hunk range: {hunk_range}")
+        first, last = bounds
+
+        result = dict(diff)
+        selected: List[str] = []
+        if diff["diff"] is not None:
+            header, selected = hunks.slice_hunks(diff["diff"], starts, first, last)
+            result["diff"] = "\n".join([header] + selected) if header else "\n".join(selected)
+        result["total_hunks"] = len(starts)
+        result["hunk_start"] = first
+        result["hunk_end"] = last
+        if word_diff:
+            result["word_diff"] = [hunks.word_diff(hunk) for hunk in selected]
+        return result
+
+    def parent_tree(self, commit: GitCommit) -> Optional[str]:
+        """Tree of a commit's first parent (None for root commits)."""
+        # Merge commits are shown against their first parent (main branch)
+        if commit.parents:
+            parent_commit = self.get_commit(commit.parents[0])
+            if parent_commit:
+                return parent_commit.tree
+        return None
+
+    @tracing.traced("get_commits_batch")
+    def get_commits_batch(self, shas: List[str], detail: str = "header") -> List[GitCommitBatchItem]:
+        """Look up many commits in one pass.
+
+        Each distinct commit is read once, and parents that are part of the
+        batch are not read again. At the "stats" and "files" levels the
+        changed files of all commits go through a single diff_stats call,
+        so identical blob pairs are diffed once and large batches use the
+        worker pool.
+
+        Args:
+            shas: Commit SHAs or revisions, in the order results should come back
+            detail: One of BATCH_DETAIL_LEVELS: "header" (commit only),
+                "stats" (plus totals) or "files" (plus per-file changes)
+
+        Returns:
+            One GitCommitBatchItem per requested SHA; commits that cannot
+            be read carry an error instead
+        """
+        commits: Dict[str, Optional[GitCommit]] = {}
+        errors: Dict[str, str] = {}
+
+        def lookup(sha: str) -> Optional[GitCommit]:
+            if sha not in commits:
+                try:
+                    full_sha = self.resolve_revision(sha)
+                    commits[sha] = self.get_commit(full_sha) if full_sha else None
+                except ValueError as e:
+                    commits[sha] = None
+                    errors[sha] = str(e)
+                except Exception as e:
+                    commits[sha] = None
+                    errors[sha] = f"Error reading commit: {str(e)}"
+            return commits[sha]
+
+        for sha in shas:
+            lookup(sha)
+
+        changes: Dict[str, List[Tuple[str, str, Optional[str], Optional[str]]]] = {}
+        if detail != "header":
+            for sha in dict.fromkeys(shas):
+                commit = commits[sha]
+                if commit is None:
+                    continue
+                try:
+                    parent = lookup(commit.parents[0]) if commit.parents else None
+                    changes[sha] = self.tree_changes(parent.tree if parent else None, commit.tree)
+                except Exception as e:
+                    errors[sha] = f"Error comparing trees: {str(e)}"
+
+        # Blob pair -> diff_stats result, shared by every commit containing it
+        pairs = list(
+            dict.fromkeys((old, new) for entries in changes.values() for _, _, old, new in entries)
+        )
+        pair_stats = dict(zip(pairs, self.diff_stats(pairs))) if pairs else {}
+
+        items = []
+        for sha in shas:
+            commit = commits[sha]
+            if commit is None or sha in errors:
+                items.append(
+                    GitCommitBatchItem(sha=sha, error=errors.get(sha, f"Commit not found: {sha}"))
+                )
+                continue
+            item = GitCommitBatchItem(sha=sha, commit=commit)
+            if detail != "header":
+                files = [
+                    GitFileChange(path=path, change_type=change_type, **pair_stats[(old, new)])
+                    for path, change_type, old, new in changes[sha]
+                ]
+                item.stats = {
+                    "files_changed": len(files),
+                    "additions": sum(f.additions for f in files),
+                    "deletions": sum(f.deletions for f in files),
+                }
+                item.incomplete = any(f.incomplete for f in files)
+                if detail == "files":
+                    item.files = files
+            items.append(item)
+        return items
+
+    def get_commit_details(
+        self,
+        sha: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        with_stats: bool = True,
+    ) -> Optional[GitCommitDetails]:
         """Get detailed commit information including file changes.
 
+        The changed paths come from a tree diff; line stats are only
+        computed for the returned page of files. Totals of additions and
+        deletions are included when the page covers every file.
+
         Args:
             sha: Commit SHA
+            offset: Index of the first changed file to return
+            limit: Maximum number of files to return (None for all)
+            with_stats: Compute additions/deletions of the returned files
 
         Returns:
             GitCommitDetails with commit info and file changes
@@ -472,22 +1929,19 @@ class GitParser:
         if not commit:
             return None
 
-        # Handle multiple parents (merge commits):
-        # Use first parent for comparison (main branch)
-        parent_tree = None
-        if commit.parents:
-            parent_commit = self.get_commit(commit.parents[0])
-            if parent_commit:
-                parent_tree = parent_commit.tree
-
-        # Compare trees
-        files = self.compare_trees(parent_tree, commit.tree)
+        changes = self.tree_changes(self.parent_tree(commit), commit.tree)
+        page = changes[offset : offset + limit if limit is not None else None]
+        files = self.describe_changes(page, with_stats=with_stats)
 
         # Calculate stats
-        stats = {
-            "files_changed": len(files),
-            "additions": sum(f.additions for f in files),
-            "deletions": sum(f.deletions for f in files),
-        }
-
-        return GitCommitDetails(commit=commit, files=files, stats=stats)
+        stats = {"files_changed": len(changes)}
+        if with_stats and len(page) == len(changes):
+            stats["additions"] = sum(f.additions for f in files)
+            stats["deletions"] = sum(f.deletions for f in files)
+
+        return GitCommitDetails(
+            commit=commit,
+            files=files,
+            stats=stats,
+            incomplete=any(f.incomplete for f in files),
+        )
@@ -0,0 +1,165 @@
+"""Index of the paths each commit changed, for path-filtered statistics.
+
+For every commit in the store, the paths whose tree entry differs from
+the first parent's are kept, in CSR form like the store's parent lists:
+``offsets`` per commit ID into ``path_ids``, which refer to a table of
+path strings. Directories along a change are included, so a commit is
+listed under ``src`` as well as ``src/app/main.py``, and filtering by a
+path is a lookup of one path ID instead of reading trees per commit.
+
+Building the index diffs each commit's tree against its first parent's
+once, skipping subtrees with equal SHAs, so the cost follows the size of
+the changes. Commits added to the store later are diffed on update.
+
+When NumPy is installed, lookups are vectorized; otherwise they fall back
+to a plain loop.
+"""
+
+import bisect
+import re
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+from .commit_store import CommitStore
+from .objects import GitObjectParser
+from .optional import numpy
+
+# "<mode> <name>\0<20-byte SHA>" entries of a raw tree object
+_TREE_ENTRY_RE = re.compile(rb"(\d+) ([^\x00]*)\x00(.{20})", re.S)
+
+
+class ChangedPathIndex:
+    """Paths changed by every commit in a commit store."""
+
+    def __init__(self, store: CommitStore):
+        self.store = store
+        self.paths: Dict[str, int] = {}
+        self._path_bytes = 0  # Approximate size of the path table
+        self.offsets = array("q", [0])  # Per commit ID, into path_ids
+        self.path_ids = array("i")
+        # Root trees of first parents not diffed yet, while updating
+        self._trees: Dict[int, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the index, for memory accounting."""
+        return self._path_bytes + self.offsets.itemsize * len(self.offsets) + self.path_ids.itemsize * len(self.path_ids)
+
+    def update(self, object_parser: GitObjectParser):
+        """Diff the commits added to the store since the last update."""
+        store = self.store
+        if len(self) == len(store):
+            return
+        # Lookups take unlocked views of these, which stop arrays from
+        # growing, so the new entries go to copies that are swapped in
+        offsets = array("q", self.offsets)
+        path_ids = array("i", self.path_ids)
+        # Trees parsed for the previous commit; in a mostly linear history
+        # they are the new side of the next diff, so each tree is parsed once
+        previous: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]] = {}
+        for commit_id in range(len(offsets) - 1, len(store)):
+            new_tree = self._trees.pop(commit_id) if commit_id in self._trees else self._tree(object_parser, commit_id)
+            parent = store.first_parent[commit_id]
+            old_tree = None
+            if parent >= 0:
+                # Parents usually get higher IDs than their children, so
+                # the tree read here is reused when the parent is diffed
+                if parent not in self._trees:
+                    self._trees[parent] = self._tree(object_parser, parent)
+                old_tree = self._trees[parent]
+            parsed: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]] = {}
+            changed: List[str] = []
+            self._diff(object_parser, old_tree, new_tree, "", changed, parsed, previous)
+            previous = parsed
+            for path in changed:
+                path_id = self.paths.get(path)
+                if path_id is None:
+                    path_id = self.paths[path] = len(self.paths)
+                    # String object and dict entry
+                    self._path_bytes += len(path) + 100
+                path_ids.append(path_id)
+            offsets.append(len(path_ids))
+        self._trees.clear()
+        self.path_ids, self.offsets = path_ids, offsets
+
+    def _tree(self, object_parser: GitObjectParser, commit_id: int) -> Optional[str]:
+        obj_data = object_parser.read_object(self.store.sha_of(commit_id))
+        if not obj_data or obj_data[0] != "commit":
+            return None
+        return object_parser.parse_commit(obj_data[1])["tree"]
+
+    @staticmethod
+    def _entries(
+        object_parser: GitObjectParser,
+        tree: Optional[str],
+        parsed: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]],
+        previous: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]],
+    ) -> Tuple[Dict[bytes, bytes], Set[bytes]]:
+        """Raw entry name -> SHA of a tree, and the names of its subtrees."""
+        if tree is None:
+            return {}, set()
+        entries = parsed.get(tree) or previous.get(tree)
+        if entries is None:
+            obj_data = object_parser.read_object(tree)
+            found = _TREE_ENTRY_RE.findall(obj_data[1]) if obj_data and obj_data[0] == "tree" else []
+            entries = (
+                {name: sha for _, name, sha in found},
+                {name for mode, name, _ in found if mode in (b"40000", b"040000")},
+            )
+        parsed[tree] = entries
+        return entries
+
+    def _diff(
+        self,
+        object_parser: GitObjectParser,
+        old_tree: Optional[str],
+        new_tree: Optional[str],
+        prefix: str,
+        changed: List[str],
+        parsed: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]],
+        previous: Dict[str, Tuple[Dict[bytes, bytes], Set[bytes]]],
+    ):
+        """Append the paths of entries whose SHA differs between two trees."""
+        if old_tree == new_tree:
+            return
+        old_entries, old_subtrees = self._entries(object_parser, old_tree, parsed, previous)
+        new_entries, new_subtrees = self._entries(object_parser, new_tree, parsed, previous)
+        for name in sorted({name for name, _ in old_entries.items() ^ new_entries.items()}):
+            path = name.decode("utf-8", errors="replace")
+            if prefix:
+                path = f"{prefix}/{path}"
+            changed.append(path)
+            old_sub = old_entries[name].hex() if name in old_subtrees else None
+            new_sub = new_entries[name].hex() if name in new_subtrees else None
+            if old_sub or new_sub:
+                self._diff(object_parser, old_sub, new_sub, path, changed, parsed, previous)
+
+    def touching(self, ids, path: str):
+        """The commit IDs among ids that changed anything at or below path.
+
+        Args:
+            ids: Commit IDs, in any order; their order is kept
+            path: Slash separated path
+        """
+        path_id = self.paths.get(path.strip("/"))
+        if path_id is None:
+            return ids[:0]
+        # An update may swap in new arrays meanwhile; offsets are swapped
+        # last, so path IDs past the last offset belong to unlisted commits
+        path_ids, offsets = self.path_ids, self.offsets
+        end = offsets[-1]
+        np = numpy()
+        if np is not None:
+            offsets = np.frombuffer(offsets, dtype=np.int64)
+            hits = np.flatnonzero(np.frombuffer(path_ids, dtype=np.int32)[:end] == path_id)
+            commits = np.searchsorted(offsets, hits, side="right") - 1
+            ids = np.asarray(ids, dtype=np.int64)
+            return ids[np.isin(ids, commits)]
+        commits = {
+            bisect.bisect_right(offsets, position) - 1
+            for position, value in enumerate(path_ids[:end])
+            if value == path_id
+        }
+        return [commit_id for commit_id in ids if commit_id in commits]
@@ -0,0 +1,145 @@
+"""Merge bases, ahead/behind counts and range listings over the commit store.
+
+All queries are "paint down" walks: every tip colors its ancestors with a
+bit, commits are visited in decreasing generation number, and the walk
+stops once every queued commit carries every bit. A commit's generation is
+higher than all of its ancestors', so when one is visited its colors are
+final, and nothing below the deepest common ancestry is ever read.
+"""
+
+import heapq
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .commit_store import CommitStore
+
+
+def _paint(store: CommitStore, tips: Sequence[int], common: bool = False) -> Iterator[tuple]:
+    """Visit commits reachable from tips, yielding (commit ID, color bits).
+
+    Bit i is set when tips[i] reaches the commit. The walk ends once the
+    remaining commits are reachable from every tip. With common=True it
+    goes one step further and also visits the first commits reachable from
+    every tip; only their ancestors are skipped (marked with an extra
+    "stale" bit).
+    """
+    full = (1 << len(tips)) - 1
+    stale = 1 << len(tips)
+    settled = stale if common else full
+    generation = store.generation
+    colors: Dict[int, int] = {}
+    for bit, tip in enumerate(tips):
+        colors[tip] = colors.get(tip, 0) | (1 << bit)
+
+    heap = [(-generation[tip], tip) for tip in colors]
+    heapq.heapify(heap)
+    partial = sum(1 for color in colors.values() if color & settled != settled)
+
+    while heap and partial:
+        _, commit_id = heapq.heappop(heap)
+        color = colors[commit_id]
+        if color & settled != settled:
+            partial -= 1
+        yield commit_id, color
+
+        if common and color == full:
+            color |= stale
+        for parent in store.parents_of(commit_id):
+            old = colors.get(parent)
+            if old is None:
+                colors[parent] = color
+                heapq.heappush(heap, (-generation[parent], parent))
+                partial += color & settled != settled
+            elif old | color != old:
+                colors[parent] = old | color
+                partial -= old & settled != settled and (old | color) & settled == settled
+
+
+def _reaches(store: CommitStore, sources: Sequence[int], target: int) -> bool:
+    """Check whether any source reaches target, never walking below its generation."""
+    floor = store.generation[target]
+    seen = set(sources)
+    stack = list(sources)
+    while stack:
+        commit_id = stack.pop()
+        if commit_id == target:
+            return True
+        for parent in store.parents_of(commit_id):
+            if parent not in seen and store.generation[parent] >= floor:
+                seen.add(parent)
+                stack.append(parent)
+    return False
+
+
+def merge_bases(store: CommitStore, a: int, b: int) -> List[int]:
+    """Best common ancestors of two commits, like ``git merge-base --all``."""
+    if a == b:
+        return [a]
+
+    candidates = [
+        commit_id for commit_id, color in _paint(store, [a, b], common=True) if color == 3
+    ]
+
+    # Criss-cross merges can leave a candidate that another one reaches
+    return [
+        c
+        for c in candidates
+        if not _reaches(store, [other for other in candidates if other != c], c)
+    ]
+
+
+def ahead_behind(store: CommitStore, base: int, tips: Sequence[int]) -> List[Dict[str, int]]:
+    """Count commits each tip has that base lacks (ahead) and vice versa (behind).
+
+    All tips are answered by one shared walk, so comparing dozens of
+    branches with the same base costs little more than comparing one.
+    """
+    counts = [{"ahead": 0, "behind": 0} for _ in tips]
+    base_bit = 1 << len(tips)
+    for _, color in _paint(store, list(tips) + [base]):
+        in_base = bool(color & base_bit)
+        for i, entry in enumerate(counts):
+            in_tip = bool(color & (1 << i))
+            if in_tip and not in_base:
+                entry["ahead"] += 1
+            elif in_base and not in_tip:
+                entry["behind"] += 1
+    return counts
+
+
+def ahead_behind_pairs(store: CommitStore, pairs: Sequence[Tuple[int, int]]) -> List[Dict[str, int]]:
+    """Ahead/behind counts of many (tip, base) pairs with different bases.
+
+    Every distinct commit gets one bit in a single shared walk. Commits
+    reached from the same set of refs share a color, so each pair is only
+    checked once per distinct color rather than once per commit.
+    """
+    tips = list(dict.fromkeys(commit_id for pair in pairs for commit_id in pair))
+    if not tips:
+        return []
+    bits = {commit_id: 1 << i for i, commit_id in enumerate(tips)}
+    color_counts: Dict[int, int] = {}
+    for _, color in _paint(store, tips):
+        color_counts[color] = color_counts.get(color, 0) + 1
+
+    counts = []
+    for tip, base in pairs:
+        tip_bit, base_bit = bits[tip], bits[base]
+        entry = {"ahead": 0, "behind": 0}
+        for color, count in color_counts.items():
+            if color & tip_bit and not color & base_bit:
+                entry["ahead"] += count
+            elif color & base_bit and not color & tip_bit:
+                entry["behind"] += count
+        counts.append(entry)
+    return counts
+
+
+def iter_range(store: CommitStore, exclude: int, include: int) -> Iterator[int]:
+    """Lazily yield commits reachable from include but not exclude (``exclude..include``).
+
+    Commits come in decreasing generation order, so children always come
+    before their parents.
+    """
+    for commit_id, color in _paint(store, [include, exclude]):
+        if color == 1:
+            yield commit_id
@@ -0,0 +1,94 @@
+"""Backward reader for reflog files under ``.git/logs``.
+
+Reflogs are append-only text files with one entry per line, oldest first,
+and can grow to megabytes on long-lived branches. Entries are read from
+the end in fixed-size blocks, so the newest ones never need the whole
+file. Pages are addressed by byte offset: a cursor is the offset where the
+oldest returned line starts, and the next page ends there. Appending new
+entries never moves earlier offsets, so cursors stay valid while the ref
+keeps moving.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+REFLOG_BLOCK = 64 * 1024
+
+ENTRY_RE = re.compile(rb"^([0-9a-f]{40}) ([0-9a-f]{40}) (.*?) ?<(.*)> (\d+) ([+-]\d{4})(?:\t(.*))?$")
+
+
+def iter_lines_reverse(path: Path, end: Optional[int] = None, block: int = REFLOG_BLOCK) -> Iterator[Tuple[int, bytes]]:
+    """Yield (start offset, line) pairs of a file from the last line to the first.
+
+    Args:
+        path: File to read
+        end: Only read lines ending before this offset (default: end of file)
+        block: Bytes read per step
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        tail = b""
+        while pos > 0:
+            size = min(block, pos)
+            pos -= size
+            f.seek(pos)
+            data = f.read(size) + tail
+            lines = data.split(b"\n")
+            # The first piece may be the end of a line starting in an earlier block
+            tail = lines[0]
+            offset = pos + len(data)
+            for line in reversed(lines[1:]):
+                offset -= len(line) + 1
+                if line:
+                    yield offset + 1, line
+        if tail:
+            yield 0, tail
+
+
+def parse_entry(line: bytes) -> Optional[Dict[str, Any]]:
+    """Parse one reflog line, or return None if it is malformed."""
+    match = ENTRY_RE.match(line)
+    if not match:
+        return None
+    old_sha, new_sha, name, email, timestamp, timezone, message = match.groups()
+    return {
+        "old_sha": old_sha.decode("ascii"),
+        "new_sha": new_sha.decode("ascii"),
+        "committer": {
+            "name": name.decode("utf-8", errors="replace"),
+            "email": email.decode("utf-8", errors="replace"),
+            "timestamp": int(timestamp),
+            "timezone": timezone.decode("ascii"),
+        },
+        "message": (message or b"").decode("utf-8", errors="replace"),
+    }
+
+
+def read_reflog(path: Path, cursor: Optional[int], limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Read up to limit entries, newest first, ending before the cursor offset.
+
+    Returns:
+        Tuple of (entries, cursor of the next page or None after the oldest)
+
+    Raises:
+        ValueError: If the cursor does not point at the start of a line
+    """
+    if cursor is not None:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            if cursor > 0:
+                f.seek(cursor - 1)
+            if cursor > size or (cursor > 0 and f.read(1) != b"\n"):
+                raise ValueError(f"Invalid reflog cursor: {cursor}")
+
+    entries = []
+    start = None
+    for start, line in iter_lines_reverse(path, cursor):
+        entry = parse_entry(line)
+        if entry is not None:
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+    return entries, start or None
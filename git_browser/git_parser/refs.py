@@ -0,0 +1,95 @@
+"""Reader for git's packed-refs file, and a cheap check whether refs moved.
+
+Listing every ref costs time proportional to the number of refs, which
+adds up when it is done on every lookup of a repository with tens of
+thousands of tags. git updates HEAD, packed-refs and loose refs by renaming
+a lock file over them, which changes the mtime of the file and of the
+directory holding it, so stat'ing HEAD, packed-refs and the directories
+under refs/ tells whether any ref may have moved.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Changes this recent may share an mtime with a later one, so they are not
+# vouched for yet (like git's racily clean index entries)
+RACY_STAMP_SECONDS = 2.0
+
+
+class PackedRef(NamedTuple):
+    sha: str
+    # Object an annotated tag finally points at, from the "^" line after it
+    peeled: Optional[str]
+
+
+def read_packed_refs(path: Path) -> Tuple[Dict[str, PackedRef], bool]:
+    """Parse a packed-refs file.
+
+    Returns:
+        Tuple of (ref name -> PackedRef, whether tags are known to be
+        peeled). When git wrote the file with the "peeled" trait, every
+        annotated tag under refs/tags has a "^" line, so a tag without one
+        is lightweight and its object need not be read.
+    """
+    refs: Dict[str, PackedRef] = {}
+    peeled_tags = False
+    try:
+        lines = path.read_text(errors="replace").splitlines()
+    except OSError:
+        return refs, peeled_tags
+
+    last = None
+    for line in lines:
+        if line.startswith("#"):
+            if line.startswith("# pack-refs with:"):
+                traits = line.split(":", 1)[1].split()
+                peeled_tags = "peeled" in traits or "fully-peeled" in traits
+        elif line.startswith("^"):
+            if last is not None:
+                refs[last] = refs[last]._replace(peeled=line[1:].strip())
+        elif " " in line:
+            sha, name = line.split(" ", 1)
+            refs[name] = PackedRef(sha, None)
+            last = name
+    return refs, peeled_tags
+
+
+class RefStamp:
+    """Fingerprint of HEAD, packed-refs and the loose ref directories.
+
+    Costs one stat per directory under refs/, however many refs there are.
+    """
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = git_dir
+        self._dirs: List[str] = []
+        self._last: Optional[Tuple] = None
+
+    def _stat(self, dirs: List[str]) -> Tuple:
+        entries = []
+        for path in [str(self.git_dir / "HEAD"), str(self.git_dir / "packed-refs"), *dirs]:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                entries.append(None)
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        return tuple(entries)
+
+    def current(self) -> Optional[Tuple]:
+        """The stamp of the refs now, or None while they changed too recently to tell.
+
+        Equal stamps mean no ref or HEAD moved in between.
+        """
+        stamp = self._stat(self._dirs)
+        if stamp != self._last:
+            # New subdirectories show up as a change of their parent
+            self._dirs = [path for path, _, _ in os.walk(self.git_dir / "refs")]
+            stamp = self._stat(self._dirs)
+            self._last = stamp
+        newest = max((entry[0] for entry in stamp if entry is not None), default=0)
+        if time.time_ns() - newest < RACY_STAMP_SECONDS * 1e9:
+            return None
+        return stamp
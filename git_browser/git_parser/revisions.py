@@ -0,0 +1,85 @@
+"""Parsing of git revision expressions such as ``main~3``, ``v1.0^2`` or ``a..b``.
+
+Only the syntax is handled here; GitParser.resolve_revision looks the
+names up. Supported forms, combinable like in git:
+
+- ``<sha>``: a full or unique abbreviated (4+ hex digits) object name
+- ``<ref>``: HEAD, ``@``, a branch, tag, remote-tracking branch or full ref
+- ``<branch>@{upstream}`` / ``<branch>@{u}``: the branch's upstream
+  (the current branch when the name is left out)
+- ``<rev>~<n>``: the n-th first-parent ancestor
+- ``<rev>^<n>``: the n-th parent (``^0`` is the commit itself)
+- ``<rev>^{}`` / ``<rev>^{commit}`` / ``<rev>^{tree}``: peel to an object type
+- ``<rev>..<rev>`` / ``<rev>...<rev>``: ranges (an empty side means HEAD)
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+FULL_SHA_RE = re.compile(r"[0-9a-fA-F]{40}")
+ABBREV_SHA_RE = re.compile(r"[0-9a-fA-F]{4,40}")
+STEP_RE = re.compile(r"~(\d*)|\^\{(\w*)\}|\^(\d*)")
+UPSTREAM_RE = re.compile(r"@\{(?:upstream|u)\}$", re.IGNORECASE)
+
+PEEL_TYPES = ("", "commit", "tree")
+
+
+class Revision(NamedTuple):
+    """A parsed revision: a starting name and steps applied to it."""
+
+    name: str  # Ref name or SHA; "" for the current branch's upstream
+    upstream: bool
+    # ("~", n), ("^", n) or ("peel", object type)
+    steps: List[Tuple[str, Union[int, str]]]
+
+
+def parse_revision(spec: str) -> Revision:
+    """Split a single-commit revision expression into its parts.
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    # Ref names cannot contain "~" or "^", so the first one starts the steps
+    split = min((i for i in (spec.find("~"), spec.find("^")) if i != -1), default=len(spec))
+    name, rest = spec[:split], spec[split:]
+
+    upstream = False
+    match = UPSTREAM_RE.search(name)
+    if match:
+        upstream = True
+        name = name[: match.start()]
+    if name == "@":
+        name = "HEAD"
+    if not name and not upstream:
+        raise ValueError(f"Invalid revision: {spec}")
+
+    steps: List[Tuple[str, Union[int, str]]] = []
+    pos = 0
+    while pos < len(rest):
+        step = STEP_RE.match(rest, pos)
+        if not step:
+            raise ValueError(f"Invalid revision: {spec}")
+        ancestor, peel, parent = step.groups()
+        if ancestor is not None:
+            steps.append(("~", int(ancestor) if ancestor else 1))
+        elif peel is not None:
+            if peel not in PEEL_TYPES:
+                raise ValueError(f"Unsupported object type in revision: {spec}")
+            steps.append(("peel", peel))
+        else:
+            steps.append(("^", int(parent) if parent else 1))
+        pos = step.end()
+    return Revision(name, upstream, steps)
+
+
+def split_range(spec: str) -> Optional[Tuple[str, str, str]]:
+    """Split "A..B" or "A...B" into (A, separator, B), with empty sides as HEAD.
+
+    Returns:
+        None if spec is not a range
+    """
+    separator = "..." if "..." in spec else ".."
+    if separator not in spec:
+        return None
+    left, _, right = spec.partition(separator)
+    return left or "HEAD", separator, right or "HEAD"
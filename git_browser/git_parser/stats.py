@@ -0,0 +1,179 @@
+"""Contributor and activity aggregation over the commit store.
+
+Aggregations read the store's columns in fixed-size batches of commit IDs.
+With NumPy every batch is grouped with a handful of vectorized operations;
+without it the same grouping runs as a plain loop. Weeks, weekdays and
+hours are taken in the author's own time zone, so a punch card shows when
+people actually worked.
+"""
+
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Sequence
+
+from .commit_store import CommitStore
+from .optional import numpy
+
+DIMENSIONS = ("author", "week", "weekday", "hour")
+BATCH_SIZE = 65536
+
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday
+EPOCH_WEEKDAY = 3
+_EPOCH = date(1970, 1, 1)
+
+
+def _local_days_and_seconds(store: CommitStore, ids):
+    """Author-local day number and second of day for a batch of commit IDs."""
+    np = numpy()
+    if np is not None:
+        local = (
+            np.frombuffer(store.author_time, dtype=np.int64)[ids]
+            + np.frombuffer(store.author_tz, dtype=np.int16)[ids].astype(np.int64) * 60
+        )
+        return local // SECONDS_PER_DAY, local % SECONDS_PER_DAY
+    local = [store.author_time[i] + store.author_tz[i] * 60 for i in ids]
+    return [t // SECONDS_PER_DAY for t in local], [t % SECONDS_PER_DAY for t in local]
+
+
+def _codes(store: CommitStore, ids, dimension: str, days, seconds):
+    """Integer group code of every commit in the batch for one dimension."""
+    np = numpy()
+    if np is not None:
+        if dimension == "author":
+            return np.frombuffer(store.author_id, dtype=np.int32)[ids].astype(np.int64)
+        if dimension == "week":
+            return (days + EPOCH_WEEKDAY) // 7
+        if dimension == "weekday":
+            return (days + EPOCH_WEEKDAY) % 7
+        return seconds // 3600
+
+    if dimension == "author":
+        return [store.author_id[i] for i in ids]
+    if dimension == "week":
+        return [(d + EPOCH_WEEKDAY) // 7 for d in days]
+    if dimension == "weekday":
+        return [(d + EPOCH_WEEKDAY) % 7 for d in days]
+    return [s // 3600 for s in seconds]
+
+
+def _batches(ids: Sequence[int]):
+    np = numpy()
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start : start + BATCH_SIZE]
+        yield np.asarray(batch, dtype=np.int64) if np is not None else batch
+
+
+def _count(store: CommitStore, ids: Sequence[int], dimensions: Sequence[str]) -> Counter:
+    """Count commits per combination of dimension codes."""
+    np = numpy()
+    counts: Counter = Counter()
+    for batch in _batches(ids):
+        days, seconds = _local_days_and_seconds(store, batch)
+        columns = [_codes(store, batch, dimension, days, seconds) for dimension in dimensions]
+        if np is not None:
+            keys, batch_counts = np.unique(np.stack(columns, axis=1), axis=0, return_counts=True)
+            counts.update(dict(zip(map(tuple, keys.tolist()), batch_counts.tolist())))
+        else:
+            counts.update(zip(*columns))
+    return counts
+
+
+def distinct_authors(store: CommitStore, bitset: int) -> int:
+    """Number of distinct author identities among the commits in a bitset."""
+    np = numpy()
+    packed = bitset.to_bytes((len(store) + 7) // 8, "little")
+    if np is not None:
+        mask = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), bitorder="little")
+        mask = mask[: len(store)].astype(bool)
+        return int(np.unique(np.frombuffer(store.author_id, dtype=np.int32)[mask]).size)
+    return len({store.author_id[i] for i in range(len(store)) if packed[i >> 3] >> (i & 7) & 1})
+
+
+def week_label(week: int) -> str:
+    """ISO date of the Monday starting a week number."""
+    return (_EPOCH + timedelta(days=week * 7 - EPOCH_WEEKDAY)).isoformat()
+
+
+def _split_ident(ident: str):
+    if " <" in ident and ident.endswith(">"):
+        name, email = ident[:-1].split(" <", 1)
+        return name, email
+    return ident, ""
+
+
+def activity(store: CommitStore, ids: Sequence[int], dimensions: Sequence[str]) -> List[Dict[str, Any]]:
+    """Commit counts grouped by one or more of DIMENSIONS.
+
+    Returns:
+        One bucket per non-empty group, ordered by its key. Buckets carry
+        author/email, week (Monday, ISO date), weekday (0 = Monday) and
+        hour fields for the requested dimensions plus a commits count.
+    """
+    buckets = []
+    for key, commits in sorted(_count(store, ids, dimensions).items()):
+        bucket: Dict[str, Any] = {}
+        for dimension, code in zip(dimensions, key):
+            if dimension == "author":
+                bucket["author"], bucket["email"] = _split_ident(store.authors[code])
+            elif dimension == "week":
+                bucket["week"] = week_label(code)
+            else:
+                bucket[dimension] = code
+        bucket["commits"] = commits
+        buckets.append(bucket)
+    return buckets
+
+
+def author_summary(store: CommitStore, ids: Sequence[int]) -> List[Dict[str, Any]]:
+    """Per-author commit count, first/last commit time and active weeks.
+
+    Returns:
+        One entry per author with commits in ids, most active first
+    """
+    np = numpy()
+    authors: Dict[int, List[int]] = {}  # author ID -> [commits, first, last, active weeks]
+    weeks = _count(store, ids, ("author", "week"))
+    for (author_id, _), _ in weeks.items():
+        authors.setdefault(author_id, [0, 0, 0, 0])[3] += 1
+
+    for batch in _batches(ids):
+        if np is not None:
+            author_ids = np.frombuffer(store.author_id, dtype=np.int32)[batch]
+            times = np.frombuffer(store.author_time, dtype=np.int64)[batch]
+            order = np.lexsort((times, author_ids))
+            author_ids, times = author_ids[order], times[order]
+            starts = np.flatnonzero(np.r_[True, author_ids[1:] != author_ids[:-1]])
+            ends = np.r_[starts[1:], len(author_ids)] - 1
+            rows = zip(
+                author_ids[starts].tolist(),
+                (ends - starts + 1).tolist(),
+                times[starts].tolist(),
+                times[ends].tolist(),
+            )
+        else:
+            rows = (
+                (store.author_id[i], 1, store.author_time[i], store.author_time[i]) for i in batch
+            )
+
+        for author_id, commits, first, last in rows:
+            entry = authors[author_id]
+            entry[1] = min(entry[1], first) if entry[0] else first
+            entry[2] = max(entry[2], last) if entry[0] else last
+            entry[0] += commits
+
+    summary = []
+    for author_id, (commits, first, last, active_weeks) in authors.items():
+        name, email = _split_ident(store.authors[author_id])
+        summary.append(
+            {
+                "name": name,
+                "email": email,
+                "commits": commits,
+                "first_commit": first,
+                "last_commit": last,
+                "active_weeks": active_weeks,
+            }
+        )
+    summary.sort(key=lambda a: (-a["commits"], a["name"].lower(), a["email"]))
+    return summary
@@ -0,0 +1,240 @@
+"""Prometheus-style instrumentation.
+
+Metrics are disabled by default. Call sites guard every update with
+``if metrics.enabled:`` so a disabled server pays one attribute lookup per
+instrumented operation and nothing else.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+enabled = False
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    """Base class holding one value per label combination."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _check(self, labels: Tuple[str, ...]):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines of the exposition format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+    @abstractmethod
+    def clear(self):
+        """Drop all recorded values."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, *labels: str, value: float):
+        self._check(labels)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(state)) for labels, state in self._values.items())
+        lines = []
+        for labels, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {_format_value(cumulative)}")
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {_format_value(state[-1])}")
+            base = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{base} {_format_value(state[-1])}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+REGISTRY: List[_Metric] = []
+
+REQUEST_LATENCY = Histogram(
+    "git_browser_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("route", "method", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "git_browser_http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ("route",),
+)
+OBJECT_READS = Counter(
+    "git_browser_object_reads_total",
+    "Git objects read from disk by storage source.",
+    ("source",),
+)
+BYTES_INFLATED = Counter(
+    "git_browser_object_bytes_inflated_total",
+    "Bytes produced by zlib inflate by storage source.",
+    ("source",),
+)
+CACHE_REQUESTS = Counter(
+    "git_browser_cache_requests_total",
+    "Cache lookups by cache and result.",
+    ("cache", "result"),
+)
+CACHE_EVICTIONS = Counter(
+    "git_browser_cache_evictions_total",
+    "Entries evicted from caches.",
+    ("cache",),
+)
+LOAD_SHED = Counter(
+    "git_browser_load_shed_total",
+    "Requests refused with 503 under memory pressure.",
+    ("route",),
+)
+CACHE_BYTES = Gauge(
+    "git_browser_cache_bytes",
+    "Bytes currently held by caches.",
+    ("cache",),
+)
+CACHE_ENTRIES = Gauge(
+    "git_browser_cache_entries",
+    "Entries currently held by caches.",
+    ("cache",),
+)
+DIFF_CPU_SECONDS = Counter(
+    "git_browser_diff_cpu_seconds_total",
+    "CPU time spent computing line diffs.",
+)
+DIFFS = Counter(
+    "git_browser_diffs_total",
+    "File diffs by outcome.",
+    ("result",),
+)
+SUBPROCESSES = Counter(
+    "git_browser_git_subprocesses_total",
+    "git subprocesses started by GitClient.",
+    ("command", "status"),
+)
+
+
+def enable():
+    """Turn metric collection on."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Turn metric collection off and drop collected values."""
+    global enabled
+    enabled = False
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def render(extra: Optional[List[_Metric]] = None) -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    metrics = REGISTRY + (extra or [])
+    return "\n".join(metric.render() for metric in metrics) + "\n"
@@ -0,0 +1,171 @@
+"""Per-request trace spans and an on-demand sampling profiler.
+
+Tracing is disabled by default. Traced functions check the module-level
+``enabled`` flag first, so a disabled server pays one extra function call
+per traced operation.
+
+Spans are aggregated per call path (for example ``compare_trees >
+generate_diff > read_object``) with a call count and total time, so a
+request reading thousands of objects keeps a small, fixed-size trace.
+Direct recursion (``get_tree_contents`` calling itself) is folded into the
+outermost call.
+"""
+
+import functools
+import logging
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("git_browser.tracing")
+
+enabled = False
+
+DEFAULT_SLOW_REQUEST_MS = 1000.0
+# CPU-bound Python code only releases the GIL every switch interval (5 ms),
+# so sampling faster than that mostly records the same stack twice
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+_current: "ContextVar[Optional[Trace]]" = ContextVar("git_browser_trace", default=None)
+
+
+class Trace:
+    """Aggregated spans of a single request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.stack: List[str] = []
+        # call path -> [count, total seconds]
+        self.spans: Dict[Tuple[str, ...], List[float]] = {}
+        self.last_span_end: Optional[float] = None
+
+    def add(self, path: Tuple[str, ...], elapsed: float):
+        entry = self.spans.get(path)
+        if entry is None:
+            self.spans[path] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def run(self, name: str, func: Callable, args, kwargs) -> Any:
+        stack = self.stack
+        if stack and stack[-1] == name:
+            return func(*args, **kwargs)
+
+        stack.append(name)
+        path = tuple(stack)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self.add(path, end - start)
+            if not stack:
+                self.last_span_end = end
+
+    def format(self, total: float) -> str:
+        lines = [f"Slow request {self.name}: {total * 1000:.1f} ms"]
+        for path, (count, elapsed) in sorted(self.spans.items()):
+            label = "  " * len(path) + path[-1]
+            lines.append(f"{label:<48} {int(count):>8} calls {elapsed * 1000:10.1f} ms")
+        return "\n".join(lines)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording calls of a function as a span of the current trace."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            return trace.run(name, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_trace(name: str) -> Tuple[Trace, Any]:
+    """Make a new trace current. Returns the trace and a reset token."""
+    trace = Trace(name)
+    return trace, _current.set(trace)
+
+
+def end_trace(token: Any):
+    _current.reset(token)
+
+
+def enable():
+    """Turn span recording on."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+class SamplingProfiler:
+    """Sample thread stacks at a fixed interval.
+
+    By default every thread is sampled, so work handed to the threadpool
+    (sync route handlers, streamed responses) and to background threads
+    (warm-up, jobs) shows up next to the event loop. Each stack starts with
+    a "thread <name>" frame; idle threads contribute their waiting stacks,
+    which can be filtered out by that frame. Samples are process-wide, so
+    concurrent requests appear in the profile too.
+
+    The result is rendered in the folded format ("frame;frame;frame count")
+    understood by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """Prepare a profiler.
+
+        Args:
+            thread_id: Only sample this thread (default: all threads)
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="git-browser-profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames[self.thread_id]} if self.thread_id in frames else {}
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(f"thread {names.get(thread_id, thread_id)}")
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
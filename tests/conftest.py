@@ -0,0 +1,122 @@
+"""Shared fixtures: a small repository built with the git command line."""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from git_browser.api.server import create_app
+from git_browser.git_parser.parser import GitParser
+
+
+def git_bytes(repo: Path, *args: str, timestamp: Optional[int] = None) -> bytes:
+    """Run git in repo and return its raw output."""
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="Test",
+        GIT_AUTHOR_EMAIL="test@example.com",
+        GIT_COMMITTER_NAME="Test",
+        GIT_COMMITTER_EMAIL="test@example.com",
+        GIT_CONFIG_NOSYSTEM="1",
+        HOME=str(repo),
+    )
+    if timestamp is not None:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = f"{timestamp} +0000"
+    return subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True).stdout
+
+
+def git(repo: Path, *args: str, timestamp: Optional[int] = None) -> str:
+    """Run git in repo and return its stripped output."""
+    return git_bytes(repo, *args, timestamp=timestamp).decode().strip()
+
+
+def _commit(repo: Path, message: str, timestamp: int, files: Dict[str, str]):
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message, timestamp=timestamp)
+
+
+def _merge(repo: Path, rev: str, timestamp: int):
+    git(repo, "merge", "-q", "--no-ff", "-m", f"Merge {rev}", rev, timestamp=timestamp)
+
+
+@pytest.fixture(scope="session")
+def repo_path(tmp_path_factory) -> Path:
+    """A packed repository with deltas, tags and a criss-cross merge.
+
+    main has c0..c9 (tags v1 and v2), c10 and a merge of right; left and
+    right fork from c9 and merge each other's first commit (l1, r1), so
+    they have two merge bases. Everything is packed except the last commit.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+
+    repo = tmp_path_factory.mktemp("repo")
+    git(repo, "init", "-q", "-b", "main")
+    # Many small edits of one large file make git gc store deltas
+    lines = [f"line {i}: {'x' * (i % 50)}" for i in range(400)]
+    timestamp = 1_700_000_000
+    for i in range(10):
+        lines[i * 37] = f"changed in commit {i}"
+        files = {"big.txt": "\n".join(lines) + "\n", f"dir/file{i}.txt": f"{i}\n", "empty.txt": ""}
+        _commit(repo, f"c{i}", timestamp, files)
+        timestamp += 3600
+    git(repo, "tag", "v1", "HEAD~5")
+    git(repo, "tag", "-a", "-m", "Release 2", "v2", "HEAD", timestamp=timestamp)
+
+    git(repo, "checkout", "-q", "-b", "left")
+    _commit(repo, "l1", timestamp, {"left.txt": "l1\n"})
+    git(repo, "checkout", "-q", "-b", "right", "main")
+    _commit(repo, "r1", timestamp + 1, {"right.txt": "r1\n"})
+    timestamp += 3600
+
+    # Criss-cross: each side merges the other's first commit
+    git(repo, "checkout", "-q", "left")
+    _merge(repo, "right", timestamp)
+    git(repo, "checkout", "-q", "right")
+    _merge(repo, "left^1", timestamp + 1)
+    timestamp += 3600
+    git(repo, "checkout", "-q", "left")
+    _commit(repo, "l2", timestamp, {"left.txt": "l2\n"})
+    git(repo, "checkout", "-q", "right")
+    _commit(repo, "r2", timestamp + 1, {"right.txt": "r2\n"})
+    timestamp += 3600
+
+    git(repo, "checkout", "-q", "main")
+    _commit(repo, "c10", timestamp, {"big.txt": "\n".join(lines[::-1]) + "\n"})
+    _merge(repo, "right", timestamp + 60)
+
+    git(repo, "gc", "-q", "--aggressive")
+    # Leave one loose object next to the pack
+    _commit(repo, "loose", timestamp + 7200, {"loose.txt": "loose\n"})
+    return repo
+
+
+@pytest.fixture
+def repo_copy(tmp_path, repo_path) -> Path:
+    """A private copy of the fixture repository, for tests that change it."""
+    repo = tmp_path / "repo"
+    shutil.copytree(repo_path, repo)
+    return repo
+
+
+@pytest.fixture
+def parser(repo_path):
+    git_parser = GitParser(str(repo_path), diff_workers=1)
+    yield git_parser
+    git_parser.close()
+
+
+@pytest.fixture(scope="module")
+def client(repo_path):
+    # create_app installs its parser globally, so each module gets a fresh app
+    with TestClient(create_app(str(repo_path), diff_workers=1)) as test_client:
+        yield test_client
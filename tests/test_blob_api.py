@@ -0,0 +1,78 @@
+"""Tree listing and ranged blob streaming endpoints."""
+
+import pytest
+
+from .conftest import git_bytes
+
+
+def test_tree_lists_one_level(client, repo_path):
+    response = client.get("/api/tree/main")
+    assert response.status_code == 200
+    names = {entry["name"] for entry in response.json()}
+    assert {"big.txt", "empty.txt", "dir", "left.txt", "right.txt"} <= names
+
+    response = client.get("/api/tree/main/dir")
+    assert response.status_code == 200
+    assert sorted(entry["name"] for entry in response.json()) == [f"file{i}.txt" for i in range(10)]
+
+
+def test_tree_missing_directory(client):
+    assert client.get("/api/tree/main/nope").status_code == 404
+
+
+@pytest.mark.parametrize("path", ["big.txt", "loose.txt", "dir/file3.txt"])
+def test_blob_whole(client, repo_path, path):
+    response = client.get(f"/api/blob/HEAD/{path}")
+    assert response.status_code == 200
+    assert response.content == git_bytes(repo_path, "show", f"HEAD:{path}")
+    assert response.headers["accept-ranges"] == "bytes"
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+@pytest.mark.parametrize(
+    "header, select",
+    [
+        ("bytes=0-0", slice(0, 1)),
+        ("bytes=100-4999", slice(100, 5000)),
+        ("bytes=7000-", slice(7000, None)),
+        ("bytes=-10", slice(-10, None)),
+        ("bytes=0-999999", slice(0, None)),
+    ],
+)
+def test_blob_range(client, repo_path, header, select):
+    content = git_bytes(repo_path, "show", "HEAD:big.txt")
+    response = client.get("/api/blob/HEAD/big.txt", headers={"Range": header})
+    assert response.status_code == 206
+    assert response.content == content[select]
+    start = range(len(content))[select][0]
+    end = start + len(response.content) - 1
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(content)}"
+
+
+def test_blob_suffix_longer_than_blob(client):
+    response = client.get("/api/blob/HEAD/loose.txt", headers={"Range": "bytes=-100"})
+    assert response.status_code == 206
+    assert response.content == b"loose\n"
+
+
+@pytest.mark.parametrize("header", ["bytes=0-", "bytes=-1", "bytes=0-0"])
+def test_blob_range_on_empty_blob(client, header):
+    response = client.get("/api/blob/HEAD/empty.txt", headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+
+
+def test_blob_unsatisfiable_range(client):
+    response = client.get("/api/blob/HEAD/loose.txt", headers={"Range": "bytes=6-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */6"
+
+
+def test_blob_ignores_multi_range(client):
+    response = client.get("/api/blob/HEAD/loose.txt", headers={"Range": "bytes=0-1,3-4"})
+    assert response.status_code == 200
+    assert response.content == b"loose\n"
+
+
+def test_blob_missing_file(client):
+    assert client.get("/api/blob/HEAD/nope.txt").status_code == 404
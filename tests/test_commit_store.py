@@ -0,0 +1,188 @@
+"""Columnar commit store: building, incremental extension, persistence and queries."""
+
+import pytest
+
+from git_browser.git_parser import optional
+from git_browser.git_parser.commit_store import CommitStore, parse_commit_header
+from git_browser.git_parser.objects import GitObjectParser
+
+from .conftest import _commit, git
+
+
+def _log(repo, *revs: str):
+    """SHA -> (parent SHAs, author ident, author time, commit time), from git log."""
+    output = git(repo, "log", "--format=%H|%P|%an <%ae>|%at|%ct", *(revs or ["--all"]))
+    commits = {}
+    for line in output.splitlines():
+        sha, parents, author, author_time, commit_time = line.split("|")
+        commits[sha] = (parents.split(), author, int(author_time), int(commit_time))
+    return commits
+
+
+def _build(repo, *revs: str) -> CommitStore:
+    shas = git(repo, "rev-parse", *revs).split() if revs else _all_tips(repo)
+    store = CommitStore()
+    store.extend(GitObjectParser(repo / ".git"), shas)
+    return store
+
+
+def _all_tips(repo):
+    return git(repo, "rev-parse", "HEAD", "--branches", "--tags").split()
+
+
+def _generations(commits):
+    generations = {}
+
+    def generation(sha):
+        if sha not in generations:
+            generations[sha] = 1 + max((generation(p) for p in commits[sha][0]), default=0)
+        return generations[sha]
+
+    for sha in commits:
+        generation(sha)
+    return generations
+
+
+def _columns(store: CommitStore):
+    """Per-SHA view of a store, independent of the IDs it assigned."""
+    return {
+        store.sha_of(i): (
+            [store.sha_of(p) for p in store.parents_of(i)],
+            store.authors[store.author_id[i]],
+            store.author_time[i],
+            store.commit_time[i],
+            store.generation[i],
+            store.sha_of(store.first_parent[i]) if store.first_parent[i] >= 0 else None,
+        )
+        for i in range(len(store))
+    }
+
+
+@pytest.fixture(params=["numpy", "loops"])
+def queries(request, monkeypatch):
+    """Run store queries with NumPy and with the plain-loop fallback."""
+    if request.param == "loops":
+        monkeypatch.setitem(optional._modules, "numpy", None)
+    elif optional.numpy() is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def test_parse_commit_header():
+    content = (
+        b"tree " + b"a" * 40 + b"\n"
+        b"parent " + b"b" * 40 + b"\n"
+        b"parent " + b"c" * 40 + b"\n"
+        b"author A U Thor <a@example.com> 1700000000 -0130\n"
+        b"committer C O Mitter <c@example.com> 1700000100 +0200\n"
+        b"\n"
+        b"parent " + b"d" * 40 + b" in the message\n"
+    )
+    assert parse_commit_header(content) == (
+        ["b" * 40, "c" * 40],
+        "A U Thor <a@example.com>",
+        1_700_000_000,
+        -90,
+        1_700_000_100,
+    )
+
+
+def test_extend_matches_git(repo_path):
+    store = _build(repo_path)
+    commits = _log(repo_path)
+    generations = _generations(commits)
+    assert len(store) == len(commits)
+
+    for sha, (parents, author, author_time, commit_time) in commits.items():
+        commit_id = store.index_of(sha)
+        assert commit_id is not None and store.sha_of(commit_id) == sha
+        assert [store.sha_of(p) for p in store.parents_of(commit_id)] == parents
+        assert store.first_parent[commit_id] == (store.index_of(parents[0]) if parents else -1)
+        assert store.authors[store.author_id[commit_id]] == author
+        assert store.author_name(store.author_id[commit_id]) == "Test"
+        assert store.author_time[commit_id] == author_time
+        assert store.commit_time[commit_id] == commit_time
+        assert store.generation[commit_id] == generations[sha]
+
+    assert store.index_of("0" * 40) is None
+    assert store.index_of("not hex") is None
+    assert store.extend(GitObjectParser(repo_path / ".git"), _all_tips(repo_path)) == 0
+
+
+def test_incremental_extend_matches_full_build(repo_path):
+    store = _build(repo_path, "v1")
+    assert len(store) == int(git(repo_path, "rev-list", "--count", "v1"))
+
+    added = store.extend(GitObjectParser(repo_path / ".git"), _all_tips(repo_path))
+    assert added == int(git(repo_path, "rev-list", "--count", "--all", "^v1"))
+    assert _columns(store) == _columns(_build(repo_path))
+
+
+def test_save_and_load(repo_copy):
+    store = _build(repo_copy)
+    store.snapshot = [("refs/heads/main", git(repo_copy, "rev-parse", "main"))]
+    path = CommitStore.path_for(repo_copy / ".git")
+    assert store.save(path)
+
+    loaded = CommitStore.load(path)
+    assert loaded is not None
+    assert loaded.snapshot == store.snapshot
+    assert loaded.authors == store.authors
+    assert loaded.shas == store.shas
+    for name in ("by_sha", "commit_time", "generation", "parent_offsets", "parent_ids"):
+        assert getattr(loaded, name) == getattr(store, name), name
+
+    # A loaded store goes on from where it was saved
+    _commit(repo_copy, "after save", 1_800_000_000, {"new.txt": "new\n"})
+    head = git(repo_copy, "rev-parse", "HEAD")
+    assert loaded.extend(GitObjectParser(repo_copy / ".git"), [head]) == 1
+    assert [loaded.sha_of(p) for p in loaded.parents_of(loaded.index_of(head))] == [
+        git(repo_copy, "rev-parse", "HEAD~1")
+    ]
+    assert _columns(loaded) == _columns(_build(repo_copy))
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda data: b"GBCSTOR0" + data[8:],  # Other format version
+        lambda data: data[: len(data) // 2],  # Truncated
+        lambda data: data[:12] + b"{" * 20 + data[32:],  # Garbled metadata
+    ],
+)
+def test_load_rejects_damaged_files(repo_path, tmp_path, damage):
+    path = tmp_path / "commit-store"
+    assert _build(repo_path).save(path)
+    path.write_bytes(damage(path.read_bytes()))
+    assert CommitStore.load(path) is None
+
+
+def test_load_missing_file(tmp_path):
+    assert CommitStore.load(tmp_path / "missing") is None
+
+
+def test_reachable(repo_path, queries):
+    store = _build(repo_path)
+    for revs in (["v1"], ["left", "right"], ["main~3", "left~1"]):
+        mask = store.reachable([store.index_of(sha) for sha in git(repo_path, "rev-parse", *revs).split()])
+        reached = {store.sha_of(i) for i in range(len(store)) if mask[i]}
+        assert reached == set(git(repo_path, "rev-list", *revs).split()), revs
+    assert not any(store.reachable([]))
+
+
+def test_select(repo_path, queries):
+    store = _build(repo_path)
+    commits = _log(repo_path)
+    tips = [store.index_of(sha) for sha in _all_tips(repo_path)]
+
+    ids = store.select(tips)
+    assert {store.sha_of(i) for i in ids} == set(commits)
+    times = [store.commit_time[i] for i in ids]
+    assert times == sorted(times, reverse=True)
+
+    since, until = 1_700_000_000 + 3 * 3600, 1_700_000_000 + 12 * 3600
+    ids = store.select(tips, author="EXAMPLE.com", since=since, until=until)
+    assert {store.sha_of(i) for i in ids} == {
+        sha for sha, (_, _, author_time, _) in commits.items() if since <= author_time <= until
+    }
+    assert store.select(tips, author="nobody") == []
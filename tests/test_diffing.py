@@ -0,0 +1,167 @@
+"""Line diff statistics, inline and in the worker pool with deadlines."""
+
+import random
+import time
+
+import pytest
+
+from git_browser.git_parser import diffing, parser as parser_module
+from git_browser.git_parser.diffing import DiffPool, count_changes
+from git_browser.git_parser.parser import GitParser
+
+from .conftest import git
+
+
+def _text(lines) -> bytes:
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+def _pairs(count: int):
+    """(key, old, new) pairs with known but varied changes."""
+    base = [f"line {i}" for i in range(50)]
+    pairs = []
+    for key in range(count):
+        new = list(base)
+        del new[key % 7 : key % 7 + key % 3]
+        new[10:10] = [f"added {key} {i}" for i in range(key % 5)]
+        pairs.append((key, _text(base), _text(new)))
+    return pairs
+
+
+def _slow_pair(key: int):
+    """A pair of over a megabyte that takes difflib about half a second."""
+    rng = random.Random(key)
+    old = [f"{rng.random()}" for _ in range(60_000)]
+    new = list(old)
+    rng.shuffle(new)
+    return key, _text(old), _text(new)
+
+
+@pytest.fixture
+def pool():
+    diff_pool = DiffPool(2)
+    yield diff_pool
+    diff_pool.close()
+
+
+@pytest.mark.parametrize(
+    "old,new,expected",
+    [
+        (b"", b"", (0, 0)),
+        (b"", b"a\nb\n", (2, 0)),
+        (b"a\nb\nc\n", b"a\nB\nc\nd\n", (2, 1)),
+        (b"a\nb", b"a\nb\n", (1, 1)),  # Missing newline at end of file
+        (b"a\r\nb\r\n", b"a\nb\n", (2, 2)),
+    ],
+)
+def test_count_changes(old, new, expected):
+    assert count_changes(old, new) == expected
+
+
+def test_count_changes_matches_git(repo_path):
+    old, new = "main~10", "main~3"
+    numstat = git(repo_path, "diff", "--numstat", old, new, "--", "big.txt").split()
+    old_blob = git(repo_path, "cat-file", "blob", f"{old}:big.txt").encode() + b"\n"
+    new_blob = git(repo_path, "cat-file", "blob", f"{new}:big.txt").encode() + b"\n"
+    assert count_changes(old_blob, new_blob) == (int(numstat[0]), int(numstat[1]))
+
+
+def test_pool_matches_inline(pool):
+    pairs = _pairs(3 * diffing.DIFF_BATCH_PAIRS + 5)
+    cpu_times = []
+    results = pool.count_changes(iter(pairs), time.perf_counter() + 60, on_cpu_time=cpu_times.append)
+    assert results == {key: count_changes(old, new) for key, old, new in pairs}
+    assert len(cpu_times) == 4 and all(t >= 0 for t in cpu_times)
+
+
+def test_pool_returns_pairs_finished_before_the_deadline(pool):
+    pool.count_changes(iter(_pairs(1)), time.perf_counter() + 60)  # Start the workers
+    first = _pairs(diffing.DIFF_BATCH_PAIRS)
+    deadline = time.perf_counter() + 1.0
+    read = []
+
+    def slow_reader():
+        yield from first
+        # Reading the next blob takes until past the deadline
+        time.sleep(max(deadline - time.perf_counter(), 0) + 0.05)
+        for pair in _pairs(diffing.DIFF_BATCH_PAIRS + 10)[len(first) :]:
+            read.append(pair[0])
+            yield pair
+
+    results = pool.count_changes(slow_reader(), deadline)
+    assert results == {key: count_changes(old, new) for key, old, new in first}
+    # Reading stopped at the deadline
+    assert len(read) == 1
+
+
+def test_pool_gives_up_on_slow_batches_at_the_deadline(pool):
+    pool.count_changes(iter(_pairs(1)), time.perf_counter() + 60)
+    slow = [_slow_pair(i) for i in range(4)]
+    start = time.perf_counter()
+    results = pool.count_changes(iter(slow), start + 0.1)
+    assert time.perf_counter() - start < 1.0
+    assert results == {}
+
+    # The pool stays usable while the abandoned batches finish
+    pairs = _pairs(5)
+    results = pool.count_changes(iter(pairs), time.perf_counter() + 60)
+    assert results == {key: count_changes(old, new) for key, old, new in pairs}
+
+
+def test_pool_past_deadline_diffs_nothing(pool):
+    read = []
+
+    def reader():
+        for pair in _pairs(10):
+            read.append(pair[0])
+            yield pair
+
+    assert pool.count_changes(reader(), time.perf_counter() - 1) == {}
+    assert read == [0]
+
+
+def test_close_cancels_and_pool_restarts(pool):
+    pool.count_changes(iter([_slow_pair(i) for i in range(6)]), time.perf_counter() + 0.1)
+    assert any(not future.done() for future in pool._futures)
+    start = time.perf_counter()
+    pool.close()
+    assert time.perf_counter() - start < 1.0
+    assert pool._executor is None
+
+    pairs = _pairs(3)
+    results = pool.count_changes(iter(pairs), time.perf_counter() + 60)
+    assert results == {key: count_changes(old, new) for key, old, new in pairs}
+
+
+def _blob_pairs(repo, old: str, new: str):
+    """(old blob, new blob) pairs of every file changed between two commits."""
+    pairs = []
+    for line in git(repo, "diff", "--raw", "--no-abbrev", old, new).splitlines():
+        _, _, old_blob, new_blob, _ = line[1:].split(None, 4)
+        pairs.append(tuple(None if set(blob) == {"0"} else blob for blob in (old_blob, new_blob)))
+    return pairs
+
+
+def test_diff_stats_pool_matches_inline(repo_path, parser, monkeypatch):
+    monkeypatch.setattr(parser_module, "PARALLEL_DIFF_MIN_FILES", 1)
+    pairs = _blob_pairs(repo_path, "main~10", "main")
+    assert len(pairs) > 2
+
+    pooled = GitParser(str(repo_path), diff_workers=2)
+    try:
+        stats = pooled.diff_stats(pairs, deadline=60)
+    finally:
+        pooled.close()
+    assert stats == parser.diff_stats(pairs, deadline=60)
+    assert not any(s["incomplete"] for s in stats)
+
+    numstat = git(repo_path, "diff", "--numstat", "main~10", "main").splitlines()
+    assert sorted(s["additions"] + s["deletions"] for s in stats) == sorted(
+        int(added) + int(deleted) for added, deleted, _ in (line.split("\t") for line in numstat)
+    )
+
+
+def test_diff_stats_marks_unfinished_pairs_incomplete(repo_path, parser):
+    pairs = _blob_pairs(repo_path, "main~10", "main")
+    stats = parser.diff_stats(pairs, deadline=0)
+    assert all(s["incomplete"] and s["additions"] == s["deletions"] == 0 for s in stats)
@@ -0,0 +1,82 @@
+"""Static export: page order, shard contents and incremental updates."""
+
+import json
+
+import pytest
+
+from git_browser import export
+
+from .conftest import _commit, git
+
+
+def _graph(out):
+    manifest = json.loads((out / "manifest.json").read_text())
+    pages = [
+        [json.loads(line) for line in (out / name).read_text().splitlines()]
+        for name in manifest["graph"]
+    ]
+    return manifest, pages
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(export, "PAGE_SIZE", 4)
+
+
+def test_pages_are_in_display_order(parser, repo_path, tmp_path, small_pages):
+    out = tmp_path / "site"
+    counts = export.export_repository(str(repo_path), str(out))
+    manifest, pages = _graph(out)
+
+    total = int(git(repo_path, "rev-list", "--all", "--count"))
+    assert counts["commits"] == total
+    assert counts["pages"] == len(pages) == -(-total // 4)
+    # Only the newest page may be short
+    assert all(len(page) == 4 for page in pages[1:])
+
+    window = parser.get_graph_window(timestamp=2**40, before=0, after=total)
+    assert [node["sha"] for page in pages for node in page] == [node["sha"] for node in window["nodes"]]
+    assert pages[0][0]["sha"] == git(repo_path, "rev-parse", "HEAD")
+    assert manifest["info"] == parser.get_summary()
+
+
+def test_commit_and_diff_shards(parser, repo_path, tmp_path):
+    out = tmp_path / "site"
+    export.export_repository(str(repo_path), str(out))
+    sha = git(repo_path, "rev-parse", "main~3")
+    shard = json.loads((out / export.commit_shard(sha)).read_text())
+    details = parser.get_commit_details(sha)
+    assert shard["commit"]["sha"] == sha
+    assert {f["path"] for f in shard["files"]} == {f.path for f in details.files}
+    diff = json.loads((out / shard["diffs"]["big.txt"]).read_text())
+    assert diff["path"] == "big.txt"
+    assert diff["additions"] == diff["deletions"] == 1
+
+
+def test_export_is_incremental(repo_copy, tmp_path, small_pages):
+    out = tmp_path / "site"
+    first = export.export_repository(str(repo_copy), str(out))
+    assert first["commit_shards"] == first["commits"]
+
+    again = export.export_repository(str(repo_copy), str(out))
+    assert again["pages"] == again["commit_shards"] == again["diff_shards"] == 0
+
+    _, before = _graph(out)
+    _commit(repo_copy, "new", 1_800_000_000, {"new.txt": "new\n"})
+    update = export.export_repository(str(repo_copy), str(out))
+    manifest, after = _graph(out)
+    # The new commit lands on the newest page; older pages are kept as they are
+    assert update["pages"] == 1
+    assert update["commit_shards"] == 1
+    assert after[0][0]["sha"] == git(repo_copy, "rev-parse", "HEAD")
+    assert after[-len(before) + 1 :] == before[1:]
+    assert len(list((out / "graph").glob("*.ndjson"))) == len(manifest["graph"])
+
+
+def test_parallel_export_matches_inline(repo_path, tmp_path, small_pages):
+    export.export_repository(str(repo_path), str(tmp_path / "inline"))
+    export.export_repository(str(repo_path), str(tmp_path / "parallel"), workers=2)
+    assert _graph(tmp_path / "inline")[1] == _graph(tmp_path / "parallel")[1]
+    inline = sorted(p.relative_to(tmp_path / "inline") for p in (tmp_path / "inline").rglob("*.json"))
+    parallel = sorted(p.relative_to(tmp_path / "parallel") for p in (tmp_path / "parallel").rglob("*.json"))
+    assert inline == parallel
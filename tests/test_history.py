@@ -0,0 +1,96 @@
+"""Corrected-date history order, lane layout and graph windows."""
+
+import pytest
+
+from git_browser.git_parser.history import HistoryOrder, assign_lanes
+from git_browser.git_parser.parser import GitParser
+
+from .conftest import _commit, git
+
+
+def test_history_order_is_topological(parser, repo_path):
+    store = parser.get_commit_store()
+    history = HistoryOrder(store)
+    history.update()
+
+    assert len(history) == int(git(repo_path, "rev-list", "--all", "--count"))
+    assert sorted(int(i) for i in history.order) == list(range(len(store)))
+    for commit_id in range(len(store)):
+        assert history.order[history.rank[commit_id]] == commit_id
+        for parent in store.parents_of(commit_id):
+            assert history.rank[parent] > history.rank[commit_id]
+            assert history.corrected[parent] < history.corrected[commit_id]
+
+    dates = [history.corrected[commit_id] for commit_id in history.order]
+    assert dates == sorted(dates, reverse=True)
+    assert history.position_of_time(2**40) == 0
+    assert history.position_of_time(0) == len(history)
+
+
+def test_assign_lanes():
+    lanes = []
+    rows = [
+        ("m", ["a", "b"]),  # Merge opens a second lane for b
+        ("b", ["base"]),
+        ("a", ["base"]),
+        ("base", []),
+    ]
+    assert assign_lanes(lanes, rows) == [0, 1, 0, 0]
+    assert lanes == []
+
+
+def test_assign_lanes_continues_from_lanes_in():
+    lanes = [None, "b"]
+    assert assign_lanes(lanes, [("c", ["a"]), ("b", [])]) == [0, 1]
+    assert lanes == ["a"]
+
+
+@pytest.mark.parametrize("page", [1, 3, 7])
+def test_windows_match_full_layout(parser, page):
+    full = parser.get_graph_window(timestamp=2**40, before=0, after=10_000)
+    total = full["total"]
+    assert len(full["nodes"]) == total
+    assert full["lanes_in"] == []
+
+    nodes = []
+    for start in range(0, total, page):
+        window = parser.get_graph_window(
+            anchor=full["nodes"][start]["sha"], before=0, after=page - 1
+        )
+        assert window["start"] == start
+        # Lanes coming in from above are exactly those still open at this row
+        lanes = []
+        assign_lanes(lanes, [(node["sha"], node["parents"]) for node in full["nodes"][:start]])
+        assert set(window["lanes_in"]) == {sha for sha in lanes if sha}
+        nodes.extend(node["sha"] for node in window["nodes"])
+    assert nodes == [node["sha"] for node in full["nodes"]]
+
+
+def test_window_around_time(parser, repo_path):
+    timestamp = int(git(repo_path, "log", "-1", "--format=%ct", "v1"))
+    window = parser.get_graph_window(timestamp=timestamp, before=2, after=2)
+    anchor = window["nodes"][window["anchor_position"] - window["start"]]
+    assert anchor["sha"] == git(repo_path, "rev-parse", "v1")
+
+
+def test_window_then_new_commit(repo_copy):
+    """A graph window must not keep the commit store from growing."""
+    repo = repo_copy
+    parser = GitParser(str(repo), diff_workers=1)
+    try:
+        parser.get_graph_window(timestamp=2**40, before=0, after=50)
+        parser.get_changed_path_index().touching([0, 1], "big.txt")
+
+        _commit(repo, "after window", 1_800_000_000, {"new.txt": "new\n"})
+        head = git(repo, "rev-parse", "HEAD")
+
+        store = parser.get_commit_store()
+        assert len(store) == int(git(repo, "rev-list", "--all", "--count"))
+        assert store.index_of(head) is not None
+        assert parser.contained_in(head)["branches"] == ["main"]
+
+        window = parser.get_graph_window(timestamp=2**40, before=0, after=50)
+        assert window["nodes"][0]["sha"] == head
+        assert len(store.parents_of(store.index_of(head))) == 1
+    finally:
+        parser.close()
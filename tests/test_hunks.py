@@ -0,0 +1,89 @@
+"""Hunk range parsing and slicing."""
+
+import pytest
+
+from git_browser.git_parser.hunks import index_hunks, parse_range, slice_hunks
+
+from .conftest import git
+
+
+@pytest.mark.parametrize(
+    "value, total, expected",
+    [
+        ("0", 5, (0, 1)),
+        ("4", 5, (4, 5)),
+        ("1-3", 5, (1, 3)),
+        ("2-", 5, (2, 5)),
+        (" 1-3 ", 5, (1, 3)),
+        ("0-100", 5, (0, 5)),
+        ("3-3", 5, (3, 3)),
+        # A diff without hunks accepts any range as the empty window
+        ("0", 0, (0, 0)),
+        ("0-", 0, (0, 0)),
+        ("3", 0, (0, 0)),
+        ("7-", 0, (0, 0)),
+        ("2-9", 0, (0, 0)),
+    ],
+)
+def test_parse_range(value, total, expected):
+    assert parse_range(value, total) == expected
+
+
+@pytest.mark.parametrize(
+    "value", ["", "-", "-3", "a", "1-b", "1--2", "3-1", "1,2", "5", "5-", "9-12"]
+)
+def test_parse_range_rejects(value):
+    assert parse_range(value, 5) is None
+
+
+DIFF = """diff --git a/f b/f
+--- a/f
++++ b/f
+@@ -1,2 +1,2 @@
+-a
++b
+ c
+@@ -10 +10 @@
+-x
++y
+@@ -20,0 +21 @@
++z"""
+
+
+def test_index_and_slice_hunks():
+    starts = index_hunks(DIFF)
+    assert len(starts) == 3
+    assert all(DIFF.startswith("@@", start) for start in starts)
+
+    header, hunks = slice_hunks(DIFF, starts, 1, 3)
+    assert header == "diff --git a/f b/f\n--- a/f\n+++ b/f"
+    assert hunks == ["@@ -10 +10 @@\n-x\n+y", "@@ -20,0 +21 @@\n+z"]
+
+
+def test_slice_hunks_without_hunks():
+    assert index_hunks("Binary files differ") == []
+    assert slice_hunks("Binary files differ", [], 0, 0) == ("Binary files differ", [])
+
+
+
+def test_get_diff_hunks_windows(parser, repo_path):
+    old_sha = git(repo_path, "rev-parse", "main~10:big.txt")
+    new_sha = git(repo_path, "rev-parse", "main~3:big.txt")
+    whole = parser.get_diff_hunks(old_sha, new_sha, "big.txt", "0-")
+    total = whole["total_hunks"]
+    assert total > 2
+    assert (whole["hunk_start"], whole["hunk_end"]) == (0, total)
+
+    window = parser.get_diff_hunks(old_sha, new_sha, "big.txt", "1-2", word_diff=True)
+    assert (window["hunk_start"], window["hunk_end"]) == (1, 2)
+    assert window["diff"].count("\n@@") == 1
+    assert len(window["word_diff"]) == 1
+
+    with pytest.raises(ValueError):
+        parser.get_diff_hunks(old_sha, new_sha, "big.txt", str(total))
+
+
+def test_get_diff_hunks_without_hunks(parser, repo_path):
+    sha = git(repo_path, "rev-parse", "main:big.txt")
+    result = parser.get_diff_hunks(sha, sha, "big.txt", "5-")
+    assert (result["total_hunks"], result["hunk_start"], result["hunk_end"]) == (0, 0, 0)
@@ -0,0 +1,138 @@
+"""Background jobs: one at a time, cancellation and the event stream."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from git_browser.api import routes
+from git_browser.api.jobs import JobQueue
+
+# Prints "start", then its argument lines one by one, then "end"
+SCRIPT = """
+import sys, time
+print("start", flush=True)
+for line in sys.argv[2:]:
+    time.sleep(float(sys.argv[1]))
+    print(line, flush=True)
+print("end", flush=True)
+"""
+
+
+class _ScriptClient:
+    """Runs SCRIPT instead of git, the way GitClient.start_git starts git."""
+
+    def __init__(self, delay: float = 0.0, lines=()):
+        self.args = [str(delay), *lines]
+
+    def start_git(self, args):
+        return subprocess.Popen(
+            [sys.executable, "-c", SCRIPT, *self.args],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=os.name == "posix",
+        )
+
+
+def _wait_finished(job, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, job.to_dict()
+        job.wait(len(job.lines), 0.1)
+
+
+def _events(text: str):
+    """Parse a server-sent event stream into (event, data) pairs and comments."""
+    events = []
+    for block in text.split("\n\n"):
+        if block.startswith(":"):
+            events.append((None, block[1:].strip()))
+        elif block:
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_jobs_run_one_at_a_time():
+    finished = []
+    jobs = JobQueue(_ScriptClient(0.1, ["a", "b"]), on_finish=finished.append)
+    first, second = jobs.submit("fetch"), jobs.submit("pull")
+    assert [job.id for job in jobs.list()] == [first.id, second.id]
+    _wait_finished(second)
+
+    for job in (first, second):
+        assert job.status == "succeeded"
+        assert job.returncode == 0
+        assert job.lines == ["start", "a", "b", "end"]
+    # The second job started only once the first was finished and refreshed
+    assert second.started_at >= first.finished_at
+    assert finished == [first, second]
+    assert jobs.get(first.id) is first and jobs.get("nope") is None
+
+
+def test_submit_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        JobQueue(_ScriptClient()).submit("gc")
+
+
+def test_cancel_running_and_queued_jobs():
+    jobs = JobQueue(_ScriptClient(60, ["never"]))
+    running, queued = jobs.submit("fetch"), jobs.submit("fetch")
+    running.wait(0, 30)
+    assert running.status == "running"
+
+    assert queued.cancel()
+    assert queued.status == "cancelled" and queued.started_at is None
+    assert running.cancel()
+    _wait_finished(running)
+    assert running.status == "cancelled"
+    assert "never" not in running.lines
+    assert not running.cancel()
+
+    # The worker skips the cancelled job and goes on with the next one
+    jobs.client = _ScriptClient()
+    after = jobs.submit("fetch")
+    _wait_finished(after)
+    assert after.status == "succeeded"
+    assert queued.started_at is None
+
+
+def test_event_stream_of_failed_pull(client):
+    # The fixture repository has no remote to pull from, so git fails straight away
+    response = client.post("/api/jobs", json={"kind": "pull"})
+    assert response.status_code == 202
+    job_id = response.json()["job"]["id"]
+
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _events("".join(response.iter_text()))
+    kind, end = events[-1]
+    assert kind == "end"
+    assert end["id"] == job_id and end["status"] == "failed"
+    assert end["error"] in [data["line"] for kind, data in events if kind == "progress"]
+    assert client.get(f"/api/jobs/{job_id}").json()["status"] == "failed"
+
+
+def test_event_stream_follows_a_running_job(client, monkeypatch):
+    monkeypatch.setattr(routes, "JOB_EVENTS_KEEPALIVE", 0.05)
+    jobs = JobQueue(_ScriptClient(0.3, ["one", "two"]))
+    previous = routes.get_job_queue()
+    routes.set_job_queue(jobs)
+    try:
+        job = jobs.submit("fetch")
+        with client.stream("GET", f"/api/jobs/{job.id}/events") as response:
+            events = _events("".join(response.iter_text()))
+        assert client.delete(f"/api/jobs/{job.id}").status_code == 409
+    finally:
+        routes.set_job_queue(previous)
+
+    lines = [data["line"] for kind, data in events if kind == "progress"]
+    assert lines == ["start", "one", "two", "end"]
+    # Idle waits between lines send keep-alive comments
+    assert (None, "keep-alive") in events
+    assert events[-1] == ("end", job.to_dict())
+    assert job._watchers == []
@@ -0,0 +1,194 @@
+"""Memory budget: weighted eviction across caches and load shedding."""
+
+import pytest
+
+from git_browser.git_parser import memory
+from git_browser.git_parser.cache import LRUCache
+from git_browser.git_parser.memory import MemoryBudget, Rebuildable, parse_size
+from git_browser.git_parser.parser import GitParser
+
+from .conftest import git
+
+
+@pytest.fixture
+def no_rss(monkeypatch):
+    """Judge pressure on accounted bytes only, whatever the test process holds."""
+    monkeypatch.setattr(memory, "resident_bytes", lambda: None)
+
+
+class _Index:
+    """Stand-in for a derived index accounted through a Rebuildable."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.drops = 0
+
+    def drop(self):
+        self.size = 0
+        self.drops += 1
+
+
+def _fill(cache: LRUCache, count: int, size: int):
+    for i in range(count):
+        cache.put(i, b"x", size)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("1048576", 1048576), ("512M", 512 * 1024**2), ("2G", 2 * 1024**3), ("1.5KiB", 1536)],
+)
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "M", "lots", "0", "-1G"])
+def test_parse_size_rejects(value):
+    with pytest.raises(ValueError):
+        parse_size(value)
+
+
+def test_unlimited_budget_never_evicts(no_rss):
+    budget = MemoryBudget()
+    cache = LRUCache("a", 10_000)
+    budget.register(cache)
+    _fill(cache, 100, 100)
+    assert cache.current_bytes == 10_000
+    assert budget.cache_limit() is None
+    assert not budget.under_pressure()
+
+
+def test_eviction_follows_weights(no_rss):
+    # 2000 bytes for caches: the heavier cache keeps twice the share
+    budget = MemoryBudget(4000)
+    light, heavy = LRUCache("light", 10_000), LRUCache("heavy", 10_000)
+    budget.register(light, weight=1)
+    budget.register(heavy, weight=2)
+    for i in range(30):
+        light.put(i, b"x", 100)
+        heavy.put(i, b"x", 100)
+    assert budget.cache_bytes() <= budget.cache_limit() == 2000
+    assert heavy.current_bytes == pytest.approx(2 * light.current_bytes, abs=200)
+    # Least recently used entries went first
+    assert light.get(29) is not None and light.get(0) is None
+
+
+def test_fixed_bytes_shrink_cache_share(no_rss):
+    budget = MemoryBudget(4000)
+    cache = LRUCache("a", 10_000)
+    budget.register(cache)
+    fixed = [0]
+    budget.register_fixed("store", lambda: fixed[0])
+    _fill(cache, 20, 100)
+    assert cache.current_bytes == 2000
+
+    fixed[0] = 1500
+    assert budget.cache_limit() == 500
+    cache.put("new", b"x", 100)
+    assert cache.current_bytes == 500
+    assert cache.get("new") is not None
+
+
+def test_rebuildable_is_dropped_whole(no_rss):
+    budget = MemoryBudget(4000)
+    cache = LRUCache("a", 10_000)
+    index = _Index(1500)
+    budget.register(cache, weight=1)
+    budget.register(Rebuildable("index", lambda: index.size, index.drop), weight=1)
+    _fill(cache, 5, 100)
+    assert index.drops == 0
+
+    # The index is furthest above its share, so it goes before any entry
+    cache.put("more", b"x", 100)
+    assert index.drops == 1 and index.size == 0
+    assert len(cache) == 6
+
+
+def test_pressure_on_accounted_bytes(no_rss):
+    budget = MemoryBudget(1000)
+    cache = LRUCache("a", 10_000)
+    budget.register(cache)
+    fixed = [0]
+    budget.register_fixed("store", lambda: fixed[0])
+    _fill(cache, 5, 100)
+    assert not budget.under_pressure()
+
+    # Trimming caches cannot bring a large fixed structure under the threshold
+    fixed[0] = 950
+    assert budget.under_pressure()
+    assert cache.current_bytes == 0
+    fixed[0] = 100
+    assert not budget.under_pressure()
+
+
+def test_pressure_on_resident_size(monkeypatch):
+    limit = 1_000_000
+    budget = MemoryBudget(limit)
+    cache = LRUCache("a", limit)
+    budget.register(cache)
+    _fill(cache, 4, 100_000)
+    rss = [limit]
+    monkeypatch.setattr(memory, "resident_bytes", lambda: rss[0])
+
+    assert budget.under_pressure()
+    # Caches were trimmed, and requests are refused for a while
+    assert cache.current_bytes <= limit * memory.CACHE_SHARE * memory.PRESSURE_TRIM
+    assert budget.report()["shedding"]
+    assert budget.under_pressure()
+
+    # Resident size stays high after the trim: that is reuse, not pressure
+    budget._shed_until = 0.0
+    rss[0] = int(limit * (1 + memory.RSS_GROWTH / 2))
+    assert not budget.under_pressure()
+    rss[0] = int(limit * (1 + memory.RSS_GROWTH * 2))
+    assert budget.under_pressure()
+
+    # Dropping below the threshold resets the floor
+    budget._shed_until = 0.0
+    rss[0] = limit // 2
+    assert not budget.under_pressure()
+    assert budget._rss_floor is None
+
+
+def test_report(no_rss):
+    budget = MemoryBudget(4000)
+    cache = LRUCache("a", 1000)
+    budget.register(cache, weight=3)
+    budget.register_fixed("store", lambda: 500)
+    cache.put("k", b"x", 200)
+
+    report = budget.report()
+    assert report["limit_bytes"] == 4000
+    assert report["cache_limit_bytes"] == 1500
+    assert report["cache_bytes"] == 200
+    assert report["fixed_bytes"] == 500
+    assert report["caches"] == [
+        {"name": "a", "bytes": 200, "entries": 1, "max_bytes": 1000, "weight": 3}
+    ]
+    assert report["fixed"] == [{"name": "store", "bytes": 500}]
+    assert not report["shedding"]
+
+
+def test_parser_answers_the_same_after_reclaim(parser, repo_path):
+    head = git(repo_path, "rev-parse", "HEAD")
+    contained = parser.contained_in(head)
+    parser.get_summary()
+    parser.get_changed_path_index()
+    assert parser.memory.cache_bytes() > 0
+
+    parser.memory._reclaim(0)
+    assert parser.memory.cache_bytes() == 0
+    assert parser.contained_in(head) == contained
+    assert parser.resolve_revision("HEAD~3") == git(repo_path, "rev-parse", "HEAD~3")
+
+
+def test_parser_with_tiny_limit(repo_path, no_rss):
+    reference = GitParser(str(repo_path), diff_workers=1)
+    tight = GitParser(str(repo_path), diff_workers=1, memory_limit=200_000)
+    try:
+        for rev in ("HEAD", "v1", "left", "right~1"):
+            sha = git(repo_path, "rev-parse", rev + "^{commit}")
+            assert tight.contained_in(sha) == reference.contained_in(sha)
+        assert tight.memory.cache_bytes() <= tight.memory.cache_limit()
+    finally:
+        tight.close()
+        reference.close()
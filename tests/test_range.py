@@ -0,0 +1,53 @@
+"""Range header parsing for raw blob downloads."""
+
+import pytest
+from fastapi import HTTPException
+
+from git_browser.api.routes import _parse_range
+
+
+@pytest.mark.parametrize(
+    "header, size, expected",
+    [
+        ("bytes=0-0", 10, (0, 0)),
+        ("bytes=0-9", 10, (0, 9)),
+        ("bytes=2-5", 10, (2, 5)),
+        ("bytes=5-", 10, (5, 9)),
+        ("bytes=5-100", 10, (5, 9)),
+        # Suffix ranges select the last N bytes, or all of a shorter blob
+        ("bytes=-3", 10, (7, 9)),
+        ("bytes=-10", 10, (0, 9)),
+        ("bytes=-100", 10, (0, 9)),
+        (" bytes=1-2 ", 10, (1, 2)),
+    ],
+)
+def test_parse_range(header, size, expected):
+    assert _parse_range(header, size) == expected
+
+
+@pytest.mark.parametrize(
+    "header", [None, "", "bytes=", "bytes=-", "items=0-1", "bytes=0-1,3-4", "bytes=a-b"]
+)
+def test_parse_range_serves_whole_content(header):
+    assert _parse_range(header, 10) is None
+
+
+@pytest.mark.parametrize(
+    "header, size",
+    [
+        ("bytes=10-", 10),
+        ("bytes=10-20", 10),
+        ("bytes=5-2", 10),
+        ("bytes=-0", 10),
+        # No byte of an empty blob can be selected
+        ("bytes=0-", 0),
+        ("bytes=0-0", 0),
+        ("bytes=-1", 0),
+        ("bytes=-0", 0),
+    ],
+)
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(HTTPException) as raised:
+        _parse_range(header, size)
+    assert raised.value.status_code == 416
+    assert raised.value.headers == {"Content-Range": f"bytes */{size}"}
@@ -0,0 +1,48 @@
+"""Merge bases and ahead/behind counts, checked against git."""
+
+import itertools
+
+import pytest
+
+from git_browser.git_parser.reachability import ahead_behind, ahead_behind_pairs, merge_bases
+
+from .conftest import git
+
+REVS = ["main", "left", "right", "v1", "v2^{commit}", "main~2", "left~1^2", "right~1", "HEAD"]
+
+
+@pytest.fixture
+def commit_ids(parser, repo_path):
+    store = parser.get_commit_store()
+    return {rev: store.index_of(git(repo_path, "rev-parse", rev)) for rev in REVS}
+
+
+@pytest.mark.parametrize("a, b", list(itertools.combinations(REVS, 2)) + [("main", "main")])
+def test_merge_bases_match_git(parser, repo_path, commit_ids, a, b):
+    store = parser.get_commit_store()
+    expected = set(git(repo_path, "merge-base", "--all", a, b).split())
+    assert {store.sha_of(c) for c in merge_bases(store, commit_ids[a], commit_ids[b])} == expected
+
+
+def test_criss_cross_has_two_merge_bases(parser, commit_ids):
+    store = parser.get_commit_store()
+    assert len(merge_bases(store, commit_ids["left"], commit_ids["right"])) == 2
+
+
+def _git_counts(repo_path, base: str, tip: str):
+    behind, ahead = git(repo_path, "rev-list", "--left-right", "--count", f"{base}...{tip}").split()
+    return {"ahead": int(ahead), "behind": int(behind)}
+
+
+@pytest.mark.parametrize("base", REVS)
+def test_ahead_behind_matches_git(parser, repo_path, commit_ids, base):
+    store = parser.get_commit_store()
+    counts = ahead_behind(store, commit_ids[base], [commit_ids[tip] for tip in REVS])
+    assert counts == [_git_counts(repo_path, base, tip) for tip in REVS]
+
+
+def test_ahead_behind_pairs_matches_git(parser, repo_path, commit_ids):
+    store = parser.get_commit_store()
+    pairs = list(itertools.permutations(REVS, 2))
+    counts = ahead_behind_pairs(store, [(commit_ids[tip], commit_ids[base]) for tip, base in pairs])
+    assert counts == [_git_counts(repo_path, base, tip) for tip, base in pairs]
@@ -0,0 +1,82 @@
+"""Backward line reading and paging of reflog files."""
+
+import pytest
+
+from git_browser.git_parser.reflog import iter_lines_reverse, read_reflog
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+def _entry(i: int) -> bytes:
+    committer = f"Test User <test@example.com> {1_700_000_000 + i} +0000"
+    return f"{SHA_A} {SHA_B} {committer}\tcommit: change {i}".encode()
+
+
+def _lines_with_offsets(data: bytes):
+    pairs = []
+    offset = 0
+    for line in data.split(b"\n"):
+        if line:
+            pairs.append((offset, line))
+        offset += len(line) + 1
+    return pairs[::-1]
+
+
+@pytest.mark.parametrize("block", [1, 2, 7, 64, 100, 64 * 1024])
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"one\n",
+        b"one",
+        b"one\ntwo\nthree\n",
+        b"one\ntwo\nthree",
+        b"\n\nfirst\n\nsecond line is longer than a block\n\n",
+        b"\n".join(_entry(i) for i in range(20)) + b"\n",
+    ],
+)
+def test_iter_lines_reverse(tmp_path, data, block):
+    path = tmp_path / "log"
+    path.write_bytes(data)
+    assert list(iter_lines_reverse(path, block=block)) == _lines_with_offsets(data)
+
+
+@pytest.mark.parametrize("block", [1, 7, 100])
+def test_iter_lines_reverse_before_offset(tmp_path, block):
+    data = b"one\ntwo\nthree\n"
+    path = tmp_path / "log"
+    path.write_bytes(data)
+    assert list(iter_lines_reverse(path, end=8, block=block)) == [(4, b"two"), (0, b"one")]
+
+
+def test_read_reflog_pages(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(b"\n".join(_entry(i) for i in range(10)) + b"\n")
+
+    messages = []
+    cursor = None
+    while True:
+        entries, cursor = read_reflog(path, cursor, 3)
+        messages.extend(entry["message"] for entry in entries)
+        if cursor is None:
+            break
+    assert messages == [f"commit: change {i}" for i in reversed(range(10))]
+
+
+def test_read_reflog_skips_malformed_lines(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(_entry(0) + b"\ngarbage\n" + _entry(1) + b"\n")
+    entries, cursor = read_reflog(path, None, 10)
+    assert [entry["committer"]["timestamp"] for entry in entries] == [1_700_000_001, 1_700_000_000]
+    assert entries[0]["committer"]["name"] == "Test User"
+    assert cursor is None
+
+
+def test_read_reflog_rejects_cursor_inside_a_line(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(_entry(0) + b"\n" + _entry(1) + b"\n")
+    with pytest.raises(ValueError):
+        read_reflog(path, 5, 10)
+    with pytest.raises(ValueError):
+        read_reflog(path, path.stat().st_size + 1, 10)
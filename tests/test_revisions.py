@@ -0,0 +1,166 @@
+"""Revision expression parsing and resolution, checked against git rev-parse."""
+
+import hashlib
+
+import pytest
+
+from git_browser.git_parser import refs
+from git_browser.git_parser.parser import GitParser
+from git_browser.git_parser.revisions import Revision, parse_revision, split_range
+
+from .conftest import _commit, git
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("main", Revision("main", False, [])),
+        ("@", Revision("HEAD", False, [])),
+        ("main~3^2", Revision("main", False, [("~", 3), ("^", 2)])),
+        ("main~^", Revision("main", False, [("~", 1), ("^", 1)])),
+        ("v1^0", Revision("v1", False, [("^", 0)])),
+        ("v2^{}", Revision("v2", False, [("peel", "")])),
+        ("v2^{tree}", Revision("v2", False, [("peel", "tree")])),
+        ("feature/x@{u}~2", Revision("feature/x", True, [("~", 2)])),
+        ("@{upstream}", Revision("", True, [])),
+        ("abcd1234", Revision("abcd1234", False, [])),
+    ],
+)
+def test_parse_revision(spec, expected):
+    assert parse_revision(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["", "~1", "^2", "main~x", "main^{blob}", "main^{", "main~1x"])
+def test_parse_revision_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_revision(spec)
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("a..b", ("a", "..", "b")),
+        ("a...b", ("a", "...", "b")),
+        ("..b", ("HEAD", "..", "b")),
+        ("a..", ("a", "..", "HEAD")),
+        ("main~2", None),
+    ],
+)
+def test_split_range(spec, expected):
+    assert split_range(spec) == expected
+
+
+REVISIONS = [
+    "HEAD",
+    "@",
+    "main",
+    "main~3",
+    "main~1^2",
+    "main~1^2~2",
+    "left~1^2",
+    "left^0",
+    "right~1^{commit}",
+    "v1",
+    "v2",
+    "v2^{}",
+    "v2^{tree}",
+    "v2~2",
+    "heads/left",
+    "refs/heads/right",
+    "tags/v1",
+]
+
+
+@pytest.mark.parametrize("spec", REVISIONS)
+def test_resolve_revision_matches_git(parser, repo_path, spec):
+    # Annotated tags resolve to the object they tag
+    peeled = spec + "^{}" if "^{" not in spec else spec
+    assert parser.resolve_revision(spec) == git(repo_path, "rev-parse", peeled)
+
+
+@pytest.mark.parametrize("spec", ["nope", "main~100", "main^3", "v1^2", "ffff"])
+def test_resolve_revision_missing(parser, spec):
+    assert parser.resolve_revision(spec) is None
+
+
+@pytest.mark.parametrize("rev", ["main", "main~4", "v2", "HEAD^{tree}"])
+@pytest.mark.parametrize("length", [4, 7, 12])
+def test_resolve_abbreviated_sha(parser, repo_path, rev, length):
+    # git lengthens a short name if needed to keep it unique
+    abbrev = git(repo_path, "rev-parse", f"--short={length}", rev)
+    # Like other names, an abbreviated tag object resolves to what it tags
+    expected = git(repo_path, "rev-parse", f"{abbrev}^{{}}")
+    assert parser.resolve_revision(abbrev) == expected
+    assert parser.resolve_revision(abbrev.upper()) == expected
+
+
+def test_full_sha_is_returned_as_is(parser, repo_path):
+    tag = git(repo_path, "rev-parse", "v2")
+    assert parser.resolve_revision(tag.upper()) == tag
+    assert parser.resolve_revision("0" * 40) == "0" * 40
+
+
+def _colliding_blob(existing):
+    """Content of a blob whose SHA shares its first 4 hex digits with an existing object."""
+    prefixes = {sha[:4]: sha for sha in existing}
+    for i in range(1_000_000):
+        content = f"collision {i}\n".encode()
+        sha = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+        if sha[:4] in prefixes and sha != prefixes[sha[:4]]:
+            return content, sha
+    raise AssertionError("No colliding blob found")
+
+
+def test_ambiguous_abbreviation(repo_copy):
+    listing = git(repo_copy, "cat-file", "--batch-all-objects", "--batch-check=%(objectname)")
+    content, sha = _colliding_blob(listing.split())
+    (repo_copy / "collision.txt").write_bytes(content)
+    assert git(repo_copy, "hash-object", "-w", "collision.txt") == sha
+
+    parser = GitParser(str(repo_copy), diff_workers=1)
+    try:
+        with pytest.raises(ValueError, match="ambiguous"):
+            parser.resolve_revision(sha[:4])
+        # One more digit tells them apart, like git rev-parse
+        for length in range(5, 41):
+            if not git(repo_copy, "rev-parse", "--disambiguate=" + sha[:length]).count("\n"):
+                break
+        assert parser.resolve_revision(sha[:length]) == sha
+    finally:
+        parser.close()
+
+
+def test_revision_cache_follows_ref_moves(repo_copy, monkeypatch):
+    monkeypatch.setattr(refs, "RACY_STAMP_SECONDS", 0)
+    parser = GitParser(str(repo_copy), diff_workers=1)
+    try:
+        # Packed refs are cached like loose ones
+        assert "refs/tags/v1" in (repo_copy / ".git" / "packed-refs").read_text()
+        assert parser.resolve_revision("v1") == git(repo_copy, "rev-parse", "v1")
+        assert parser.revision_cache.get("v1") is not None
+        old_head = parser.resolve_revision("main")
+
+        _commit(repo_copy, "moved", 1_800_000_000, {"moved.txt": "moved\n"})
+        new_head = git(repo_copy, "rev-parse", "main")
+        assert new_head != old_head
+        assert parser.resolve_revision("main") == new_head
+        assert parser.resolve_revision("main~1") == old_head
+
+        git(repo_copy, "tag", "-f", "v1", "main")
+        assert parser.resolve_revision("v1") == new_head
+        git(repo_copy, "checkout", "-q", "--detach", "v2")
+        assert parser.resolve_revision("HEAD") == git(repo_copy, "rev-parse", "v2^{}")
+    finally:
+        parser.close()
+
+
+def test_unchanged_refs_are_not_listed_again(parser, monkeypatch):
+    monkeypatch.setattr(refs, "RACY_STAMP_SECONDS", 0)
+    snapshot = parser.ref_snapshot()
+    calls = []
+    list_refs = parser._list_refs
+    monkeypatch.setattr(parser, "_list_refs", lambda prefix: calls.append(prefix) or list_refs(prefix))
+    assert parser.ref_snapshot() is snapshot
+    parser.resolve_revision("main~2")
+    parser.resolve_revision("main~2")
+    assert calls == []
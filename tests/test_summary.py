@@ -0,0 +1,44 @@
+"""Exact repository counts of get_summary, checked against git."""
+
+from git_browser.git_parser import refs
+from git_browser.git_parser.parser import GitParser
+
+from .conftest import _commit, git
+
+
+def _git_counts(repo):
+    objects = dict(line.split(": ") for line in git(repo, "count-objects", "-v").splitlines())
+    return {
+        "commit_count": int(git(repo, "rev-list", "--all", "--count")),
+        "author_count": len(set(git(repo, "log", "--all", "--format=%an <%ae>").splitlines())),
+        "file_count": len(git(repo, "ls-tree", "-r", "--name-only", "HEAD").splitlines()),
+        "object_count": int(objects["in-pack"]) + int(objects["count"]),
+        "packed_object_count": int(objects["in-pack"]),
+        "loose_object_count": int(objects["count"]),
+    }
+
+
+def test_summary_matches_git(parser, repo_path):
+    assert parser.get_summary() == _git_counts(repo_path)
+
+
+def test_summary_follows_new_commits(repo_copy):
+    parser = GitParser(str(repo_copy), diff_workers=1)
+    try:
+        assert parser.get_summary() == _git_counts(repo_copy)
+        _commit(repo_copy, "more", 1_800_000_000, {"more/a.txt": "a\n", "more/b.txt": "b\n"})
+        assert parser.get_summary() == _git_counts(repo_copy)
+    finally:
+        parser.close()
+
+
+def test_unchanged_summary_does_not_list_refs(parser, monkeypatch):
+    monkeypatch.setattr(refs, "RACY_STAMP_SECONDS", 0)
+    summary = parser.get_summary()
+
+    def fail(*args):
+        raise AssertionError("refs were listed")
+
+    monkeypatch.setattr(parser, "get_reachability_index", fail)
+    monkeypatch.setattr(parser, "_list_refs", fail)
+    assert parser.get_summary() is summary